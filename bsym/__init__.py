@@ -1,11 +1,12 @@
 from bsym.symmetry_operation import SymmetryOperation
-from bsym.symmetry_group import SymmetryGroup
+from bsym.symmetry_group import SymmetryGroup, GeneratedSymmetryGroup, SupercellSymmetryGroup
 from bsym.space_group import SpaceGroup
 from bsym.point_group import PointGroup
 from bsym.configuration import Configuration
+from bsym.configuration_set import ConfigurationSet
 from bsym.configuration_space import ConfigurationSpace
 from bsym.coordinate_config_space import CoordinateConfigSpace
-from bsym.colour_operation import ColourOperation
+from bsym.colour_operation import ColourOperation, ColourSymmetryGroup
 
 from bsym.version import __version__
 
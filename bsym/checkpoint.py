@@ -0,0 +1,269 @@
+"""
+Saving and restoring the state of a long-running configuration enumeration.
+
+The unique permutations of a multiset are generated in a fixed order, so the progress of an
+enumeration is described by the rank of the next permutation to be screened, the orbit
+representatives found so far, and (for the `'bitmap'` method) the record of visited
+configurations. An :any:`EnumerationCheckpoint` holds this state, and is written to disk
+as an uncompressed ``.npz`` file. For the `'set'` method, the visited configurations are
+the orbits of the representatives, so they are not saved, and are found again on resuming.
+
+During an enumeration, a :any:`CheckpointWriter` saves the state again and again, writing the
+representatives found since the previous save to a new part file each time, so the cost
+of a save does not grow with the number of representatives found so far.
+"""
+
+import hashlib
+import os
+import uuid
+import numpy as np
+
+
+class EnumerationCheckpoint:
+    """
+    The state of a partly finished enumeration of symmetry inequivalent configurations.
+    """
+
+    def __init__( self, method, sequence, group_key, position, vectors, counts, visited=None ):
+        """
+        Create an :any:`EnumerationCheckpoint`.
+
+        Args:
+            method (str): The enumeration method, `'set'`, `'bitmap'`, or `'orderly'`.
+            sequence (str): A description of the objects being permuted (see :func:`sequence_key`).
+            group_key (str): A fingerprint of the symmetry group (see :func:`symmetry_group_key`).
+            position (int): The rank of the next permutation to be screened.
+            vectors (np.ndarray): A (M, N) array of the orbit representatives found so far.
+            counts (np.ndarray): A length M array of the number of configurations equivalent to each.
+            visited (opt:default=None): The record of visited configurations: the bits of a :any:`BitmapKeySet`
+                for the `'bitmap'` method, or (optionally) an array of keys for the `'set'` method.
+        """
+        self.method = method
+        self.sequence = sequence
+        self.group_key = group_key
+        self.position = position
+        self.vectors = vectors
+        self.counts = counts
+        self.visited = visited
+
+    def save( self, filename, parts=None ):
+        """
+        Write this checkpoint to a file.
+
+        The checkpoint is first written to a temporary file, which then replaces `filename`,
+        so an interrupted save never leaves a damaged checkpoint. Any part files of the checkpoint
+        that `filename` replaces, and that are not in `parts`, are removed.
+
+        Args:
+            filename (str): The file to write.
+            parts (opt:default=None): The names of part files, in the same directory as `filename`,
+                that hold more orbit representatives (see :any:`CheckpointWriter`).
+
+        Returns:
+            None
+        """
+        previous_parts = _read_parts( filename )
+        arrays = {
+            "method": np.array( self.method ),
+            "sequence": np.array( self.sequence ),
+            "group_key": np.array( self.group_key ),
+            "position": np.array( self.position, dtype=np.int64 ),
+            "vectors": self.vectors,
+            "counts": self.counts,
+        }
+        if self.visited is not None:
+            arrays[ "visited" ] = self.visited
+        if parts:
+            arrays[ "parts" ] = np.array( parts )
+        _save_arrays( filename, arrays )
+        for part in set( previous_parts ) - set( parts or [] ):
+            _remove( os.path.join( os.path.dirname( filename ), part ) )
+
+    @classmethod
+    def load( cls, filename ):
+        """
+        Read a checkpoint from a file written by :meth:`save`, including the orbit representatives
+        in its part files.
+
+        Args:
+            filename (str): The file to read.
+
+        Returns:
+            (:any:`EnumerationCheckpoint`)
+        """
+        with np.load( filename, allow_pickle=False ) as data:
+            checkpoint = cls(
+                method=str( data[ "method" ] ),
+                sequence=str( data[ "sequence" ] ),
+                group_key=str( data[ "group_key" ] ),
+                position=int( data[ "position" ] ),
+                vectors=data[ "vectors" ],
+                counts=data[ "counts" ],
+                visited=data[ "visited" ] if "visited" in data else None,
+            )
+            parts = [ str( part ) for part in data[ "parts" ] ] if "parts" in data else []
+        vectors, counts = [ checkpoint.vectors ], [ checkpoint.counts ]
+        for part in parts:
+            with np.load( os.path.join( os.path.dirname( filename ), part ), allow_pickle=False ) as data:
+                vectors.append( data[ "vectors" ] )
+                counts.append( data[ "counts" ] )
+        checkpoint.vectors = np.concatenate( vectors )
+        checkpoint.counts = np.concatenate( counts )
+        return checkpoint
+
+    def check_matches( self, method, sequence, group_key ):
+        """
+        Check that this checkpoint was saved from the same enumeration.
+
+        Args:
+            method (str): The enumeration method.
+            sequence (str): A description of the objects being permuted.
+            group_key (str): A fingerprint of the symmetry group.
+
+        Returns:
+            None
+
+        Raises:
+            ValueError: If the method, objects, or symmetry group are different.
+        """
+        if method != self.method:
+            raise ValueError( "checkpoint was saved using method='{}', not '{}'".format( self.method, method ) )
+        if sequence != self.sequence:
+            raise ValueError( "checkpoint was saved for a different site distribution" )
+        if group_key != self.group_key:
+            raise ValueError( "checkpoint was saved for a different symmetry group" )
+
+
+class CheckpointWriter:
+    """
+    Saves the state of a running enumeration to a checkpoint file at intervals, writing only the
+    orbit representatives found since the previous save.
+
+    Each save writes the new representatives to a part file next to `filename`, named
+    ``<filename>.<id>.<i>.npz``, and then replaces `filename` itself, which holds the rest of the
+    state and the names of the parts. The representatives found before the writer was created
+    are written once, by the first save. The bits of a :any:`BitmapKeySet` are written in full by
+    every save, but their size is fixed by the number of permutations.
+    """
+
+    def __init__( self, filename, checkpoint ):
+        """
+        Create a :any:`CheckpointWriter`.
+
+        Args:
+            filename (str): The checkpoint file to write.
+            checkpoint (:any:`EnumerationCheckpoint`): The state of the enumeration when writing starts.
+        """
+        self.filename = filename
+        self.checkpoint = checkpoint
+        self.parts = []
+        self._id = uuid.uuid4().hex[ :8 ]
+        self._vectors = [ checkpoint.vectors ]
+        self._counts = [ checkpoint.counts ]
+
+    def add( self, vectors, counts ):
+        """
+        Record a block of new orbit representatives, to be written by the next save.
+
+        Args:
+            vectors (np.ndarray): A (M, N) array of representative configurations.
+            counts (np.ndarray): A length M array of the number of configurations equivalent to each.
+
+        Returns:
+            None
+        """
+        self._vectors.append( vectors )
+        self._counts.append( counts )
+
+    def save( self, position, visited=None ):
+        """
+        Write the orbit representatives added since the previous save to a new part file,
+        and update the checkpoint file.
+
+        Args:
+            position (int): The rank of the next permutation to be screened.
+            visited (opt:default=None): The bits of a :any:`BitmapKeySet`, for the `'bitmap'` method.
+
+        Returns:
+            None
+        """
+        if self._vectors:
+            part = "{}.{}.{:d}.npz".format( os.path.basename( self.filename ), self._id, len( self.parts ) )
+            _save_arrays( os.path.join( os.path.dirname( self.filename ), part ),
+                          { "vectors": np.concatenate( self._vectors ), "counts": np.concatenate( self._counts ) } )
+            self.parts.append( part )
+            self._vectors, self._counts = [], []
+        c = self.checkpoint
+        EnumerationCheckpoint( c.method, c.sequence, c.group_key, position,
+                               c.vectors[ :0 ], c.counts[ :0 ], visited ).save( self.filename, self.parts )
+
+
+def sequence_key( seq ):
+    """
+    A description of the objects being permuted, for checking that a checkpoint matches.
+
+    Args:
+        seq (list): The objects being permuted.
+
+    Returns:
+        (str)
+    """
+    return repr( list( seq ) )
+
+
+def symmetry_group_key( symmetry_group ):
+    """
+    A fingerprint of a symmetry group, for checking that a checkpoint matches.
+
+    The index mappings are hashed one block at a time, from ``symmetry_group.iter_index_mappings()``,
+    so the elements of a group that is generated lazily are never all held in memory. For a
+    :any:`ColourSymmetryGroup`, the colours and colour lookup tables are hashed as well.
+
+    Args:
+        symmetry_group (:any:`SymmetryGroup`): The symmetry group.
+
+    Returns:
+        (str): A SHA-256 hex digest of the shape and values of the (G, N) array of index mappings,
+            and of the colour lookup tables of a :any:`ColourSymmetryGroup`.
+    """
+    blocks = symmetry_group.iter_index_mappings()
+    first = np.ascontiguousarray( next( blocks ), dtype=np.int64 )
+    digest = hashlib.sha256( repr( ( symmetry_group.size, first.shape[1] ) ).encode() )
+    digest.update( first.tobytes() )
+    for block in blocks:
+        digest.update( np.ascontiguousarray( block, dtype=np.int64 ).tobytes() )
+    if symmetry_group.has_colour_mappings:
+        digest.update( repr( symmetry_group.colours.tolist() ).encode() )
+        digest.update( np.ascontiguousarray( symmetry_group.colour_luts, dtype=np.int64 ).tobytes() )
+    return digest.hexdigest()
+
+
+def _save_arrays( filename, arrays ):
+    """
+    Write a dictionary of arrays to an ``.npz`` file, through a temporary file.
+    """
+    temporary = "{}.tmp".format( filename )
+    with open( temporary, "wb" ) as f:
+        np.savez( f, **arrays )
+    os.replace( temporary, filename )
+
+
+def _read_parts( filename ):
+    """
+    The names of the part files of an existing checkpoint file, or an empty list if there is none.
+    """
+    try:
+        with np.load( filename, allow_pickle=False ) as data:
+            return [ str( part ) for part in data[ "parts" ] ] if "parts" in data else []
+    except ( OSError, ValueError ):
+        return []
+
+
+def _remove( filename ):
+    """
+    Remove a file, if it exists.
+    """
+    try:
+        os.remove( filename )
+    except FileNotFoundError:
+        pass
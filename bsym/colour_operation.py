@@ -1,15 +1,21 @@
-from bsym import Configuration, SymmetryOperation
+from bsym import Configuration, SymmetryOperation, SymmetryGroup
+from bsym.symmetry_operation import _inverse
 import numpy as np
 
 class ColourOperation( SymmetryOperation ):
     """
     This class subclasses `SymmetryOperation`.
     It defines a class of object for performing a compound operation on a
-    configuration. 
-    First, a matrix transform applied to the configuration
-    vector space, equivlant to a `SymmetryOperation`. 
+    configuration.
+    First, a permutation of the sites of the configuration vector space,
+    equivalent to a `SymmetryOperation`.
     Second, a colour mapping, that allows objects to be replaced in the
     configuration vector space.
+
+    A `ColourOperation` is stored as an `index_mapping` vector, a sorted array of `colours`, and an
+    (N, C) integer `colour_lut` array, where ``colour_lut[i, k]`` is the position in `colours` of the
+    colour that colour `k` becomes on site `i`. Applying the operation to a configuration vector `v` gives
+    ``colours[ colour_lut[ i, k ] ]`` on each site `i`, where ``colours[ k ]`` is ``v[ index_mapping[ i ] ]``.
     """
 
     def __init__( self, matrix, colour_mapping, label=None ):
@@ -24,9 +30,14 @@ class ColourOperation( SymmetryOperation ):
             `numpy.matrix`, `numpy.ndarray`, or `list` containing the site mappings
             for this symmetry operation.
             colour_mapping (list[dict]): A `list` of `dict`s, that describe per-site
-            object mappings.
+            object mappings. Every `dict` should map every colour. If there are fewer
+            `dict`s than sites, the remaining sites keep every colour unchanged.
             label (default=None) (str): optional string label for this `SymmetryOperation` object.
 
+        Raises:
+            ValueError: if there are more `dict`s than sites, or a `dict` does not map every colour
+                onto a colour.
+
         Returns:
             None
 
@@ -35,11 +46,60 @@ class ColourOperation( SymmetryOperation ):
             >>> matrix = np.array( [[1, 0], [0, 1]] )
             >>> colour_mapping = [ { 0: 1, 1: 0 }, { 0: 0, 1: 1 } ]
             >>> ColourOperation( matrix, colour_mapping )
-         
+
         """
         super().__init__( matrix, label )
         self.colour_mapping = colour_mapping
-         
+
+    @classmethod
+    def from_index_mapping( cls, index_mapping, colour_mapping, label=None ):
+        """
+        Initialise a ColourOperation from its index mapping, where the sites of a configuration
+        vector `v` are first rearranged to give ``v[index_mapping]``.
+
+        Args:
+            index_mapping (list|np.ndarray): A permutation of the integers ``0 .. N-1``.
+            colour_mapping (list[dict]): A `list` of `dict`s, that describe per-site object mappings.
+            label (default=None) (str): optional string label for this `ColourOperation` object.
+
+        Returns:
+            a new ColourOperation object
+        """
+        new_colour_operation = super().from_index_mapping( index_mapping, label=label )
+        new_colour_operation.colour_mapping = colour_mapping
+        return new_colour_operation
+
+    @classmethod
+    def from_lookup_table( cls, index_mapping, colours, colour_lut, label=None ):
+        """
+        Initialise a ColourOperation from its index mapping and colour lookup table.
+
+        Args:
+            index_mapping (list|np.ndarray): A permutation of the integers ``0 .. N-1``.
+            colours (list|np.ndarray): The sorted colours.
+            colour_lut (np.ndarray): An (N, C) integer array, where ``colour_lut[i, k]`` is the position
+                in `colours` of the colour that ``colours[k]`` becomes on site `i`.
+            label (default=None) (str): optional string label for this `ColourOperation` object.
+
+        Raises:
+            ValueError: if `colour_lut` does not have one row for each site and one column for each colour,
+                or contains a position outside `colours`.
+
+        Returns:
+            a new ColourOperation object
+        """
+        new_colour_operation = super().from_index_mapping( index_mapping, label=label )
+        colours = np.asarray( colours )
+        colour_lut = np.asarray( colour_lut, dtype=np.intp )
+        if colour_lut.shape != ( len( new_colour_operation.index_mapping ), len( colours ) ):
+            raise ValueError( 'colour_lut should have one row for each site and one column for each colour' )
+        if ( ( colour_lut < 0 ) | ( colour_lut >= len( colours ) ) ).any():
+            raise ValueError( 'colour_lut contains a position outside colours' )
+        new_colour_operation.colours = colours
+        new_colour_operation.colour_lut = colour_lut
+        new_colour_operation._colour_mapping = None
+        return new_colour_operation
+
     @classmethod
     def from_vector( cls, vector, colour_mapping, count_from_zero=False, label=None ):
         """
@@ -48,21 +108,35 @@ class ColourOperation( SymmetryOperation ):
         Args:
             vector (list): vector of integers defining a symmetry operation mapping.
             colour_mapping (list[dict]): A `list` of `dict`s, that describe per-site object mappings.
+                If there are fewer `dict`s than sites, the remaining sites keep every colour unchanged.
             count_from_zero (default = False) (bool): set to True if the site index counts from zero.
             label (default=None) (str): optional string label for this `SymmetryOperation` object.
-   
+
         Returns:
             a new SymmetryOperation object
         """
-        if not count_from_zero:
-            vector = [ x - 1 for x in vector ]
-        dim = len( vector )
-        matrix = np.zeros( ( dim, dim ) )
-        for index, element in enumerate( vector ):
-            matrix[ element, index ] = 1
-        new_colour_operation = cls( matrix, colour_mapping=colour_mapping, label=label )
-        return new_colour_operation
-    
+        new_colour_operation = SymmetryOperation.from_vector( vector, count_from_zero=count_from_zero, label=label )
+        return cls.from_index_mapping( new_colour_operation.index_mapping, colour_mapping, label=label )
+
+    @property
+    def colour_mapping( self ):
+        """
+        The per-site object mappings, as a `list` of `dict`s: as they were given, or built from
+        `colour_lut` for a colour operation made from a lookup table.
+
+        Returns:
+            (list[dict])
+        """
+        if self._colour_mapping is not None:
+            return self._colour_mapping
+        colours = self.colours.tolist()
+        return [ { colour: colours[ k ] for colour, k in zip( colours, row ) } for row in self.colour_lut.tolist() ]
+
+    @colour_mapping.setter
+    def colour_mapping( self, colour_mapping ):
+        self.colours, self.colour_lut = colour_lookup_table( colour_mapping, len( self.index_mapping ) )
+        self._colour_mapping = colour_mapping
+
     def operate_on( self, configuration ):
         """
         Return the Configuration generated by appliying this colour operation
@@ -75,39 +149,199 @@ class ColourOperation( SymmetryOperation ):
         """
         if not isinstance( configuration, Configuration ):
             raise TypeError
-        new_configuration = Configuration( self.matrix.dot( configuration.vector ) )
-        return Configuration( [ d[value] for value, d in zip( new_configuration.vector, self.colour_mapping ) ] )
-    
+        return Configuration( self.operate_on_vectors( configuration.vector[ np.newaxis, : ] )[0] )
+
+    def operate_on_vectors( self, vectors ):
+        """
+        Apply this colour operation to a block of configuration vectors.
+
+        Args:
+            vectors (np.ndarray): A (B, N) array of configuration vectors.
+
+        Returns:
+            (np.ndarray): A (B, N) array of the new configuration vectors.
+        """
+        codes = colour_codes( vectors, self.colours )
+        sites = np.arange( len( self.index_mapping ) )
+        return self.colours[ self.colour_lut[ sites, codes[ :, self.index_mapping ] ] ]
+
     def __mul__( self, other ):
         """
         Operate on another object with this `ColourOperation`.
 
+        The product ``self * other`` applies `other` first. Its index mapping and colour lookup table are
+        found by composing those of the two operations, without building either matrix.
+
         Args:
             other (ColourOperation, SymmetryOperation, Configuration): the other object (colour operation, symmetry operation, configuration, or matrix).
 
         Returns:
-            (ColourOperation): a new `ColourOperation` instance with the resultant matrix and colour_mapping..
+            (ColourOperation): a new `ColourOperation` instance with the resultant index mapping and colour mapping.
             (Configuration): if `other` is a `Configuration`.
+
+        Raises:
+            ValueError: if the two colour operations have different colours.
         """
         if isinstance( other, ColourOperation ):
-            new_matrix = self.matrix.dot( other.matrix )
-            new_mapping = [ {} for d in self.colour_mapping ]
-            for i, (this_mapping, other_mapping) in enumerate( zip( self.colour_mapping, other.colour_mapping ) ):
-                for key in this_mapping.keys():
-                    new_mapping[i][key] = this_mapping[ other_mapping[ key ] ]
-            return ColourOperation( new_matrix, colour_mapping=new_mapping ) 
+            if not np.array_equal( self.colours, other.colours ):
+                raise ValueError( 'the colour operations have different colours' )
+            colour_lut = np.take_along_axis( self.colour_lut, other.colour_lut[ self.index_mapping ], axis=1 )
+            return ColourOperation.from_lookup_table( other.index_mapping[ self.index_mapping ], self.colours, colour_lut )
         elif isinstance( other, SymmetryOperation ):
-            return ColourOperation( self.matrix.dot( other.matrix ), colour_mapping=self.colour_mapping )
+            return ColourOperation.from_lookup_table( other.index_mapping[ self.index_mapping ], self.colours, self.colour_lut )
         elif isinstance( other, Configuration ):
             return self.operate_on( other )
         else:
-            print( self.__class__, other.__class__ )
             raise TypeError
-           
+
     def invert( self, label=None ):
-        # TODO
-        raise NotImplementedError
- 
+        """
+        Invert this `ColourOperation` object.
+
+        Args:
+            label (default=None) (str): optional string label for the inverse.
+
+        Returns:
+            A new `ColourOperation` object, that undoes this colour operation.
+
+        Raises:
+            ValueError: if the colour mapping of a site maps two colours onto the same colour.
+        """
+        n_colours = len( self.colours )
+        if not ( np.sort( self.colour_lut, axis=1 ) == np.arange( n_colours ) ).all():
+            raise ValueError( 'every colour mapping should be one to one' )
+        inverse_lut = np.empty_like( self.colour_lut )
+        inverse_lut[ np.arange( len( self.colour_lut ) )[ :, np.newaxis ], self.colour_lut ] = np.arange( n_colours )
+        inverse_mapping = _inverse( self.index_mapping )
+        return ColourOperation.from_lookup_table( inverse_mapping, self.colours, inverse_lut[ inverse_mapping ], label=label )
+
     def __repr__( self ):
         label = self.label if self.label else '---'
         return 'ColourOperation\nlabel(' + label + ")\n" + "\n".join( [ row.__str__() + ' ' + mapping.__repr__() for row, mapping in zip( self.matrix, self.colour_mapping ) ] )
+
+class ColourSymmetryGroup( SymmetryGroup ):
+    """
+    A :any:`SymmetryGroup` of :any:`ColourOperation` objects.
+
+    The images of a block of configurations under every colour operation are found in one array
+    operation, from the stacked index mappings and colour lookup tables, so a :any:`ConfigurationSpace`
+    with a :any:`ColourSymmetryGroup` is screened in the same way as one with a group of site permutations.
+    Every colour operation should have the same colours. When enumerating configurations with a fixed number
+    of each object, every colour operation should keep these numbers unchanged, e.g. by exchanging two objects
+    that appear equally often. Enumeration that relies on the index mappings alone, such as `method='nested'`
+    and :meth:`ConfigurationSpace.constrained_configurations`, restricting the group to a subset of sites, and
+    counting configurations from the cycle index without enumerating them, are not supported, and raise `ValueError`.
+
+    e.g.::
+
+        ColourSymmetryGroup( symmetry_operations=[ c1, c2, c3 ] )
+    """
+
+    class_str = 'ColourSymmetryGroup'
+    has_colour_mappings = True
+
+    @property
+    def colours( self ):
+        """
+        The sorted colours of the colour operations in this group.
+
+        Raises:
+            ValueError: If the colour operations have different colours.
+        """
+        colours = self.symmetry_operations[0].colours
+        if any( not np.array_equal( so.colours, colours ) for so in self.symmetry_operations[ 1: ] ):
+            raise ValueError( 'the colour operations have different colours' )
+        return colours
+
+    @property
+    def colour_luts( self ):
+        """
+        The colour lookup tables of every :any:`ColourOperation` in this group, stacked into a single array.
+
+        Returns:
+            (np.ndarray): A (G, N, C) array, where element g is the ``colour_lut`` of the g-th colour operation.
+        """
+        return np.array( [ so.colour_lut for so in self.symmetry_operations ] )
+
+    def iter_images( self, configurations ):
+        """
+        Apply every colour operation in this group to a block of configuration vectors.
+
+        Args:
+            configurations (np.ndarray): A (B, N) array of configuration vectors.
+
+        Yields:
+            (np.ndarray): A single (B, G, N) array of the images under each colour operation.
+        """
+        colours = self.colours
+        codes = colour_codes( configurations, colours )
+        colour_luts = self.colour_luts
+        n_operations, n_sites, n_colours = colour_luts.shape
+        flat_positions = np.arange( n_sites ) * n_colours + codes[ :, self.index_mappings ]
+        yield colours[ colour_luts.reshape( n_operations, -1 )[ np.arange( n_operations )[ :, np.newaxis ], flat_positions ] ]
+
+    def restricted_to( self, sites ):
+        """
+        Not supported: the colour mappings of the sites outside the subset would be lost.
+
+        Raises:
+            ValueError: Always.
+        """
+        raise ValueError( 'restricting to a subset of sites is not supported for colour symmetry groups' )
+
+    def cycle_index( self ):
+        """
+        Not supported: the cycle index only describes the site permutations, not the colour mappings.
+
+        Raises:
+            ValueError: Always.
+        """
+        raise ValueError( 'the cycle index is not supported for colour symmetry groups' )
+
+def colour_lookup_table( colour_mapping, n_sites ):
+    """
+    Convert per-site object mappings to a sorted array of colours and a colour lookup table.
+
+    Args:
+        colour_mapping (list[dict]): A `list` of `dict`s, that describe per-site object mappings.
+            If there are fewer `dict`s than sites, the remaining sites keep every colour unchanged.
+        n_sites (int): The number of sites.
+
+    Returns:
+        (np.ndarray, np.ndarray): The sorted colours, and an (N, C) array, where element ``[i, k]``
+            is the position in the colours of the colour that colour `k` becomes on site `i`.
+
+    Raises:
+        ValueError: if there are more `dict`s than sites, or a `dict` does not map every colour
+            onto a colour.
+    """
+    if len( colour_mapping ) > n_sites:
+        raise ValueError( 'colour_mapping should have at most one dict for each site' )
+    colours = np.unique( np.array( [ colour for mapping in colour_mapping for colour in mapping ] ) )
+    colour_list = colours.tolist()
+    if any( set( mapping ) != set( colour_list ) for mapping in colour_mapping ):
+        raise ValueError( 'every dict in colour_mapping should map every colour' )
+    identity = { colour: colour for colour in colour_list }
+    colour_mapping = list( colour_mapping ) + [ identity ] * ( n_sites - len( colour_mapping ) )
+    images = np.array( [ [ mapping[ colour ] for colour in colour_list ] for mapping in colour_mapping ] ).reshape( n_sites, len( colours ) )
+    return colours, colour_codes( images, colours )
+
+def colour_codes( vectors, colours ):
+    """
+    The position of each label of a block of configuration vectors in a sorted array of colours.
+
+    Args:
+        vectors (np.ndarray): An array of labels.
+        colours (np.ndarray): The sorted colours.
+
+    Returns:
+        (np.ndarray): An integer array with the same shape as `vectors`.
+
+    Raises:
+        ValueError: if a label is not one of the colours.
+    """
+    vectors = np.asarray( vectors )
+    codes = np.minimum( np.searchsorted( colours, vectors ), len( colours ) - 1 )
+    if len( colours ) == 0 or not ( colours[ codes ] == vectors ).all():
+        raise ValueError( 'every label should be one of the colours' )
+    return codes.astype( np.intp )
@@ -2,7 +2,8 @@ from __future__ import annotations
 
 import numpy as np
 from numpy.typing import NDArray
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Optional
+from bsym.key_encoding import KeyEncoder
 if TYPE_CHECKING:
     from bsym.symmetry_operation import SymmetryOperation
 
@@ -18,9 +19,9 @@ class Configuration:
         count (int): If symmetry-inequivalent configurations have been generated for a `configuration space`,
                      this records the number of configurations equivalent to this one.
                      Value at initialisation is  ``None``.
-        lowest_numeric_representation (int): If the numeric representations for the set of equivalent
-                     configurations are calculated, this can be used to store the lowest valued numeric
-                     representation, for use as a simple hash.
+        lowest_numeric_representation (int|bytes): If the keys for the set of equivalent
+                     configurations are calculated, this can be used to store the lowest key,
+                     for use as a simple hash.
 
     Example:
 
@@ -30,7 +31,7 @@ class Configuration:
     """
 
     def __init__(self, vector: list[int] | NDArray[np.int_]) -> None:
-        self.count = None
+        self.count: Optional[int] = None
         self.lowest_numeric_representation = None
         self.vector = np.array(vector)
 
@@ -112,46 +113,64 @@ class Configuration:
         )
 
     def set_lowest_numeric_representation(
-        self, symmetry_operations: list[SymmetryOperation]
+        self,
+        symmetry_operations: list[SymmetryOperation],
+        key_encoder: Optional[KeyEncoder] = None,
     ) -> None:
         """
-        Sets `self.lowest_numeric_representation` to the lowest value numeric representation of this configuration when permutated under a set of symmetry operations.
+        Sets `self.lowest_numeric_representation` to the lowest key of this configuration when permutated under a set of symmetry operations.
 
         Args:
             symmetry_operations (list): A list of :any:`SymmetryOperation` instances.
+            key_encoder (:any:`KeyEncoder`, optional): The encoder used to generate keys.
+                Defaults to the numeric representation given by :any:`as_number`.
 
         Returns:
             None
         """
         self.lowest_numeric_representation = min(
-            [
-                symmetry_operation.operate_on(self).as_number
-                for symmetry_operation in symmetry_operations
-            ]
+            self._equivalent_keys(symmetry_operations, key_encoder)
         )
 
     def numeric_equivalents(self,
-        symmetry_operations: list[SymmetryOperation]) -> list[int]:
+        symmetry_operations: list[SymmetryOperation],
+        key_encoder: Optional[KeyEncoder] = None) -> list[Any]:
         """
         Returns a list of all symmetry equivalent configurations generated by a set of symmetry operations
-        with each configuration given in numeric representation.
+        with each configuration given as a key.
 
         Args:
             symmetry_operations (list): A list of :any:`SymmetryOperation` instances.
+            key_encoder (:any:`KeyEncoder`, optional): The encoder used to generate keys.
+                Defaults to the numeric representation given by :any:`as_number`.
 
         Returns:
-            (list(int)): A list of numbers representing each equivalent configuration.
+            (list(int|bytes)): A list of keys representing each equivalent configuration.
         """
-        return [
-            symmetry_operation.operate_on(self).as_number
+        return self._equivalent_keys(symmetry_operations, key_encoder)
+
+    def _equivalent_keys(
+        self,
+        symmetry_operations: list[SymmetryOperation],
+        key_encoder: Optional[KeyEncoder],
+    ) -> list[Any]:
+        images = [
+            symmetry_operation.operate_on(self)
             for symmetry_operation in symmetry_operations
         ]
+        if key_encoder is None:
+            return [image.as_number for image in images]
+        return key_encoder.encode(np.array([image.vector for image in images])).tolist()
 
     @property
     def as_number(self) -> int:
         """
         A numeric representation of this configuration.
 
+        Notes:
+            This representation is only unique for configurations of single digit labels.
+            Use a :any:`KeyEncoder` for collision-free keys.
+
         Examples:
             >>> c = Configuration([1, 2, 0])
             >>> c.as_number
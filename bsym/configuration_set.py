@@ -0,0 +1,342 @@
+"""
+A compact, array-backed collection of configurations.
+
+A :any:`ConfigurationSet` stores M configurations of N sites as a single (M, N) array of labels,
+in the smallest integer type that holds them, and a length M array of the number of
+configurations equivalent to each. Filtering, sorting, and site lookups act on the whole array
+at once, and a :any:`ConfigurationSet` can be saved and read back with its arrays memory-mapped,
+so that very large sets of results can be analysed without building a :any:`Configuration` for each.
+"""
+
+import os
+import zipfile
+import numpy as np
+from bsym.configuration import Configuration
+
+
+class ConfigurationSet:
+    """
+    A set of configurations, stored as a single array, with the number of configurations equivalent to each.
+
+    Attributes:
+        vectors (np.ndarray): (M, N) array, where each row is a configuration.
+        counts (np.ndarray): Length M array of the number of configurations equivalent to each configuration.
+
+    e.g.::
+
+        results = configuration_space.unique_configuration_set( { 1: 2, 0: 14 } )
+        results.filter( results.counts > 1 ).sort( 'count' )
+        results.save( 'results.npz' )
+        results = ConfigurationSet.load( 'results.npz', mmap_mode='r' )
+    """
+
+    def __init__( self, vectors, counts=None ):
+        """
+        Create a :any:`ConfigurationSet`.
+
+        Integer labels are stored in the smallest integer type that holds them.
+        Memory-mapped arrays are stored as they are.
+
+        Args:
+            vectors (np.ndarray): (M, N) array, where each row is a configuration.
+            counts (np.ndarray, optional): Length M array of the number of configurations equivalent
+                to each configuration. Defaults to one for every configuration.
+
+        Raises:
+            ValueError: If `vectors` is not two-dimensional, or `counts` has the wrong length.
+        """
+        if not isinstance( vectors, np.memmap ):
+            vectors = _compact( np.asarray( vectors ) )
+        if vectors.ndim != 2:
+            raise ValueError( "vectors should be a two-dimensional array" )
+        if counts is None:
+            counts = np.ones( len( vectors ), dtype=np.int64 )
+        elif not isinstance( counts, np.memmap ):
+            counts = np.asarray( counts, dtype=np.int64 )
+        if counts.shape != ( len( vectors ), ):
+            raise ValueError( "counts should have one value for each configuration" )
+        self.vectors = vectors
+        self.counts = counts
+
+    @classmethod
+    def from_configurations( cls, configurations, dim=None ):
+        """
+        Create a :any:`ConfigurationSet` from :any:`Configuration` objects.
+
+        Args:
+            configurations (list): :any:`Configuration` objects, with `count` set.
+                Configurations where `count` is ``None`` are counted once.
+            dim (int, optional): The number of sites. Only needed if there are no configurations.
+
+        Returns:
+            (:any:`ConfigurationSet`)
+        """
+        configurations = list( configurations )
+        if not configurations:
+            return cls( np.empty( ( 0, dim or 0 ), dtype=np.int8 ) )
+        return cls(
+            np.array( [ c.vector for c in configurations ] ),
+            [ 1 if c.count is None else c.count for c in configurations ],
+        )
+
+    @classmethod
+    def from_blocks( cls, blocks, dim ):
+        """
+        Create a :any:`ConfigurationSet` from blocks of configurations.
+
+        Args:
+            blocks (:obj:`generator`): Yields pairs of (M, N) arrays of configuration vectors and
+                length M arrays of the number of configurations equivalent to each.
+            dim (int): The number of sites N.
+
+        Returns:
+            (:any:`ConfigurationSet`)
+        """
+        blocks = [ ( _compact( np.asarray( vectors ) ), counts ) for vectors, counts in blocks ]
+        if not blocks:
+            return cls( np.empty( ( 0, dim ), dtype=np.int8 ) )
+        vectors, counts = zip( *blocks )
+        return cls( np.concatenate( vectors ), np.concatenate( counts ) )
+
+    def __len__( self ):
+        return len( self.vectors )
+
+    @property
+    def dim( self ):
+        """The number of sites in each configuration."""
+        return self.vectors.shape[1]
+
+    @property
+    def nbytes( self ):
+        """The number of bytes used to store the configurations and their counts."""
+        return self.vectors.nbytes + self.counts.nbytes
+
+    def __getitem__( self, index ):
+        """
+        A single :any:`Configuration`, with `count` set, for an integer index.
+        A new :any:`ConfigurationSet` for a slice, an array of indices, or a boolean mask.
+        """
+        if isinstance( index, ( int, np.integer ) ):
+            configuration = Configuration( self.vectors[ index ] )
+            configuration.count = int( self.counts[ index ] )
+            return configuration
+        return ConfigurationSet( np.asarray( self.vectors[ index ] ), np.asarray( self.counts[ index ] ) )
+
+    def __iter__( self ):
+        for i in range( len( self ) ):
+            yield self[ i ]
+
+    def __repr__( self ):
+        return "ConfigurationSet({} configurations of {} sites, {} equivalent configurations)".format(
+            len( self ), self.dim, self.total_count()
+        )
+
+    def total_count( self ):
+        """
+        The total number of configurations, counting every equivalent configuration.
+
+        Returns:
+            (int)
+        """
+        return int( self.counts.sum( dtype=np.int64 ) )
+
+    def to_configurations( self ):
+        """
+        A :any:`Configuration` for each configuration in this set, with `count` set.
+
+        Returns:
+            (list[:any:`Configuration`])
+        """
+        return list( self )
+
+    def filter( self, mask ):
+        """
+        The configurations selected by a boolean mask.
+
+        Args:
+            mask (np.ndarray or callable): A length M boolean array, or a function that takes the
+                (M, N) array of configuration vectors and returns one.
+
+        Returns:
+            (:any:`ConfigurationSet`)
+
+        e.g.::
+
+            results.filter( lambda vectors: vectors[:, 0] == 1 )
+        """
+        if callable( mask ):
+            mask = mask( self.vectors )
+        mask = np.asarray( mask, dtype=bool )
+        if mask.shape != ( len( self ), ):
+            raise ValueError( "mask should have one value for each configuration" )
+        return self[ mask ]
+
+    def sort( self, key=None, reverse=False ):
+        """
+        The configurations in sorted order. The sort is stable.
+
+        Args:
+            key (optional): ``None`` to sort lexicographically by configuration vector, `'count'` to sort
+                by the number of equivalent configurations, a length M array of sort keys,
+                or a function that takes the (M, N) array of configuration vectors and returns one.
+            reverse (bool, optional): Sort in descending order. Defaults to ``False``.
+
+        Returns:
+            (:any:`ConfigurationSet`)
+        """
+        if key is None:
+            keys = self.vectors
+        elif isinstance( key, str ):
+            if key != "count":
+                raise ValueError( "key should be None, 'count', an array, or a function" )
+            keys = self.counts
+        else:
+            keys = np.asarray( key( self.vectors ) if callable( key ) else key )
+            if keys.shape != ( len( self ), ):
+                raise ValueError( "key should give one value for each configuration" )
+        if not reverse:
+            order = _stable_order( keys )
+        else:
+            # Sort the reversed keys, so that equal keys stay in their original order.
+            order = ( len( self ) - 1 - _stable_order( keys[ ::-1 ] ) )[ ::-1 ]
+        return self[ order ]
+
+    def positions( self, label ):
+        """
+        The sites occupied by one label in every configuration.
+
+        Args:
+            label: The label.
+
+        Returns:
+            (np.ndarray): (M, K) array of the K sites with this label in each configuration, in order.
+
+        Raises:
+            ValueError: If the number of sites with this label is not the same for every configuration.
+        """
+        rows, sites = np.nonzero( self.vectors == label )
+        n = len( sites ) // len( self ) if len( self ) else 0
+        if len( sites ) != n * len( self ) or not ( np.bincount( rows, minlength=len( self ) ) == n ).all():
+            raise ValueError( "label {!r} does not occupy the same number of sites in every configuration".format( label ) )
+        return sites.reshape( len( self ), n )
+
+    def labels( self ):
+        """
+        The labels that occur in these configurations.
+
+        Returns:
+            (np.ndarray): The sorted labels.
+        """
+        return np.unique( self.vectors )
+
+    def map_objects( self, objects ):
+        """
+        Sort a list of objects, one for each site, by the label of their site in every configuration.
+
+        This is the array form of :meth:`Configuration.map_objects`.
+
+        Args:
+            objects (list): An object for each site.
+
+        Returns:
+            (dict): For each label, an (M, K) array of the objects on the K sites with that label,
+                in each configuration.
+
+        Raises:
+            ValueError: If the number of objects is not the number of sites, or if the number
+                of sites with a label is not the same for every configuration.
+        """
+        objects = np.asarray( objects )
+        if len( objects ) != self.dim:
+            raise ValueError( "there should be one object for each site" )
+        return { label.item(): objects[ self.positions( label ) ] for label in self.labels() }
+
+    def save( self, filename ):
+        """
+        Write this set to disk.
+
+        A filename ending in ``.npz`` is written as a single uncompressed ``.npz`` file.
+        Any other filename is used as a directory, which holds ``vectors.npy`` and ``counts.npy``.
+        Both can be memory-mapped by :meth:`load`.
+
+        Args:
+            filename (str): The file or directory to write.
+
+        Returns:
+            None
+        """
+        if filename.endswith( ".npz" ):
+            temporary = "{}.tmp".format( filename )
+            with open( temporary, "wb" ) as f:
+                np.savez( f, vectors=self.vectors, counts=self.counts )
+            os.replace( temporary, filename )
+        else:
+            os.makedirs( filename, exist_ok=True )
+            np.save( os.path.join( filename, "vectors.npy" ), self.vectors )
+            np.save( os.path.join( filename, "counts.npy" ), self.counts )
+
+    @classmethod
+    def load( cls, filename, mmap_mode=None ):
+        """
+        Read a set written by :meth:`save`.
+
+        Args:
+            filename (str): The ``.npz`` file or directory to read.
+            mmap_mode (str, optional): If set, the arrays are memory-mapped with this mode
+                (see :func:`numpy.load`), and are only read from disk as they are used.
+
+        Returns:
+            (:any:`ConfigurationSet`)
+        """
+        if os.path.isdir( filename ):
+            return cls(
+                np.load( os.path.join( filename, "vectors.npy" ), mmap_mode=mmap_mode ),
+                np.load( os.path.join( filename, "counts.npy" ), mmap_mode=mmap_mode ),
+            )
+        if mmap_mode is not None:
+            return cls( _map_npz_member( filename, "vectors", mmap_mode ), _map_npz_member( filename, "counts", mmap_mode ) )
+        with np.load( filename, allow_pickle=False ) as data:
+            return cls( data[ "vectors" ], data[ "counts" ] )
+
+
+def _compact( vectors ):
+    """Store integer labels in the smallest integer type that holds them."""
+    if vectors.dtype.kind not in "iu" or vectors.size == 0:
+        return vectors
+    low, high = int( vectors.min() ), int( vectors.max() )
+    if low >= 0:
+        dtype = np.min_scalar_type( high )
+    else:
+        dtype = np.result_type( np.min_scalar_type( low ), np.min_scalar_type( -high - 1 ) )
+    return vectors.astype( dtype, copy=False )
+
+
+def _stable_order( keys ):
+    """The stable sorting order of a length M array of keys, or of the rows of an (M, N) array."""
+    if keys.ndim == 2:
+        return np.lexsort( keys.T[ ::-1 ] ) if keys.shape[1] else np.arange( len( keys ) )
+    return np.argsort( keys, kind="stable" )
+
+
+def _map_npz_member( filename, name, mmap_mode ):
+    """
+    Memory-map an array stored without compression in an ``.npz`` file.
+    """
+    with zipfile.ZipFile( filename ) as archive:
+        info = archive.getinfo( "{}.npy".format( name ) )
+    if info.compress_type != zipfile.ZIP_STORED:
+        raise ValueError( "{} is compressed in {}, and cannot be memory-mapped".format( name, filename ) )
+    with open( filename, "rb" ) as f:
+        f.seek( info.header_offset )
+        header = f.read( 30 )
+        name_length = int.from_bytes( header[ 26:28 ], "little" )
+        extra_length = int.from_bytes( header[ 28:30 ], "little" )
+        f.seek( info.header_offset + 30 + name_length + extra_length )
+        version = np.lib.format.read_magic( f )
+        if version == ( 1, 0 ):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0( f )
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0( f )
+        offset = f.tell()
+    return np.memmap( filename, dtype=dtype, mode=mmap_mode, shape=shape,
+                      order="F" if fortran_order else "C", offset=offset )
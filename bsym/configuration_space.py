@@ -1,9 +1,30 @@
 from bsym.permutations import flatten_list, unique_permutations, number_of_unique_permutations
 from bsym import Configuration, SymmetryGroup, SymmetryOperation
+from bsym.configuration_set import ConfigurationSet
+from bsym.symmetry_group import GeneratedSymmetryGroup, SupercellSymmetryGroup, _restrict_index_mappings
+from bsym.polya import count_orbits, count_colourings, composition_polynomial
+from bsym.key_encoding import BytesKeyEncoder, PermutationRankEncoder, KeySet, BitmapKeySet, key_encoder_for
+from bsym.checkpoint import EnumerationCheckpoint, CheckpointWriter, sequence_key, symmetry_group_key
 import numpy as np
-from itertools import combinations_with_replacement
-from collections import Counter
-from tqdm import tqdm, tqdm_notebook
+import os
+import time
+from itertools import combinations_with_replacement, islice
+from collections import Counter, deque
+from functools import partial
+
+BATCH_SIZE = 1024
+"""The default number of candidate configurations screened together.
+Larger batches spread the cost of each array operation over more configurations,
+but hold the images of every configuration in the batch in memory."""
+
+PARALLEL_CHUNKS_PER_WORKER = 8
+"""The number of contiguous rank ranges per worker used for parallel enumeration.
+Splitting the work more finely than one range per worker balances the load when 
+some ranges contain more symmetry inequivalent configurations than others."""
+
+PARALLEL_MAX_CHUNK_SIZE = 2 ** 22
+"""The maximum number of permutations in each rank range used for parallel enumeration.
+Results, progress, and checkpoints are updated as each range is finished."""
 
 class ConfigurationSpace:
 
@@ -22,12 +43,16 @@ class ConfigurationSpace:
         self.dim = len( objects )
         self.objects = objects
         if symmetry_group:
-            for so in symmetry_group.symmetry_operations:
-                if so.matrix.shape[0] != self.dim:
+            if isinstance( symmetry_group, ( GeneratedSymmetryGroup, SupercellSymmetryGroup ) ):
+                if symmetry_group.degree != self.dim:
                     raise ValueError
+            else:
+                for so in symmetry_group.symmetry_operations:
+                    if len( so.index_mapping ) != self.dim:
+                        raise ValueError
             self.symmetry_group = symmetry_group
         else:
-            self.symmetry_group = SymmetryGroup( symmetry_operations=[ SymmetryOperation( np.identity( self.dim, dtype=int ), label='E' ) ] )
+            self.symmetry_group = SymmetryGroup( symmetry_operations=[ SymmetryOperation.from_index_mapping( np.arange( self.dim ), label='E' ) ] )
 
     def __repr__( self ):
         to_return = "ConfigurationSpace\n"
@@ -35,38 +60,181 @@ class ConfigurationSpace:
         to_return += "\n".join( self.symmetry_group.__repr__().split("\n")[1:] )
         return to_return
 
-    def enumerate_configurations( self, generator, verbose=False ):
+    def enumerate_configurations( self, generator, verbose=False, batch_size=BATCH_SIZE, key_encoder=None, seen=None ):
         """
         Find all symmetry inequivalent configurations within the set produced by
         `generator`.
 
+        Candidate configurations are screened in blocks of `batch_size`: the images of
+        every candidate under every symmetry operation are computed in a single array
+        operation, and duplicate orbits within a block are removed without constructing
+        intermediate :any:`Configuration` objects.
+
         Args:
             generator (:obj:`generator`): Generator object, that yields the configurations
                 to search through.
             verbose (opt:default=False): Print verbose output.
+            batch_size (opt:default=BATCH_SIZE): The number of candidate configurations screened together.
+            key_encoder (opt:default=None): The :any:`KeyEncoder` used to record visited configurations.
+                If ``None``, each configuration is keyed by the byte string of its integer values.
+            seen (opt:default=None): The container used to record the keys of visited configurations,
+                e.g. a :any:`KeySet` or :any:`BitmapKeySet`. If ``None``, a new :any:`KeySet` is used.
    
         Returns:
             unique_configurations (list): A list of :any:`Configuration` objects, for each symmetry
                                           inequivalent configuration. 
         """
-        working = True
-        seen = set()
-        unique_configurations = []
-        using_tqdm = hasattr( generator, 'postfix' )
-        for new_permutation in generator:
-            if permutation_as_config_number( new_permutation ) not in seen:
-                config = Configuration.from_tuple( new_permutation )
-                numeric_equivalents = set( config.numeric_equivalents( self.symmetry_group.symmetry_operations ) )
-                config.count = len( numeric_equivalents )
-                [ seen.add( i ) for i in numeric_equivalents ]
-                unique_configurations.append( config )
-                if using_tqdm:
-                    generator.set_postfix( found=len(unique_configurations) )
+        if key_encoder is None:
+            key_encoder = BytesKeyEncoder()
+        if seen is None:
+            seen = KeySet()
+        blocks = self._unique_configuration_blocks( generator, seen, batch_size, key_encoder )
+        unique_configurations = collect_configurations( blocks, generator )
         if verbose:
             print( 'unique configurations: {} / {}'.format( len( unique_configurations ), len( seen ) ) )
         return( unique_configurations )
 
-    def unique_configurations( self, site_distribution, verbose=False, show_progress=False ):
+    def orderly_configurations( self, generator, verbose=False, batch_size=BATCH_SIZE, key_encoder=None ):
+        """
+        Find all symmetry inequivalent configurations within the set produced by
+        `generator`, without recording which configurations have been visited.
+
+        A configuration is kept only if it is the lexicographically smallest member of its orbit
+        under the symmetry group, so memory use does not grow with the number of configurations.
+        `generator` must yield each configuration at most once. If it yields configurations in
+        lexicographic order, as :func:`unique_permutations` does, the results are identical
+        to those from :meth:`enumerate_configurations`.
+
+        Each degeneracy is calculated from the size of the stabilizer subgroup, so the
+        symmetry operations are assumed to be closed and distinct.
+
+        Args:
+            generator (:obj:`generator`): Generator object, that yields the configurations
+                to search through.
+            verbose (opt:default=False): Print verbose output.
+            batch_size (opt:default=BATCH_SIZE): The number of candidate configurations screened together.
+            key_encoder (opt:default=None): The :any:`KeyEncoder` used to order configurations.
+                If ``None``, configurations are ordered by their integer values.
+
+        Returns:
+            unique_configurations (list): A list of :any:`Configuration` objects, for each symmetry
+                                          inequivalent configuration. 
+        """
+        blocks = self._canonical_configuration_blocks( generator, batch_size, key_encoder )
+        unique_configurations = collect_configurations( blocks, generator )
+        if verbose:
+            print( 'unique configurations: {}'.format( len( unique_configurations ) ) )
+        return( unique_configurations )
+
+    def _unique_configuration_blocks( self, generator, seen, batch_size, key_encoder ):
+        """
+        Screen the configurations yielded by `generator` in blocks, and yield the previously
+        unseen symmetry inequivalent configurations found in each block.
+
+        Args:
+            generator (:obj:`generator`): Generator object, that yields the configurations
+                to search through.
+            seen (:any:`KeySet`|:any:`BitmapKeySet`): Keys of every configuration visited so far. Updated in place.
+            batch_size (int): The number of candidate configurations screened together.
+            key_encoder (:any:`KeyEncoder`): The encoder used to generate the keys stored in `seen`.
+
+        Yields:
+            (np.ndarray, np.ndarray): A (M, N) array of new representative configurations, 
+                and a length M array of the number of configurations equivalent to each.
+        """
+        for batch in batched_configurations( generator, batch_size ):
+            unseen = ~seen.contains( key_encoder.encode( batch ) )
+            if not unseen.any():
+                continue
+            candidates = batch[ unseen ]
+            image_keys = self.symmetry_group.orbit_keys( candidates, key_encoder )
+            # Label every image by its position in the sorted set of image keys.
+            # The smallest label in each row then identifies the orbit.
+            _, image_ids = np.unique( image_keys, return_inverse=True )
+            image_ids = image_ids.reshape( image_keys.shape )
+            _, first = np.unique( image_ids.min( axis=1 ), return_index=True )
+            first.sort()
+            sorted_ids = np.sort( image_ids[ first ], axis=1 )
+            counts = 1 + np.count_nonzero( np.diff( sorted_ids, axis=1 ), axis=1 )
+            seen.add( image_keys[ first ] )
+            yield candidates[ first ], counts
+
+    def _canonical_configuration_blocks( self, generator, batch_size, key_encoder ):
+        """
+        Screen the configurations yielded by `generator` in blocks, and yield the configurations in
+        each block that are the lexicographically smallest member of their orbit.
+
+        Args:
+            generator (:obj:`generator`): Generator object, that yields the configurations
+                to search through.
+            batch_size (int): The number of candidate configurations screened together.
+            key_encoder (:any:`KeyEncoder`): The encoder used to order configurations.
+
+        Yields:
+            (np.ndarray, np.ndarray): A (M, N) array of representative configurations, 
+                and a length M array of the number of configurations equivalent to each.
+        """
+        for batch in batched_configurations( generator, batch_size ):
+            canonical, orbit_sizes = self.symmetry_group.canonical_forms( batch, key_encoder )
+            is_canonical = ( canonical == batch ).all( axis=1 )
+            yield batch[ is_canonical ], orbit_sizes[ is_canonical ]
+
+    def _parallel_canonical_configuration_blocks( self, seq, key_encoder, batch_size, executor, n_workers, progress=None,
+                                                  position=None ):
+        """
+        Screen every unique permutation of `seq` for lexicographically smallest orbit members,
+        sharing the work between the workers of `executor`.
+
+        The permutations are split into contiguous ranges of rank, with at least 
+        `PARALLEL_CHUNKS_PER_WORKER` ranges per worker and at most `PARALLEL_MAX_CHUNK_SIZE`
+        permutations in each range. Each range is screened independently, and the results
+        are yielded in rank order, so the output is the same as from :meth:`_canonical_configuration_blocks`.
+
+        Args:
+            seq (list): The objects to be permuted.
+            key_encoder (:any:`KeyEncoder`): The encoder used to order configurations.
+            batch_size (int): The number of candidate configurations screened together.
+            executor (:obj:`concurrent.futures.Executor`): The executor the ranges are submitted to.
+            n_workers (int): The number of workers. At most two ranges per worker are submitted at once.
+            progress (opt:default=None): A `tqdm` progress bar, updated as each range is finished.
+            position (opt:default=None): An :any:`_EnumerationPosition`. If given, only permutations from 
+                this rank onwards are screened, and the rank is updated as each range is finished.
+
+        Yields:
+            (np.ndarray, np.ndarray): A (M, N) array of representative configurations, 
+                and a length M array of the number of configurations equivalent to each.
+        """
+        start = position.rank if position is not None else 0
+        remaining = number_of_unique_permutations( seq ) - start
+        n_chunks = max( PARALLEL_CHUNKS_PER_WORKER * n_workers, -( -remaining // PARALLEL_MAX_CHUNK_SIZE ) )
+        n_chunks = max( 1, min( n_chunks, remaining ) )
+        bounds = ( start + remaining * i // n_chunks for i in range( n_chunks + 1 ) )
+        screen = partial( _canonical_configurations_in_rank_range, self, seq, 
+                          batch_size=batch_size, key_encoder=key_encoder )
+        pending = deque()
+        lower = next( bounds )
+        for upper in bounds:
+            pending.append( ( lower, upper, executor.submit( screen, lower, upper ) ) )
+            lower = upper
+            if len( pending ) < 2 * n_workers:
+                continue
+            yield self._finished_range( pending.popleft(), progress, position )
+        while pending:
+            yield self._finished_range( pending.popleft(), progress, position )
+
+    @staticmethod
+    def _finished_range( submitted, progress, position ):
+        lower, upper, future = submitted
+        block = future.result()
+        if progress is not None:
+            progress.update( upper - lower )
+        if position is not None:
+            position.rank = upper
+        return block
+
+    def unique_configurations( self, site_distribution, verbose=False, show_progress=False, method=None,
+                               n_workers=None, executor=None, checkpoint=None, checkpoint_interval=300,
+                               resume_from=None, batch_size=BATCH_SIZE ):
         """
         Find the symmetry inequivalent configurations for a given population of objects.
 
@@ -82,39 +250,947 @@ class ConfigurationSpace:
             show_progress (opt:default=False): Show a progress bar.
                                       Setting to `True` gives a simple progress bar.
                                       Setting to `"notebook"` gives a Jupyter notebook compatible progress bar.
+            method (opt:default=None): How visited configurations are recorded.
+                                      `'set'` stores a compact key for each visited configuration.
+                                      `'bitmap'` stores one bit for every possible permutation, indexed
+                                      by its rank, and uses a fixed `number_of_unique_permutations / 8` bytes.
+                                      `'orderly'` keeps only the lexicographically smallest configuration in 
+                                      each orbit, and does not record visited configurations
+                                      (see :meth:`orderly_configurations`).
+                                      `'nested'` places one kind of object at a time, each under only the
+                                      symmetry operations that leave the objects already placed unchanged.
+                                      This is a tree of small enumerations, instead of one over every
+                                      arrangement, and suits three or more kinds of object. The
+                                      configurations are the same, but are all held in memory until
+                                      the enumeration is finished.
+                                      Defaults to `'set'`, or to `'orderly'` for parallel enumeration.
+            n_workers (opt:default=None): If set, share the enumeration between this many processes.
+                                      The permutations are split into contiguous ranges of rank, which 
+                                      are screened independently with the `'orderly'` method.
+                                      The results are identical to serial enumeration.
+            executor (opt:default=None): A :obj:`concurrent.futures.Executor` to use for parallel 
+                                      enumeration, instead of creating a :obj:`ProcessPoolExecutor`.
+            checkpoint (opt:default=None): If set, the state of the enumeration is saved to this file
+                                      every `checkpoint_interval` seconds, and when the enumeration finishes
+                                      (see :any:`EnumerationCheckpoint`).
+            checkpoint_interval (opt:default=300): The minimum time in seconds between checkpoints.
+            resume_from (opt:default=None): A checkpoint file to continue the enumeration from. 
+                                      The method, site distribution, and symmetry group must be the same as 
+                                      when the checkpoint was saved. The results include the configurations 
+                                      found before the checkpoint was saved, and are identical to an 
+                                      uninterrupted enumeration.
+            batch_size (opt:default=BATCH_SIZE): The number of candidate configurations screened together.
+
+        Returns:
+            unique_configurations (list): A list of :any:`Configuration` objects, for each symmetry 
+                                          inequivalent configuration. 
+        """
+        method, s, key_encoder = self._enumeration_settings( site_distribution, verbose, method, n_workers, executor )
+        if method != 'nested' and all( option is None for option in [ n_workers, executor, checkpoint, resume_from ] ):
+            generator = self._permutations_generator( s, show_progress )
+            if method == 'orderly':
+                return self.orderly_configurations( generator, verbose=verbose, batch_size=batch_size,
+                                                    key_encoder=key_encoder )
+            seen = BitmapKeySet( key_encoder.size ) if method == 'bitmap' else KeySet()
+            return self.enumerate_configurations( generator, verbose=verbose, batch_size=batch_size,
+                                                  key_encoder=key_encoder, seen=seen )
+        blocks, generator = self._configuration_blocks( s, method, key_encoder, show_progress, n_workers, executor,
+                                                        checkpoint, checkpoint_interval, resume_from, batch_size )
+        unique_configurations = collect_configurations( blocks, generator )
+        if verbose:
+            print( 'unique configurations: {}'.format( len( unique_configurations ) ) )
+        return unique_configurations
+
+    def iter_unique_configurations( self, site_distribution, show_progress=False, method=None,
+                                    n_workers=None, executor=None, checkpoint=None, checkpoint_interval=300,
+                                    resume_from=None, batch_size=BATCH_SIZE ):
+        """
+        Iterate over the symmetry inequivalent configurations for a given population of objects.
+
+        Each configuration is yielded as soon as it has been confirmed as a new orbit representative,
+        so the configurations can be processed while the enumeration continues. The configurations,
+        their order, and their `count` values are the same as from :meth:`unique_configurations`.
+
+        Args:
+            site_distribution (dict): A dictionary that defines the number of each object 
+                                      to be arranged in this system.
+            show_progress (opt:default=False): Show a progress bar.
+            method (opt:default=None): How visited configurations are recorded (see :meth:`unique_configurations`).
+            n_workers (opt:default=None): If set, share the enumeration between this many processes.
+            executor (opt:default=None): A :obj:`concurrent.futures.Executor` to use for parallel enumeration.
+            checkpoint (opt:default=None): If set, the state of the enumeration is saved to this file
+                                      every `checkpoint_interval` seconds.
+            checkpoint_interval (opt:default=300): The minimum time in seconds between checkpoints.
+            resume_from (opt:default=None): A checkpoint file to continue the enumeration from. The 
+                                      configurations found before the checkpoint was saved are yielded first.
+            batch_size (opt:default=BATCH_SIZE): The number of candidate configurations screened together.
+
+        Yields:
+            (:any:`Configuration`): Each symmetry inequivalent configuration, with `count` set.
+        """
+        method, s, key_encoder = self._enumeration_settings( site_distribution, False, method, n_workers, executor )
+        blocks, generator = self._configuration_blocks( s, method, key_encoder, show_progress, n_workers, executor,
+                                                        checkpoint, checkpoint_interval, resume_from, batch_size )
+        yield from iter_configurations( blocks, generator )
+
+    def unique_configuration_set( self, site_distribution, show_progress=False, method=None,
+                                  n_workers=None, executor=None, checkpoint=None, checkpoint_interval=300,
+                                  resume_from=None, batch_size=BATCH_SIZE ):
+        """
+        Find the symmetry inequivalent configurations for a given population of objects,
+        as a compact :any:`ConfigurationSet`.
+
+        The configurations, their order, and their counts are the same as from :meth:`unique_configurations`,
+        but they are stored in a single array, without creating a :any:`Configuration` for each.
+
+        Args:
+            site_distribution (dict): A dictionary that defines the number of each object 
+                                      to be arranged in this system.
+            show_progress (opt:default=False): Show a progress bar.
+            method (opt:default=None): How visited configurations are recorded (see :meth:`unique_configurations`).
+            n_workers (opt:default=None): If set, share the enumeration between this many processes.
+            executor (opt:default=None): A :obj:`concurrent.futures.Executor` to use for parallel enumeration.
+            checkpoint (opt:default=None): If set, the state of the enumeration is saved to this file
+                                      every `checkpoint_interval` seconds.
+            checkpoint_interval (opt:default=300): The minimum time in seconds between checkpoints.
+            resume_from (opt:default=None): A checkpoint file to continue the enumeration from.
+            batch_size (opt:default=BATCH_SIZE): The number of candidate configurations screened together.
+
+        Returns:
+            (:any:`ConfigurationSet`)
+        """
+        method, s, key_encoder = self._enumeration_settings( site_distribution, False, method, n_workers, executor )
+        blocks, generator = self._configuration_blocks( s, method, key_encoder, show_progress, n_workers, executor,
+                                                        checkpoint, checkpoint_interval, resume_from, batch_size )
+        return ConfigurationSet.from_blocks( blocks, len( s ) )
+
+    def sample_configurations( self, site_distribution, n_samples, weighting='uniform', rng=None, batch_size=BATCH_SIZE ):
+        """
+        Draw random symmetry inequivalent configurations for a given population of objects, without
+        enumerating every configuration.
+
+        Candidate configurations are drawn uniformly from every arrangement of the objects, and are 
+        replaced by the lexicographically smallest member of their orbit, which is the configuration 
+        that represents that orbit in :meth:`unique_configurations`. Each candidate costs one pass over 
+        the symmetry operations, with O(N) work for each operation. A candidate lands in an orbit with 
+        probability proportional to the orbit size, so with `weighting='uniform'` each candidate is 
+        kept with a probability of one over its orbit size, and every orbit is then equally likely. 
+        This needs about as many candidates for each sample as there are symmetry operations.
+
+        Samples are drawn independently, so the same configuration can be drawn more than once.
+        The symmetry operations are assumed to be closed and distinct.
+
+        Args:
+            site_distribution (dict): A dictionary that defines the number of each object 
+                                      to be arranged in this system.
+            n_samples (int): The number of configurations to draw.
+            weighting (opt:default='uniform'): `'uniform'` draws every symmetry inequivalent configuration
+                                      with equal probability. `'orbit_size'` draws each with a probability 
+                                      proportional to the number of configurations equivalent to it.
+            rng (opt:default=None): A :obj:`numpy.random.Generator`, or a seed for one. 
+                                      The same seed and `batch_size` give the same samples.
+            batch_size (opt:default=BATCH_SIZE): The number of candidate configurations screened together.
+
+        Returns:
+            (:any:`ConfigurationSet`): The sampled configurations, in the order they were drawn,
+                with the number of configurations equivalent to each.
+        """
+        if weighting not in [ 'uniform', 'orbit_size' ]:
+            raise ValueError( "weighting should be 'uniform' or 'orbit_size'" )
+        rng = np.random.default_rng( rng )
+        s = np.array( flatten_list( [ [ key ] * site_distribution[ key ] for key in site_distribution ] ) )
+        key_encoder = key_encoder_for( site_distribution.keys(), len( s ) )
+        blocks = []
+        remaining = n_samples
+        while remaining > 0:
+            size = batch_size if weighting == 'uniform' else min( batch_size, remaining )
+            candidates = rng.permuted( np.tile( s, ( size, 1 ) ), axis=1 )
+            canonical, orbit_sizes = self.symmetry_group.canonical_forms( candidates, key_encoder )
+            if weighting == 'uniform':
+                keep = rng.random( size ) * orbit_sizes < 1
+                canonical, orbit_sizes = canonical[ keep ][ :remaining ], orbit_sizes[ keep ][ :remaining ]
+            blocks.append( ( canonical, orbit_sizes ) )
+            remaining -= len( canonical )
+        return ConfigurationSet.from_blocks( blocks, len( s ) )
+
+    def constrained_configurations( self, site_distribution, constraints, verbose=False, batch_size=BATCH_SIZE ):
+        """
+        Find the symmetry inequivalent configurations for a given population of objects that satisfy
+        a set of constraints, without generating the configurations that do not.
+
+        Configurations are built one site at a time, depth first, in blocks of partial configurations.
+        Every constraint is checked as each site is assigned (see :mod:`bsym.constraints`), and a partial
+        configuration that fails a constraint is discarded, with every configuration that starts with it.
+        A partial configuration is also discarded if a symmetry operation maps the sites assigned so far
+        onto a lexicographically smaller partial configuration, since no configuration that starts with
+        it can then be the smallest in its orbit.
+
+        The constraints should be unchanged by every symmetry operation, so that either every configuration
+        in an orbit satisfies them or none does. The configurations, their order, and their `count` values
+        are then the same as from :meth:`unique_configurations`, keeping only the configurations that
+        satisfy every constraint.
+
+        Args:
+            site_distribution (dict): A dictionary that defines the number of each object
+                                      to be arranged in this system.
+            constraints (list): Functions called as ``constraint( vectors, site )`` with a (B, site+1) array
+                                      of partial configurations, that return a length B boolean array that
+                                      is `False` for partial configurations that can not satisfy the constraint
+                                      (e.g. :any:`NeighbourExclusion` or :any:`GroupCount`).
+            verbose (opt:default=False): Print verbose output.
+            batch_size (opt:default=BATCH_SIZE): The maximum number of partial configurations extended together.
+
+        Returns:
+            unique_configurations (list): A list of :any:`Configuration` objects, for each symmetry
+                                          inequivalent configuration that satisfies every constraint.
+        """
+        labels = np.unique( np.array( list( site_distribution.keys() ) ) )
+        totals = np.array( [ site_distribution[ label ] for label in labels.tolist() ] )
+        if totals.sum() != self.dim:
+            raise ValueError( 'site_distribution should have {:d} objects'.format( self.dim ) )
+        if self.symmetry_group.has_colour_mappings:
+            raise ValueError( 'constrained enumeration is not supported for colour symmetry groups' )
+        blocks = self._constrained_configuration_blocks( labels, totals, constraints, batch_size )
+        unique_configurations = collect_configurations( ( labels[ codes ], counts ) for codes, counts in blocks )
+        if verbose:
+            print( 'unique configurations: {}'.format( len( unique_configurations ) ) )
+        return unique_configurations
+
+    def _constrained_configuration_blocks( self, labels, totals, constraints, batch_size ):
+        """
+        Depth first search for the constrained configurations, for :meth:`constrained_configurations`.
+
+        Objects are represented by their position in the sorted array of `labels`, and `totals` is the number
+        of each. The constraints are called with the labels themselves. The partial configurations waiting
+        to be extended are kept on a stack of blocks, with the number of each object still to be placed.
+        Each block is extended by every object that remains, in order, so that the configurations are found
+        in lexicographic order.
+
+        The partial configurations are compared with their images one block of symmetry operations at a time
+        (see :func:`_index_mapping_blocks`), so the elements of a :any:`GeneratedSymmetryGroup` or
+        :any:`SupercellSymmetryGroup` are never all held in memory, but are generated again for each
+        block of partial configurations.
+
+        Yields:
+            (np.ndarray, np.ndarray): Blocks of representative configurations, and their orbit sizes.
+        """
+        key_encoder = key_encoder_for( range( len( totals ) ), self.dim )
+        index_mapping_blocks = _index_mapping_blocks( self.symmetry_group )
+        labels_are_codes = np.array_equal( labels, np.arange( len( labels ) ) )
+        stack = [ ( np.empty( ( 1, 0 ), dtype=np.intp ), totals[ np.newaxis, : ] ) ]
+        while stack:
+            prefixes, remaining = stack.pop()
+            site = prefixes.shape[1]
+            if site == self.dim:
+                canonical, orbit_sizes = self.symmetry_group.canonical_forms( prefixes, key_encoder )
+                is_canonical = ( canonical == prefixes ).all( axis=1 )
+                if is_canonical.any():
+                    yield prefixes[ is_canonical ], orbit_sizes[ is_canonical ]
+                continue
+            rows, codes = np.nonzero( remaining > 0 )
+            children = np.column_stack( [ prefixes[ rows ], codes ] )
+            left = remaining[ rows ]
+            left[ np.arange( len( rows ) ), codes ] -= 1
+            keep = np.ones( len( children ), dtype=bool )
+            for constraint in constraints:
+                vectors = children[ keep ] if labels_are_codes else labels[ children[ keep ] ]
+                keep[ keep ] = constraint( vectors, site )
+            if site + 1 < self.dim:
+                for index_mappings in index_mapping_blocks():
+                    if not keep.any():
+                        break
+                    keep[ keep ] = _could_be_canonical( children[ keep ], index_mappings )
+            children, left = children[ keep ], left[ keep ]
+            for start in reversed( range( 0, len( children ), batch_size ) ):
+                stack.append( ( children[ start:start + batch_size ], left[ start:start + batch_size ] ) )
+
+    def unique_sublattice_configurations( self, sublattices, verbose=False, show_progress=False, method=None,
+                                          batch_size=BATCH_SIZE ):
+        """
+        Find the symmetry inequivalent configurations when each of several sublattices has its own 
+        population of objects.
+
+        Objects are only arranged over the sites of their own sublattice, so the configurations screened
+        are the product of the arrangements on each sublattice, rather than every arrangement of all the objects.
+        Every symmetry operation must map each sublattice onto itself.
+
+        If the sites of each sublattice follow the sites of the sublattice before it, configurations are
+        screened in lexicographic order, and the configurations, their order, and their `count` values are
+        the same for each method.
+
+        Args:
+            sublattices (list): A list of `( sites, site_distribution )` pairs, giving the sites of each
+                                      sublattice, counting from zero, and the number of each object to be
+                                      arranged over them. Every site must be in exactly one sublattice.
+
+                                      e.g. for a system with six sites, with one `2` on the first two sites,
+                                      and two `1` on the other four::
+
+                                          [ ( [ 0, 1 ], { 2: 1, 0: 1 } ), ( [ 2, 3, 4, 5 ], { 1: 2, 0: 2 } ) ]
+            verbose (opt:default=False): Print verbose output.
+            show_progress (opt:default=False): Show a progress bar.
+            method (opt:default=None): `'set'` or `'orderly'` (see :meth:`unique_configurations`).
+                                      Defaults to `'set'`.
+            batch_size (opt:default=BATCH_SIZE): The number of candidate configurations screened together.
 
         Returns:
             unique_configurations (list): A list of :any:`Configuration` objects, for each symmetry 
                                           inequivalent configuration. 
+
+        Raises:
+            ValueError: If the sublattices do not contain every site once, if a site distribution does not 
+                have one object for each site of its sublattice, or if a symmetry operation maps a site
+                onto a different sublattice.
         """
+        blocks, generator = self._sublattice_configuration_blocks( sublattices, verbose, show_progress, method,
+                                                                   batch_size )
+        unique_configurations = collect_configurations( blocks, generator )
+        if verbose:
+            print( 'unique configurations: {}'.format( len( unique_configurations ) ) )
+        return unique_configurations
+
+    def iter_unique_sublattice_configurations( self, sublattices, show_progress=False, method=None,
+                                               batch_size=BATCH_SIZE ):
+        """
+        Iterate over the symmetry inequivalent configurations when each of several sublattices has its own 
+        population of objects.
+
+        The configurations, their order, and their `count` values are the same as from 
+        :meth:`unique_sublattice_configurations`.
+
+        Args:
+            sublattices (list): A list of `( sites, site_distribution )` pairs, giving the sites of each
+                                      sublattice and the number of each object to be arranged over them.
+            show_progress (opt:default=False): Show a progress bar.
+            method (opt:default=None): `'set'` or `'orderly'` (see :meth:`unique_configurations`).
+            batch_size (opt:default=BATCH_SIZE): The number of candidate configurations screened together.
+
+        Yields:
+            (:any:`Configuration`): Each symmetry inequivalent configuration, with `count` set.
+        """
+        blocks, generator = self._sublattice_configuration_blocks( sublattices, False, show_progress, method,
+                                                                   batch_size )
+        yield from iter_configurations( blocks, generator )
+
+    def _sublattice_configuration_blocks( self, sublattices, verbose, show_progress, method, batch_size=BATCH_SIZE ):
+        """
+        Check a set of sublattices, and set up the screening of every product of their arrangements, 
+        for :meth:`unique_sublattice_configurations`.
+
+        Returns:
+            (:obj:`generator`, :obj:`generator`): A generator that yields blocks of representative 
+                configurations and their counts, and the configurations generator.
+        """
+        if method is None:
+            method = 'set'
+        if method not in [ 'set', 'orderly' ]:
+            raise ValueError( "method should be 'set' or 'orderly'" )
+        sites = [ [ int( i ) for i in s ] for s, _ in sublattices ]
+        seqs = [ flatten_list( [ [ key ] * d[ key ] for key in d ] ) for _, d in sublattices ]
+        if sorted( flatten_list( sites ) ) != list( range( self.dim ) ):
+            raise ValueError( 'every site should be in exactly one sublattice' )
+        if any( len( s ) != len( seq ) for s, seq in zip( sites, seqs ) ):
+            raise ValueError( 'each site distribution should have one object for each site of its sublattice' )
+        membership = np.empty( self.dim, dtype=int )
+        for k, s in enumerate( sites ):
+            membership[ s ] = k
+        for index_mappings in self.symmetry_group.iter_index_mappings():
+            if ( membership[ index_mappings ] != membership ).any():
+                raise ValueError( 'every symmetry operation should map each sublattice onto itself' )
+        key_encoder = key_encoder_for( flatten_list( [ list( d.keys() ) for _, d in sublattices ] ), self.dim )
+        total = 1
+        for seq in seqs:
+            total *= number_of_unique_permutations( seq )
+        if verbose:
+            print( 'total number of sites: ' + str( self.dim ) )
+            print( 'using {:d} symmetry operations.'.format( self.symmetry_group.size ) )
+            print( 'evaluating {:d} sublattice arrangements.'.format( total ) )
+        generator = sublattice_permutations( seqs, sites )
+        if show_progress:
+            progress_bar = progress_bar_class( show_progress )
+            generator = progress_bar( generator, total=total, unit=' permutations' )
+        if method == 'orderly':
+            blocks = self._canonical_configuration_blocks( generator, batch_size, key_encoder )
+        else:
+            blocks = self._unique_configuration_blocks( generator, KeySet(), batch_size, key_encoder )
+        return blocks, generator
+
+    def _configuration_blocks( self, seq, method, key_encoder, show_progress=False, n_workers=None, executor=None,
+                               checkpoint=None, checkpoint_interval=300, resume_from=None, batch_size=BATCH_SIZE ):
+        """
+        Set up the screening of every unique permutation of `seq`, for :meth:`unique_configurations`
+        and :meth:`iter_unique_configurations`.
+
+        Returns:
+            (:obj:`generator`, :obj:`generator`): A generator that yields blocks of representative 
+                configurations and their counts, and the permutations generator for serial enumeration
+                (or `None` for parallel enumeration).
+        """
+        if method == 'nested':
+            if checkpoint is not None or resume_from is not None:
+                raise ValueError( "checkpoints are not supported with method='nested'" )
+            if self.symmetry_group.has_colour_mappings:
+                raise ValueError( "method='nested' is not supported for colour symmetry groups" )
+            return self._nested_configuration_blocks( seq, show_progress, batch_size ), None
+        saved = None
+        if checkpoint is not None or resume_from is not None:
+            group_key = symmetry_group_key( self.symmetry_group )
+        if resume_from is not None:
+            saved = EnumerationCheckpoint.load( resume_from )
+            saved.check_matches( method, sequence_key( seq ), group_key )
+        position = _EnumerationPosition( saved.position if saved is not None else 0 )
+        seen = None
+        generator = None
+        if n_workers is not None or executor is not None:
+            blocks = self._parallel_configuration_blocks( seq, key_encoder, show_progress, n_workers, executor, position,
+                                                          batch_size )
+        else:
+            generator = self._permutations_generator( seq, show_progress, position )
+            if method == 'orderly':
+                blocks = self._canonical_configuration_blocks( generator, batch_size, key_encoder )
+            else:
+                seen = BitmapKeySet( key_encoder.size ) if method == 'bitmap' else KeySet()
+                if saved is not None:
+                    _restore_visited( seen, saved, self.symmetry_group, key_encoder, batch_size )
+                blocks = self._unique_configuration_blocks( generator, seen, batch_size, key_encoder )
+        if saved is None and checkpoint is None:
+            return blocks, generator
+        if saved is None:
+            saved = EnumerationCheckpoint( method, sequence_key( seq ), group_key, 0,
+                                           vectors=np.empty( ( 0, len( seq ) ), dtype=np.array( seq ).dtype ),
+                                           counts=np.empty( 0, dtype=int ) )
+        blocks = _checkpointed_blocks( blocks, saved, checkpoint, checkpoint_interval, position, seen )
+        return blocks, generator
+
+    def _nested_configuration_blocks( self, seq, show_progress=False, batch_size=BATCH_SIZE ):
+        """
+        Find one configuration from each orbit by placing one kind of object at a time, for `method='nested'`.
+
+        The unique placements of the least numerous object are found under the full symmetry group. For each
+        of these, the placements of the next object on the remaining sites are found under only the 
+        symmetry operations that leave the first placement unchanged, and so on, until the most numerous 
+        object fills the sites that are left. Each orbit is reached exactly once, and the search is a tree
+        of small enumerations instead of one over every arrangement of the objects. Once no symmetry 
+        operation is left, every remaining arrangement is in a different orbit, and is not screened.
+
+        Each configuration found is then replaced by the lexicographically smallest member of its orbit,
+        and the configurations are sorted, so the results are the same as for the other methods. 
+        Every configuration is held in memory until the search is finished. Orbit sizes are calculated
+        from the size of the stabilizer subgroup, so the symmetry operations are assumed to be closed and distinct.
+        The group is only passed over in blocks of symmetry operations, so the elements of a lazily generated
+        group are never all held in memory.
+
+        Args:
+            seq (list): The objects to be arranged.
+            show_progress (opt:default=False): Show a progress bar for the placements of the first object.
+            batch_size (opt:default=BATCH_SIZE): The number of placements screened together.
+
+        Yields:
+            (np.ndarray, np.ndarray): A (M, N) array of representative configurations, in lexicographic order,
+                and a length M array of the number of configurations equivalent to each.
+        """
+        labels, codes = np.unique( np.array( seq ), return_inverse=True )
+        totals = np.bincount( codes, minlength=len( labels ) )
+        placements = sorted( enumerate( totals.tolist() ), key=lambda placement: placement[1] )
+        key_encoder = key_encoder_for( range( len( labels ) ), self.dim )
+        progress = None
+        if show_progress and len( placements ) > 1:
+            progress_bar = progress_bar_class( show_progress )
+            first = [ 1 ] * placements[0][1] + [ 0 ] * ( self.dim - placements[0][1] )
+            progress = partial( progress_bar, total=number_of_unique_permutations( first ), unit=' placements' )
+        vectors, counts = [], []
+        index_mapping_blocks = _index_mapping_blocks( self.symmetry_group )
+        for block in _nested_placements( index_mapping_blocks, placements, batch_size, progress ):
+            canonical, orbit_sizes = self.symmetry_group.canonical_forms( block, key_encoder )
+            vectors.append( canonical )
+            counts.append( orbit_sizes )
+        vectors, counts = np.concatenate( vectors ), np.concatenate( counts )
+        order = np.argsort( key_encoder.encode( vectors ), kind='stable' )
+        yield labels[ vectors[ order ] ], counts[ order ]
+
+    def _enumeration_settings( self, site_distribution, verbose, method, n_workers, executor ):
+        """
+        Check the enumeration method for a given population of objects, and choose a key encoder.
+
+        Returns:
+            (str, list, :any:`KeyEncoder`): The enumeration method, the objects to be permuted,
+                and the encoder used to order or record configurations.
+        """
+        parallel = n_workers is not None or executor is not None
+        if method is None:
+            method = 'orderly' if parallel else 'set'
+        if parallel and method != 'orderly':
+            raise ValueError( "parallel enumeration requires method='orderly'" )
         s = flatten_list( [ [ key ] * site_distribution[ key ] for key in site_distribution ] )
-        total_permutations = number_of_unique_permutations( s )
         if verbose:
             print( 'total number of sites: ' + str( sum( site_distribution.values() ) ) )
-            print( 'using {:d} symmetry operations.'.format( len( self.symmetry_group.symmetry_operations ) ) )
-            print( 'evaluating {:d} unique permutations.'.format( total_permutations ) )
-        generator = unique_permutations( s )
+            print( 'using {:d} symmetry operations.'.format( self.symmetry_group.size ) )
+            print( 'evaluating {:d} unique permutations.'.format( number_of_unique_permutations( s ) ) )
+        if method in [ 'set', 'orderly', 'nested' ]:
+            key_encoder = key_encoder_for( site_distribution.keys(), len( s ) )
+        elif method == 'bitmap':
+            key_encoder = PermutationRankEncoder( s )
+        else:
+            raise ValueError( "method should be 'set', 'bitmap', 'orderly', or 'nested'" )
+        return method, s, key_encoder
+
+    def _permutations_generator( self, seq, show_progress, position=None ):
+        if position is None:
+            generator = unique_permutations( seq )
+            initial = 0
+        else:
+            generator = position.track( unique_permutations( seq, position.rank ) )
+            initial = position.rank
         if show_progress:
-            if show_progress=='notebook':
-                generator = tqdm_notebook( generator, total=total_permutations, unit=' permutations' )
-            else:
-                generator = tqdm( generator, total=total_permutations, unit=' permutations' )
-        return self.enumerate_configurations( generator, verbose=verbose )
+            progress_bar = progress_bar_class( show_progress )
+            generator = progress_bar( generator, total=number_of_unique_permutations( seq ), initial=initial,
+                                      unit=' permutations' )
+        return generator
+
+    def _parallel_configuration_blocks( self, seq, key_encoder, show_progress, n_workers, executor, position=None,
+                                        batch_size=BATCH_SIZE ):
+        """
+        Run :meth:`_parallel_canonical_configuration_blocks`, creating a :obj:`ProcessPoolExecutor`
+        if no `executor` is given, and shutting it down when the enumeration is finished or abandoned.
+        """
+        progress = None
+        if show_progress:
+            progress_bar = progress_bar_class( show_progress )
+            progress = progress_bar( total=number_of_unique_permutations( seq ), unit=' permutations',
+                                     initial=position.rank if position is not None else 0 )
+        own_executor = executor is None
+        if own_executor:
+            from concurrent.futures import ProcessPoolExecutor
+            executor = ProcessPoolExecutor( max_workers=n_workers )
+        if n_workers is None:
+            n_workers = os.cpu_count() or 1
+        try:
+            yield from self._parallel_canonical_configuration_blocks( seq, key_encoder, batch_size=batch_size,
+                                                                      executor=executor, n_workers=n_workers,
+                                                                      progress=progress, position=position )
+        finally:
+            if own_executor:
+                executor.shutdown( cancel_futures=True )
+            if progress is not None:
+                progress.close()
+
+    def number_of_unique_configurations( self, site_distribution ):
+        """
+        Count the symmetry inequivalent configurations for a given population of objects,
+        without enumerating them.
+
+        The count is calculated from the cycle structure of each symmetry operation, using
+        Burnside's lemma, and is equal to ``len( self.unique_configurations( site_distribution ) )``.
+
+        Args:
+            site_distribution (dict): A dictionary that defines the number of each object 
+                                      to be arranged in this system.
+
+        Returns:
+            (int): The number of symmetry inequivalent configurations.
 
-    def unique_colourings( self, colours, verbose=False ):
+        Raises:
+            ValueError: If the symmetry group is a :any:`ColourSymmetryGroup`, or the symmetry operations
+                do not form a group.
+        """
+        if self.symmetry_group.has_colour_mappings:
+            raise ValueError( 'counting without enumerating is not supported for colour symmetry groups' )
+        return count_orbits( self.symmetry_group.cycle_index(), list( site_distribution.values() ) )
+
+    def composition_polynomial( self, labels ):
+        """
+        Count the symmetry inequivalent configurations for every possible population of a set of objects,
+        without enumerating them.
+
+        Args:
+            labels (list): The objects that may be arranged zero or more times in this system.
+
+        Returns:
+            (dict): A dictionary mapping each site distribution, as a tuple giving the number of each
+                    object in the same order as `labels`, to the number of symmetry inequivalent configurations.
+
+        Example:
+            >>> ConfigurationSpace( objects=[ 'a', 'b' ] ).composition_polynomial( [ 1, 0 ] )
+            {(2, 0): 1, (1, 1): 2, (0, 2): 1}
+
+        Raises:
+            ValueError: If the symmetry group is a :any:`ColourSymmetryGroup`, or the symmetry operations
+                do not form a group.
+        """
+        if self.symmetry_group.has_colour_mappings:
+            raise ValueError( 'counting without enumerating is not supported for colour symmetry groups' )
+        return composition_polynomial( self.symmetry_group.cycle_index(), len( labels ) )
+
+    def number_of_unique_colourings( self, colours ):
+        """
+        Count the symmetry inequivalent colourings for a given set of 'colours', without enumerating them.
+
+        This is equal to ``len( self.unique_colourings( colours ) )``.
+
+        Args:
+            colours (list): A list of each object that may be arranged zero or more times in this system.
+
+        Returns:
+            (int): The number of symmetry inequivalent colourings.
+
+        Raises:
+            ValueError: If the symmetry group is a :any:`ColourSymmetryGroup`, or the symmetry operations
+                do not form a group.
+        """
+        if self.symmetry_group.has_colour_mappings:
+            raise ValueError( 'counting without enumerating is not supported for colour symmetry groups' )
+        return count_colourings( self.symmetry_group.cycle_index(), len( colours ) )
+
+    def unique_colourings( self, colours, verbose=False, batch_size=BATCH_SIZE ):
         """
         Find the symmetry inequivalent colourings for a given number of 'colours'.
 
         Args:
             colours (list): A list of each object that may be arranged zero or more times in this system.
             verbose (opt:default=False): Print verbose output.
+            batch_size (opt:default=BATCH_SIZE): The number of candidate colourings screened together.
 
         Returns:
             unique_colours (list): A list of :any:`Configuration` objects, for each symmetry
                                    inequivalent colouring.
         """
         generator = colourings_generator( colours, self.dim )
-        return self.enumerate_configurations( generator, verbose=verbose )
+        key_encoder = key_encoder_for( colours, self.dim )
+        return self.enumerate_configurations( generator, verbose=verbose, batch_size=batch_size, key_encoder=key_encoder )
+
+    def iter_unique_colourings( self, colours, batch_size=BATCH_SIZE ):
+        """
+        Iterate over the symmetry inequivalent colourings for a given set of 'colours'.
+
+        Each colouring is yielded as soon as it has been confirmed as a new orbit representative.
+        The colourings, their order, and their `count` values are the same as from :meth:`unique_colourings`.
+
+        Args:
+            colours (list): A list of each object that may be arranged zero or more times in this system.
+            batch_size (opt:default=BATCH_SIZE): The number of candidate colourings screened together.
+
+        Yields:
+            (:any:`Configuration`): Each symmetry inequivalent colouring, with `count` set.
+        """
+        generator = colourings_generator( colours, self.dim )
+        key_encoder = key_encoder_for( colours, self.dim )
+        blocks = self._unique_configuration_blocks( generator, KeySet(), batch_size, key_encoder )
+        yield from iter_configurations( blocks )
+
+def iter_configurations( blocks, generator=None ):
+    """
+    Iterate over :any:`Configuration` objects built from blocks of representative configurations.
+
+    Args:
+        blocks (:obj:`generator`): Yields pairs of (M, N) arrays of configuration vectors and
+            length M arrays of the number of configurations equivalent to each.
+        generator (opt:default=None): The generator the blocks are taken from. If this is a 
+            `tqdm` progress bar, it is updated with the number of configurations found.
+
+    Yields:
+        (:any:`Configuration`): Each configuration, with `count` set.
+    """
+    found = 0
+    using_tqdm = hasattr( generator, 'postfix' )
+    for vectors, counts in blocks:
+        for vector, count in zip( vectors, counts ):
+            config = Configuration( vector )
+            config.count = int( count )
+            yield config
+        found += len( vectors )
+        if using_tqdm:
+            generator.set_postfix( found=found )
+
+def collect_configurations( blocks, generator=None ):
+    """
+    Build a list of :any:`Configuration` objects from blocks of representative configurations.
+
+    Args:
+        blocks (:obj:`generator`): Yields pairs of (M, N) arrays of configuration vectors and
+            length M arrays of the number of configurations equivalent to each.
+        generator (opt:default=None): The generator the blocks are taken from. If this is a 
+            `tqdm` progress bar, it is updated with the number of configurations found.
+
+    Returns:
+        (list): A list of :any:`Configuration` objects, with `count` set.
+    """
+    return list( iter_configurations( blocks, generator ) )
+
+class _EnumerationPosition:
+    """
+    The rank of the next unique permutation to be screened.
+    """
+
+    def __init__( self, rank=0 ):
+        self.rank = rank
+
+    def track( self, generator ):
+        """
+        Pass on the items yielded by `generator`, advancing the rank by one for each item.
+        """
+        for item in generator:
+            self.rank += 1
+            yield item
+
+def _restore_visited( seen, saved, symmetry_group, key_encoder, batch_size ):
+    """
+    Restore the record of visited configurations from a checkpoint.
+
+    The bits of a :any:`BitmapKeySet` are saved in the checkpoint. For a :any:`KeySet`, the visited
+    configurations are the orbits of the saved representatives, and their keys are found again,
+    unless the checkpoint holds them.
+
+    Args:
+        seen (:any:`KeySet`|:any:`BitmapKeySet`): An empty set of visited configurations. Updated in place.
+        saved (:any:`EnumerationCheckpoint`): The checkpoint.
+        symmetry_group (:any:`SymmetryGroup`): The symmetry group of the enumeration.
+        key_encoder (:any:`KeyEncoder`): The encoder used to generate the keys stored in `seen`.
+        batch_size (int): The number of representatives whose orbits are found together.
+
+    Returns:
+        None
+    """
+    if isinstance( seen, BitmapKeySet ):
+        if saved.visited.shape != seen.bits.shape:
+            raise ValueError( 'checkpoint does not match the number of permutations' )
+        seen.bits[:] = saved.visited
+    elif saved.visited is not None:
+        seen.add( saved.visited )
+    else:
+        for start in range( 0, len( saved.vectors ), batch_size ):
+            seen.add( symmetry_group.orbit_keys( saved.vectors[ start:start + batch_size ], key_encoder ) )
+
+def _checkpointed_blocks( blocks, saved, checkpoint, checkpoint_interval, position, seen ):
+    """
+    Pass on blocks of representative configurations, first yielding those found before `saved` was
+    written, and saving the state of the enumeration to `checkpoint` at regular intervals.
+    Each save only writes the representatives found since the previous one (see :any:`CheckpointWriter`).
+
+    Args:
+        blocks (:obj:`generator`): Yields blocks of new representative configurations and their counts.
+        saved (:any:`EnumerationCheckpoint`): The state of the enumeration before `blocks` was started.
+        checkpoint (str|None): The file to save checkpoints to. If `None`, no checkpoints are saved.
+        checkpoint_interval (float): The minimum time in seconds between checkpoints.
+        position (:any:`_EnumerationPosition`): The position of the enumeration.
+        seen (:any:`KeySet`|:any:`BitmapKeySet`|None): The record of visited configurations, if any.
+
+    Yields:
+        (np.ndarray, np.ndarray): A (M, N) array of representative configurations, 
+            and a length M array of the number of configurations equivalent to each.
+    """
+    writer = CheckpointWriter( checkpoint, saved ) if checkpoint is not None else None
+    def save():
+        writer.save( position.rank, seen.bits if isinstance( seen, BitmapKeySet ) else None )
+    if len( saved.counts ):
+        yield saved.vectors, saved.counts
+    last_saved = time.monotonic()
+    for block in blocks:
+        yield block
+        if writer is None:
+            continue
+        writer.add( *block )
+        if time.monotonic() - last_saved >= checkpoint_interval:
+            save()
+            last_saved = time.monotonic()
+    if writer is not None:
+        save()
+
+def _canonical_configurations_in_rank_range( configuration_space, seq, start, stop, batch_size, key_encoder ):
+    """
+    Find the lexicographically smallest orbit members among the unique permutations of `seq`
+    with ranks from `start` up to `stop`. Defined at module level so it can be sent to worker processes.
+
+    Returns:
+        (np.ndarray, np.ndarray): A (M, N) array of representative configurations, 
+            and a length M array of the number of configurations equivalent to each.
+    """
+    generator = unique_permutations( seq, start, stop )
+    blocks = list( configuration_space._canonical_configuration_blocks( generator, batch_size, key_encoder ) )
+    if not blocks:
+        return np.empty( ( 0, len( seq ) ), dtype=int ), np.empty( 0, dtype=int )
+    vectors, counts = zip( *blocks )
+    return np.concatenate( vectors ), np.concatenate( counts )
+
+def _index_mapping_blocks( symmetry_group ):
+    """
+    A function that iterates over the index mappings of a symmetry group in blocks, for searches that
+    pass over the group many times.
+
+    A group that yields its index mappings as a single block is held as that block, so the array is
+    only built once. Otherwise each pass calls ``symmetry_group.iter_index_mappings()`` again, so the 
+    elements of a lazily generated group are never all held in memory.
+
+    Args:
+        symmetry_group (:any:`SymmetryGroup`): The symmetry group.
+
+    Returns:
+        (function): A function with no arguments, that returns an iterable of (M, N) arrays of index mappings.
+    """
+    blocks = symmetry_group.iter_index_mappings()
+    first = next( blocks )
+    if next( blocks, None ) is None:
+        return partial( iter, [ first ] )
+    return symmetry_group.iter_index_mappings
+
+def _could_be_canonical( prefixes, index_mappings, block_entries=2 ** 22 ):
+    """
+    Check whether each of a block of partial configurations could be the start of a configuration
+    that is the lexicographically smallest in its orbit.
+
+    The image of a configuration under a symmetry operation is known at the leading positions that
+    are mapped from assigned sites. A partial configuration is rejected if, for any symmetry operation,
+    the known part of its image first differs from it with a smaller label.
+
+    Args:
+        prefixes (np.ndarray): A (B, D) array of the labels on the first D sites.
+        index_mappings (np.ndarray): A (G, N) array of index mappings.
+        block_entries (opt:default=2**22): The approximate number of image labels compared together.
+
+    Returns:
+        (np.ndarray): A length B boolean array.
+    """
+    n_prefixes, length = prefixes.shape
+    keep = np.ones( n_prefixes, dtype=bool )
+    if not n_prefixes:
+        return keep
+    known = index_mappings[ :, :length ] < length
+    known_lengths = np.where( known.all( axis=1 ), length, known.argmin( axis=1 ) )
+    useful = known_lengths > 0
+    if not useful.any():
+        return keep
+    known_lengths = known_lengths[ useful ]
+    width = known_lengths.max()
+    valid = np.arange( width ) < known_lengths[ :, np.newaxis ]
+    mappings = np.where( valid, index_mappings[ useful, :width ], 0 )
+    rows = np.arange( n_prefixes )[ :, np.newaxis ]
+    block_size = max( 1, block_entries // ( n_prefixes * width ) )
+    for start in range( 0, len( mappings ), block_size ):
+        images = prefixes[ :, mappings[ start:start + block_size ] ]
+        differ = ( images != prefixes[ :, np.newaxis, :width ] ) & valid[ start:start + block_size ]
+        first = differ.argmax( axis=2 )
+        found = np.take_along_axis( differ, first[ ..., np.newaxis ], axis=2 )[ ..., 0 ]
+        image_labels = np.take_along_axis( images, first[ ..., np.newaxis ], axis=2 )[ ..., 0 ]
+        keep &= ~( found & ( image_labels < prefixes[ rows, first ] ) ).any( axis=1 )
+    return keep
+
+def batched_configurations( generator, batch_size ):
+    """
+    Collect the configuration vectors yielded by a generator into blocks.
+
+    Args:
+        generator (:obj:`generator`): Generator object, that yields configuration vectors.
+        batch_size (int): The maximum number of configurations in each block.
+
+    Yields:
+        (np.ndarray): A (B, N) array of configuration vectors, with B <= `batch_size`.
+    """
+    iterator = iter( generator )
+    while True:
+        batch = list( islice( iterator, batch_size ) )
+        if not batch:
+            return
+        yield np.array( batch )
+
+def progress_bar_class( show_progress ):
+    """
+    The `tqdm` progress bar class for a `show_progress` option.
+
+    `tqdm` is only imported when a progress bar is first needed, so that it is 
+    not loaded by ``import bsym``.
+
+    Args:
+        show_progress (bool or str): `"notebook"` for a Jupyter notebook compatible progress bar,
+            or any other true value for a simple progress bar.
+
+    Returns:
+        (type): `tqdm_notebook` or `tqdm`.
+    """
+    if show_progress == 'notebook':
+        from tqdm import tqdm_notebook
+        return tqdm_notebook
+    from tqdm import tqdm
+    return tqdm
+
+def _nested_placements( index_mapping_blocks, placements, batch_size, progress=None ):
+    """
+    Yield one arrangement from each orbit of a set of objects under a group, by placing one kind
+    of object at a time under the stabilizer of the objects already placed.
+
+    The placements of the first object are screened against the group one block of index mappings
+    at a time, and the stabilizer of each is collected from every block, so the group itself is
+    never held as a single array. The stabilizers are usually much smaller than the group, and are
+    held as arrays for the placements of the objects that follow.
+
+    Args:
+        index_mapping_blocks (function): A function with no arguments, that returns an iterable of 
+            (M, R) arrays of the index mappings of the group (see :func:`_index_mapping_blocks`).
+        placements (list[tuple]): An `( object, number )` pair for each kind of object, in the order they
+            are placed. The last kind fills the sites that are left.
+        batch_size (int): The number of placements screened together.
+        progress (opt:default=None): A function that wraps the generator of placements of the first object,
+            e.g. to show a progress bar.
+
+    Yields:
+        (np.ndarray): A (B, R) array of arrangements.
+    """
+    blocks = iter( index_mapping_blocks() )
+    first = next( blocks )
+    n_sites = first.shape[1]
+    if len( placements ) == 1 or ( len( first ) == 1 and next( blocks, None ) is None ):
+        seq = flatten_list( [ [ label ] * n for label, n in placements ] )
+        yield from batched_configurations( unique_permutations( seq ), batch_size )
+        return
+    label, n = placements[0]
+    generator = unique_permutations( [ 0 ] * ( n_sites - n ) + [ 1 ] * n )
+    if progress is not None:
+        generator = progress( generator )
+    for batch in batched_configurations( generator, batch_size ):
+        keep = np.ones( len( batch ), dtype=bool )
+        stabilizers = [ [] for _ in batch ]
+        for index_mappings in index_mapping_blocks():
+            keep[ keep ] = _could_be_canonical( batch[ keep ], index_mappings )
+            for b in np.flatnonzero( keep ):
+                stabilizers[ b ].append( index_mappings[ ( batch[ b ][ index_mappings ] == batch[ b ] ).all( axis=1 ) ] )
+        for b in np.flatnonzero( keep ):
+            placement = batch[ b ]
+            stabilizer = np.concatenate( stabilizers[ b ] )
+            placed = placement == 1
+            others = np.flatnonzero( ~placed )
+            restricted = np.unique( _restrict_index_mappings( stabilizer, others ), axis=0 )
+            for block in _nested_placements( partial( iter, [ restricted ] ), placements[ 1: ], batch_size ):
+                vectors = np.empty( ( len( block ), n_sites ), dtype=block.dtype )
+                vectors[ :, placed ] = label
+                vectors[ :, others ] = block
+                yield vectors
+
+def sublattice_permutations( seqs, sites ):
+    """
+    Yield every configuration formed by arranging each of a set of sequences over its own sites.
+
+    The unique permutations of each sequence are taken in lexicographic order, with the first sequence 
+    varying slowest, so if the sites of each sublattice follow those of the sublattice before it, the
+    configurations are yielded in lexicographic order.
+
+    Args:
+        seqs (list[list]): The objects to arrange over each sublattice.
+        sites (list[list[int]]): The sites of each sublattice. Together these should contain every site once.
+
+    Yields:
+        (list): Each configuration.
+    """
+    order = flatten_list( [ list( s ) for s in sites ] )
+    inverse = np.argsort( order ).tolist()
+    in_order = inverse == list( range( len( order ) ) )
+    for values in _concatenated_permutations( seqs ):
+        yield values if in_order else [ values[ i ] for i in inverse ]
+
+def _concatenated_permutations( seqs ):
+    if not seqs:
+        yield []
+        return
+    for head in unique_permutations( seqs[0] ):
+        for tail in _concatenated_permutations( seqs[1:] ):
+            yield head + tail
 
 def colourings_generator( colours, dim ):
     for s in combinations_with_replacement( colours, dim ):
@@ -125,6 +1201,11 @@ def permutation_as_config_number( p ):
     """
     A numeric representation of a numeric list.
 
+    Notes:
+        This representation is only unique for lists of single digit integers, e.g. 
+        ``[ 1, 10 ]`` and ``[ 11, 0 ]`` give the same number. Use a :any:`KeyEncoder` 
+        from :any:`bsym.key_encoding` for collision-free keys.
+
     Example:
         >>> permutation_as_config_number( [ 1, 1, 0, 0, 1 ] )
         11001
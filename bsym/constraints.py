@@ -0,0 +1,135 @@
+"""
+Constraints on configurations, for enumerating only the configurations that satisfy them
+(see :meth:`ConfigurationSpace.constrained_configurations`).
+
+Sites are assigned one at a time, in order, and each constraint is checked as each site is assigned.
+A constraint is called with a block of partial configurations, as a (B, d + 1) array of the labels on
+sites ``0 .. d`` just after site ``d`` has been assigned, and the site ``d``. It returns a length B boolean
+array that is ``False`` for every partial configuration that can not be completed to satisfy the constraint,
+so that every configuration that starts with it is skipped. A constraint only needs to check the
+conditions that involve site ``d`` and earlier sites: conditions on earlier sites alone were
+checked when those sites were assigned. Any function with this signature can be used as a constraint.
+
+Constraints should be unchanged by every symmetry operation of the configuration space, as distance-based
+constraints are, so that either every configuration in an orbit satisfies a constraint, or none does.
+"""
+
+import numpy as np
+
+
+class NeighbourExclusion:
+    """
+    No two neighbouring sites may both hold one of a set of labels,
+    e.g. no two dopants within a cutoff distance.
+
+    e.g.::
+
+        NeighbourExclusion( neighbour_lists( coordinates, cutoff=3.0 ), labels=[ 1 ] )
+    """
+
+    def __init__( self, neighbours, labels ):
+        """
+        Create a :any:`NeighbourExclusion` constraint.
+
+        Args:
+            neighbours (list): The neighbours of each site, e.g. from :func:`neighbour_lists`.
+                A pair of sites are neighbours if either is listed as a neighbour of the other.
+            labels (list): The labels that may not be on neighbouring sites.
+        """
+        self.labels = np.asarray( list( labels ) )
+        earlier = [ set() for _ in neighbours ]
+        for i, sites in enumerate( neighbours ):
+            for j in sites:
+                if j != i:
+                    earlier[ max( i, j ) ].add( min( i, j ) )
+        self._earlier = [ np.array( sorted( sites ), dtype=np.intp ) for sites in earlier ]
+
+    def __call__( self, vectors, site ):
+        earlier = self._earlier[ site ]
+        if not len( earlier ):
+            return np.ones( len( vectors ), dtype=bool )
+        excluded = np.isin( vectors[ :, site ], self.labels )
+        return ~( excluded & np.isin( vectors[ :, earlier ], self.labels ).any( axis=1 ) )
+
+
+class GroupCount:
+    """
+    The number of sites in each of a set of groups that hold one of a set of labels
+    must be within a range, e.g. each octahedron has at most one vacancy.
+
+    e.g.::
+
+        GroupCount( octahedra, labels=[ 'vacancy' ], maximum=1 )
+    """
+
+    def __init__( self, groups, labels, minimum=0, maximum=None ):
+        """
+        Create a :any:`GroupCount` constraint.
+
+        Args:
+            groups (list): The sites in each group.
+            labels (list): The labels to count.
+            minimum (int, optional): The smallest number of sites in each group that can hold these labels.
+                Defaults to 0.
+            maximum (int, optional): The largest number of sites in each group that can hold these labels.
+                Defaults to no limit.
+        """
+        self.labels = np.asarray( list( labels ) )
+        self.minimum = minimum
+        self.maximum = maximum
+        self.groups = [ np.array( sorted( set( group ) ), dtype=np.intp ) for group in groups ]
+        self._groups_of_site = {}
+        for g, group in enumerate( self.groups ):
+            for site in group.tolist():
+                self._groups_of_site.setdefault( site, [] ).append( g )
+
+    def __call__( self, vectors, site ):
+        allowed = np.ones( len( vectors ), dtype=bool )
+        for g in self._groups_of_site.get( site, [] ):
+            group = self.groups[ g ]
+            assigned = group[ group <= site ]
+            count = np.isin( vectors[ :, assigned ], self.labels ).sum( axis=1 )
+            if self.maximum is not None:
+                allowed &= count <= self.maximum
+            allowed &= count + ( len( group ) - len( assigned ) ) >= self.minimum
+        return allowed
+
+
+def neighbour_lists( coordinates, cutoff ):
+    """
+    The sites within a cutoff distance of each site, without periodic boundary conditions.
+
+    Args:
+        coordinates (np.ndarray): (N, D) array of the Cartesian coordinates of each site.
+        cutoff (float): The largest distance between neighbours.
+
+    Returns:
+        (list[np.ndarray]): The sorted neighbours of each site.
+    """
+    coordinates = np.asarray( coordinates, dtype=float )
+    coordinates = coordinates.reshape( len( coordinates ), -1 )
+    distances = np.linalg.norm( coordinates[ :, np.newaxis, : ] - coordinates[ np.newaxis, :, : ], axis=-1 )
+    close = distances <= cutoff
+    np.fill_diagonal( close, False )
+    return [ np.flatnonzero( row ) for row in close ]
+
+
+def restrict_neighbour_lists( neighbours, sites ):
+    """
+    The neighbour lists of a subset of sites, with only neighbours in the subset, renumbered by
+    their position in the subset.
+
+    Args:
+        neighbours (list): The neighbours of every site.
+        sites (list[int]): The sites in the subset.
+
+    Returns:
+        (list[np.ndarray]): The sorted neighbours of each site in the subset.
+    """
+    positions = np.full( len( neighbours ), -1, dtype=np.intp )
+    positions[ np.asarray( sites, dtype=np.intp ) ] = np.arange( len( sites ) )
+    restricted = []
+    for site in sites:
+        renumbered = positions[ np.asarray( list( neighbours[ site ] ), dtype=np.intp ) ]
+        restricted.append( np.unique( renumbered[ renumbered >= 0 ] ) )
+    return restricted
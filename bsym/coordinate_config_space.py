@@ -1,4 +1,5 @@
 from bsym import ConfigurationSpace
+from bsym.constraints import neighbour_lists
 import numpy as np
 
 class CoordinateConfigSpace( ConfigurationSpace ):
@@ -44,3 +45,17 @@ class CoordinateConfigSpace( ConfigurationSpace ):
         unique_configs = self.unique_configurations( site_distribution, verbose=verbose )
         unique_coordinates = [ u.map_objects( self.coordinates ) for u in unique_configs ]
         return unique_coordinates
+
+    def neighbour_lists( self, cutoff ):
+        """
+        Find the sites within a cutoff distance of each site, for building constraints (see :mod:`bsym.constraints`).
+
+        Distances are calculated directly from the coordinates, without periodic boundary conditions.
+
+        Args:
+            cutoff (float): The largest distance between neighbours.
+
+        Returns:
+            (list[np.ndarray]): The sorted neighbours of each site.
+        """
+        return neighbour_lists( self.coordinates, cutoff )
@@ -1,12 +1,23 @@
-from pymatgen.symmetry.analyzer import SpacegroupAnalyzer, SpacegroupOperations, PointGroupAnalyzer # type: ignore
-from pymatgen.util.coord import coord_list_mapping_pbc, coord_list_mapping # type: ignore
-from pymatgen.core.lattice import Lattice # type: ignore
-from pymatgen.core.structure import Molecule, Structure # type: ignore
+"""
+Functions for using bsym with `pymatgen`_ ``Structure`` and ``Molecule`` objects.
+
+``pymatgen`` and ``scipy`` are imported by each function when it is called, 
+so importing this module is fast.
+
+.. _pymatgen:
+    http://pymatgen.org
+"""
 
 from bsym import SpaceGroup, SymmetryOperation, ConfigurationSpace, PointGroup
+from bsym.mapping_cache import fingerprint, mapping_cache
+from bsym.constraints import neighbour_lists, restrict_neighbour_lists
+from bsym.interface.structure_writers import structure_writer
+from collections import deque
 from copy import copy
 from functools import partial
+from itertools import count, islice
 import numpy as np
+import os
 
 def structure_cartesian_coordinates_mapping( structure, symmop ):
     """
@@ -45,6 +56,7 @@ def structure_mapping_list( new_structure, mapping_structure, atol ):
     Returns:
         list of indices such that mapping_structure.sites[indices] == new_structure.sites
     """
+    from pymatgen.util.coord import coord_list_mapping_pbc # type: ignore
     return coord_list_mapping_pbc( new_structure.frac_coords, mapping_structure.frac_coords, atol=atol )
 
 def molecule_mapping_list( new_molecule, mapping_molecule, atol ):
@@ -58,9 +70,78 @@ def molecule_mapping_list( new_molecule, mapping_molecule, atol ):
     Returns:
         list of indices such that mapping_molecule.sites[indices] == new_molecule.sites
     """
+    from pymatgen.util.coord import coord_list_mapping # type: ignore
     return coord_list_mapping( new_molecule.cart_coords, mapping_molecule.cart_coords, atol=atol )
 
-def unique_symmetry_operations_as_vectors_from_structure( structure, verbose=False, subset=None, atol=1e-5 ):
+def site_mappings( coords, symmetry_operations, atol=1e-5, periodic=True ):
+    """
+    Find the site that every site is mapped onto by each of a set of symmetry operations.
+
+    The images of every site under every symmetry operation are found in one step, and each
+    image is matched to the nearest site using a k-d tree, so the cost grows as N log N with 
+    the number of sites N, rather than as N².
+
+    Args:
+        coords (np.array): (N, 3) array of site coordinates: fractional coordinates if `periodic` 
+                           is `True`, otherwise Cartesian coordinates.
+        symmetry_operations (list[``SymmOp``]): The pymatgen symmetry operations, acting on `coords`.
+        atol (Optional [float]): The largest difference in any coordinate between an image and a matching site.
+        periodic (Optional [bool]): Whether the coordinates are periodic, with period 1. Default=True.
+
+    Returns:
+        (np.array): (G, N) array, where element [g, i] is the site that site i is mapped onto 
+                    by symmetry operation g, counting from zero.
+
+    Raises:
+        ValueError: if any symmetry operation maps a site onto a position with no site,
+                    or maps two sites onto the same site.
+    """
+    from scipy.spatial import cKDTree # type: ignore
+    coords = np.asarray( coords, dtype=float ).reshape( -1, 3 )
+    rotations = np.array( [ op.rotation_matrix for op in symmetry_operations ] ).reshape( -1, 3, 3 )
+    translations = np.array( [ op.translation_vector for op in symmetry_operations ] ).reshape( -1, 3 )
+    images = np.einsum( 'gij,nj->gni', rotations, coords ) + translations[ :, np.newaxis, : ]
+    if periodic:
+        tree = cKDTree( _wrap_fractional_coordinates( coords ), boxsize=1.0 )
+        images = _wrap_fractional_coordinates( images )
+    else:
+        tree = cKDTree( coords )
+    distances, indices = tree.query( images.reshape( -1, 3 ), p=np.inf, distance_upper_bound=atol )
+    if not np.isfinite( distances ).all():
+        raise ValueError( 'a symmetry operation maps a site onto a position with no site' )
+    indices = indices.reshape( len( rotations ), len( coords ) )
+    if ( np.sort( indices, axis=1 ) != np.arange( len( coords ) ) ).any():
+        raise ValueError( 'a symmetry operation maps two sites onto the same site' )
+    return indices
+
+def _wrap_fractional_coordinates( coords ):
+    wrapped = np.mod( coords, 1.0 )
+    # np.mod rounds very small negative coordinates up to 1.0.
+    wrapped[ wrapped >= 1.0 ] = 0.0
+    return wrapped
+
+def unique_rows( rows ):
+    """
+    Remove repeated rows from an array, keeping the first copy of each.
+
+    Args:
+        rows (np.array): 2D array.
+
+    Returns:
+        (np.array): The unique rows, in the order they first appear.
+    """
+    rows = np.ascontiguousarray( rows )
+    seen = set()
+    keep = []
+    for i, row in enumerate( rows ):
+        key = row.tobytes()
+        if key not in seen:
+            seen.add( key )
+            keep.append( i )
+    return rows[ keep ]
+
+def unique_symmetry_operations_as_vectors_from_structure( structure, verbose=False, subset=None, atol=1e-5, cache=None,
+                                                          backend='kdtree' ):
     """
     Uses `pymatgen`_ symmetry analysis to find the minimum complete set of symmetry operations for the space group of a structure.
 
@@ -68,6 +149,12 @@ def unique_symmetry_operations_as_vectors_from_structure( structure, verbose=Fal
         structure (pymatgen ``Structure``): structure to be analysed.
         subset    (Optional [list]):        list of atom indices to be used for generating the symmetry operations.
         atol      (Optional [float]):       tolerance factor for the ``pymatgen`` `coordinate mapping`_ under each symmetry operation.
+        cache     (Optional [str|:any:`MappingCache`]): a cache, or the directory of a cache, to read the mappings 
+                                            from, or to store them in if they are not already cached.
+        backend   (Optional [str]):         how the sites are matched under each symmetry operation.
+                                            `'kdtree'` (the default) matches every site at once with :func:`site_mappings`.
+                                            `'pymatgen'` builds a new structure for each symmetry operation and uses
+                                            the ``pymatgen`` `coordinate mapping`_, which compares every pair of sites.
 
     Returns:
         (list[list]): a list of lists, containing the symmetry operations as vector mappings.
@@ -78,28 +165,59 @@ def unique_symmetry_operations_as_vectors_from_structure( structure, verbose=Fal
         http://pymatgen.org/pymatgen.util.coord_utils.html#pymatgen.util.coord_utils.coord_list_mapping_pbc
 
     """
+    from pymatgen.symmetry.analyzer import SpacegroupAnalyzer, PointGroupAnalyzer # type: ignore
+    from pymatgen.core.structure import Molecule, Structure # type: ignore
+    if not isinstance( structure, ( Structure, Molecule ) ):
+        raise ValueError( 'structure argument should be a Structure or Molecule object' )
+    if backend not in [ 'kdtree', 'pymatgen' ]:
+        raise ValueError( "backend should be 'kdtree' or 'pymatgen'" )
+    cache = mapping_cache( cache )
+    if cache is not None:
+        key = structure_fingerprint( structure, subset=subset, atol=atol )
+        cached_mappings = cache.get( key )
+        if cached_mappings is not None:
+            return cached_mappings.tolist()
     if isinstance( structure, Structure ):
-        instantiate_structure = partial( Structure, lattice=structure.lattice, coords_are_cartesian=True )
-        coord_mapping = structure_cartesian_coordinates_mapping
-        mapping_list = structure_mapping_list
         symmetry_analyzer = SpacegroupAnalyzer( structure )
         if verbose:
             print( "The space group for this structure is {}".format( symmetry_analyzer.get_space_group_symbol()) )
-    elif isinstance( structure, Molecule ):
-        instantiate_structure = Molecule
-        coord_mapping = molecule_cartesian_coordinates_mapping
-        mapping_list = molecule_mapping_list
+    else:
         symmetry_analyzer = PointGroupAnalyzer( structure, tolerance=atol )
         if verbose:
             print( "The point group for this structure is {}".format( symmetry_analyzer.get_pointgroup()) )
-    else:
-        raise ValueError( 'structure argument should be a Structure or Molecule object' )
     symmetry_operations = symmetry_analyzer.get_symmetry_operations()
+    if backend == 'kdtree':
+        periodic = isinstance( structure, Structure )
+        coords = structure.frac_coords if periodic else structure.cart_coords
+        if subset:
+            coords = coords[ np.unique( np.asarray( subset, dtype=int ) ) ]
+        indices = site_mappings( coords, symmetry_operations, atol=atol, periodic=periodic )
+        mappings = ( unique_rows( indices ) + 1 ).tolist()
+    else:
+        mappings = _coordinate_mapping_vectors( structure, symmetry_operations, subset, atol )
+    if cache is not None:
+        cache.put( key, mappings )
+    return mappings
+
+def _coordinate_mapping_vectors( structure, symmetry_operations, subset, atol ):
+    """
+    Find the unique mapping vectors for a set of symmetry operations, by building a new structure 
+    for each symmetry operation and mapping its coordinates onto the original structure.
+    """
+    from pymatgen.core.structure import Molecule, Structure # type: ignore
+    if isinstance( structure, Structure ):
+        instantiate_structure = partial( Structure, lattice=structure.lattice, coords_are_cartesian=True )
+        coord_mapping = structure_cartesian_coordinates_mapping
+        mapping_list = structure_mapping_list
+    else:
+        instantiate_structure = Molecule
+        coord_mapping = molecule_cartesian_coordinates_mapping
+        mapping_list = molecule_mapping_list
     mappings = []
     if subset:
-        species_subset = [ spec for i,spec in enumerate( structure.species ) if i in subset ]
-        cart_coords_subset = [ coord for i, coord in enumerate( structure.cart_coords ) if i in subset ]
-        mapping_structure = instantiate_structure( species=species_subset, coords=cart_coords_subset )
+        subset = np.unique( np.asarray( subset, dtype=int ) )
+        species_subset = [ structure.species[i] for i in subset ]
+        mapping_structure = instantiate_structure( species=species_subset, coords=structure.cart_coords[ subset ] )
     else:
         mapping_structure = structure
     for symmop in symmetry_operations:
@@ -110,6 +228,26 @@ def unique_symmetry_operations_as_vectors_from_structure( structure, verbose=Fal
             mappings.append( new_mapping )
     return mappings
 
+def structure_fingerprint( structure, subset=None, atol=1e-5 ):
+    """
+    A key for the symmetry operation mappings of a pymatgen ``Structure`` or ``Molecule``,
+    computed from the lattice, species, coordinates, `subset`, and `atol`.
+
+    Args:
+        structure (pymatgen ``Structure``): The structure.
+        subset    (Optional [list]):        list of atom indices used for generating the symmetry operations.
+        atol      (Optional [float]):       tolerance factor for the coordinate mapping.
+
+    Returns:
+        (str): A SHA-256 hex digest.
+    """
+    from pymatgen.core.structure import Structure # type: ignore
+    species = [ str( spec ) for spec in structure.species ]
+    subset = sorted( int( i ) for i in subset ) if subset else None
+    if isinstance( structure, Structure ):
+        return fingerprint( 'Structure', structure.lattice.matrix, species, structure.frac_coords, float( atol ), subset )
+    return fingerprint( 'Molecule', species, structure.cart_coords, float( atol ), subset )
+
 def space_group_symbol_from_structure( structure ):
     """
     Returns the symbol for the space group defined by this structure. 
@@ -120,11 +258,12 @@ def space_group_symbol_from_structure( structure ):
     Returns:
         (str): The space group symbol.
     """
+    from pymatgen.symmetry.analyzer import SpacegroupAnalyzer # type: ignore
     symmetry_analyzer = SpacegroupAnalyzer( structure )
     symbol = symmetry_analyzer.get_space_group_symbol()
     return symbol
 
-def space_group_from_structure( structure, subset=None, atol=1e-5 ):
+def space_group_from_structure( structure, subset=None, atol=1e-5, cache=None ):
     """
     Generates a ``SpaceGroup`` object from a `pymatgen` ``Structure``. 
 
@@ -133,6 +272,8 @@ def space_group_from_structure( structure, subset=None, atol=1e-5 ):
         subset    (Optional [list]):        list of atom indices to be used for generating the symmetry operations.
         atol      (Optional [float]):       tolerance factor for the ``pymatgen`` `coordinate mapping`_ under each symmetry operation.
 
+        cache     (Optional [str|:any:`MappingCache`]): a cache, or the directory of a cache, for the symmetry operation mappings.
+
     Returns:
         a new :any:`SpaceGroup` instance
 
@@ -140,11 +281,46 @@ def space_group_from_structure( structure, subset=None, atol=1e-5 ):
         http://pymatgen.org/pymatgen.util.coord_utils.html#pymatgen.util.coord_utils.coord_list_mapping_pbc
 
     """
-    mappings = unique_symmetry_operations_as_vectors_from_structure( structure, subset=subset, atol=atol )
+    mappings = unique_symmetry_operations_as_vectors_from_structure( structure, subset=subset, atol=atol, cache=cache )
     symmetry_operations = [ SymmetryOperation.from_vector( m ) for m in mappings ]
     return SpaceGroup( symmetry_operations=symmetry_operations )
 
-def point_group_from_molecule( molecule, subset=None, atol=1e-5 ):
+def space_groups_from_structure( structure, subsets, atol=1e-5, cache=None ):
+    """
+    Generates a ``SpaceGroup`` object for each of a set of subsets of the sites in a `pymatgen` ``Structure``.
+
+    The symmetry analysis and site mapping are done once, for the full structure. The site permutations
+    of the full structure are then restricted to each subset, so the cost of each extra subset
+    is small.
+
+    Args:
+        structure (pymatgen ``Structure``): structure to be used to define each :any:`SpaceGroup`.
+        subsets   (list):                   the subsets of sites. Each subset is either a list of atom indices,
+                                            counting from zero, or a species symbol, which selects every site of that species.
+                                            The sites in each :any:`SpaceGroup` are numbered by their position in the subset.
+        atol      (Optional [float]):       tolerance factor for the coordinate mapping under each symmetry operation.
+        cache     (Optional [str|:any:`MappingCache`]): a cache, or the directory of a cache, for the symmetry operation mappings
+                                            of the full structure.
+
+    Returns:
+        (list[:any:`SpaceGroup`]): a new :any:`SpaceGroup` instance for each subset.
+
+    Raises:
+        ValueError: if a symmetry operation of the structure maps a site in a subset onto a site outside that subset.
+
+    e.g.::
+
+        cation_group, anion_group = space_groups_from_structure( structure, [ 'Mg', 'O' ] )
+    """
+    space_group = space_group_from_structure( structure, atol=atol, cache=cache )
+    space_groups = []
+    for subset in subsets:
+        if isinstance( subset, str ):
+            subset = list( structure.indices_from_symbol( subset ) )
+        space_groups.append( space_group.restricted_to( subset ) )
+    return space_groups
+
+def point_group_from_molecule( molecule, subset=None, atol=1e-5, cache=None ):
     """
     Generates a ``PointGroup`` object from a `pymatgen` ``Molecule``. 
 
@@ -153,6 +329,8 @@ def point_group_from_molecule( molecule, subset=None, atol=1e-5 ):
         subset    (Optional [list]):        list of atom indices to be used for generating the symmetry operations.
         atol      (Optional [float]):       tolerance factor for the ``pymatgen`` `coordinate mapping`_ under each symmetry operation.
 
+        cache     (Optional [str|:any:`MappingCache`]): a cache, or the directory of a cache, for the symmetry operation mappings.
+
     Returns:
         a new :any:`PointGroup` instance
 
@@ -160,12 +338,13 @@ def point_group_from_molecule( molecule, subset=None, atol=1e-5 ):
         http://pymatgen.org/pymatgen.util.coord_utils.html#pymatgen.util.coord_utils.coord_list_mapping
 
     """
+    from pymatgen.core.structure import Molecule # type: ignore
     molecule = Molecule( molecule.species, molecule.cart_coords - molecule.center_of_mass )
-    mappings = unique_symmetry_operations_as_vectors_from_structure( molecule, subset=subset, atol=atol )
+    mappings = unique_symmetry_operations_as_vectors_from_structure( molecule, subset=subset, atol=atol, cache=cache )
     symmetry_operations = [ SymmetryOperation.from_vector( m ) for m in mappings ]
     return PointGroup( symmetry_operations=symmetry_operations )
 
-def configuration_space_from_structure( structure, subset=None, atol=1e-5 ):
+def configuration_space_from_structure( structure, subset=None, atol=1e-5, cache=None ):
     """
     Generate a ``ConfigurationSpace`` object from a `pymatgen` ``Structure``.
 
@@ -173,6 +352,7 @@ def configuration_space_from_structure( structure, subset=None, atol=1e-5 ):
         structure (pymatgen ``Structure``): structure to be used to define the :any:`ConfigurationSpace`.
         subset    (Optional [list]):        list of atom indices to be used for generating the configuration space.
         atol      (Optional [float]):       tolerance factor for the ``pymatgen`` `coordinate mapping`_ under each symmetry operation.
+        cache     (Optional [str|:any:`MappingCache`]): a cache, or the directory of a cache, for the symmetry operation mappings.
         
     Returns:
         a new :any:`ConfigurationSpace` instance.
@@ -181,13 +361,13 @@ def configuration_space_from_structure( structure, subset=None, atol=1e-5 ):
         http://pymatgen.org/pymatgen.util.coord_utils.html#pymatgen.util.coord_utils.coord_list_mapping_pbc
 
     """
-    space_group = space_group_from_structure( structure, subset=subset, atol=atol )
+    space_group = space_group_from_structure( structure, subset=subset, atol=atol, cache=cache )
     if subset is None:
         subset = list( range( 1, len( structure )+1 ) )
     config_space = ConfigurationSpace( objects=subset, symmetry_group=space_group )
     return config_space
 
-def configuration_space_from_molecule( molecule, subset=None, atol=1e-5 ):
+def configuration_space_from_molecule( molecule, subset=None, atol=1e-5, cache=None ):
     """
     Generate a ``ConfigurationSpace`` object from a `pymatgen` ``Molecule``.
 
@@ -195,6 +375,7 @@ def configuration_space_from_molecule( molecule, subset=None, atol=1e-5 ):
         molecule  (pymatgen ``Molecule``):  molecule to be used to define the :any:`ConfigurationSpace`.
         subset    (Optional [list]):        list of atom indices to be used for generating the configuration space.
         atol      (Optional [float]):       tolerance factor for the ``pymatgen`` `coordinate mapping`_ under each symmetry operation.
+        cache     (Optional [str|:any:`MappingCache`]): a cache, or the directory of a cache, for the symmetry operation mappings.
         
     Returns:
         a new :any:`ConfigurationSpace` instance.
@@ -203,27 +384,38 @@ def configuration_space_from_molecule( molecule, subset=None, atol=1e-5 ):
         http://pymatgen.org/pymatgen.util.coord_utils.html#pymatgen.util.coord_utils.coord_list_mapping
 
     """
+    from pymatgen.core.structure import Molecule # type: ignore
     molecule = Molecule( molecule.species, molecule.cart_coords - molecule.center_of_mass )
-    point_group = point_group_from_molecule( molecule, subset=subset, atol=atol )
+    point_group = point_group_from_molecule( molecule, subset=subset, atol=atol, cache=cache )
     if subset is None:
         subset = list( range( 1, len( molecule )+1 ) )
     config_space = ConfigurationSpace( objects=subset, symmetry_group=point_group )
     return config_space
  
-def unique_structure_substitutions( structure, to_substitute, site_distribution, verbose=False, atol=1e-5, show_progress=False ):
+def unique_structure_substitutions( structure, to_substitute, site_distribution=None, verbose=False, atol=1e-5, show_progress=False,
+                                    cache=None, constraints=None ):
     """
     Generate all symmetry-unique structures formed by substituting a set of sites in a `pymatgen` structure.
 
     Args:
         structure (pymatgen.Structure): The parent structure.
-        to_substitute (str): atom label for the sites to be substituted.
+        to_substitute (str|dict): atom label for the sites to be substituted, or, to substitute several sublattices 
+                                           at once, a dictionary that gives the site distribution for the sites of each atom label,
+                                           e.g. `{ 'Li': { 'Mg': 1, 'Li': 7 }, 'O': { 'F': 1, 'O': 7 } }`.
         site_distribution (dict): A dictionary that defines the number of each substituting element.
+                                           Not given when `to_substitute` is a dictionary.
         verbose (bool): verbose output.
         atol      (Optional [float]):       tolerance factor for the ``pymatgen`` `coordinate mapping`_ under each symmetry operation. Default=1e-5.
         show_progress (opt:default=False): Show a progress bar.
                                            Setting to `True` gives a simple progress bar.
                                            Setting to `"notebook"` gives a Jupyter notebook compatible progress bar.
-
+        cache (Optional [str|:any:`MappingCache`]): a cache, or the directory of a cache, for the symmetry operation mappings
+                                           of the parent structure.
+        constraints (Optional [list]):     constraints that every new structure must satisfy (see :mod:`bsym.constraints`).
+                                           Sites are numbered by their position among the sites to be substituted
+                                           (see :func:`neighbour_lists_from_structure`), and are labelled by species.
+                                           Structures that break a constraint are skipped without being generated
+                                           (see :meth:`ConfigurationSpace.constrained_configurations`).
 
     Returns:
         (list[Structure]): A list of Structure objects for each unique substitution.
@@ -231,6 +423,18 @@ def unique_structure_substitutions( structure, to_substitute, site_distribution,
     Notes:
         The number of symmetry-equivalent configurations for each structure 
         is stored in the `number_of_equivalent_configurations` attribute. 
+
+        Several sublattices are substituted together under the symmetry group of the parent structure,
+        and sites are only substituted with the elements given for their own sublattice
+        (see :meth:`ConfigurationSpace.unique_sublattice_configurations`). 
+
+        The symmetry operations of the parent structure that leave each new structure
+        unchanged are stored, as permutations of every site, in the `stabilizer_subgroup`
+        attribute. If the parent structure has a `stabilizer_subgroup` attribute (because it
+        was generated by this function), its symmetry operations are used directly, and 
+        no symmetry analysis is done. The stored symmetry operations are not used if the 
+        structure has been changed since it was generated (e.g. by ``make_supercell``, 
+        ``remove_sites``, ``replace``, or ``perturb``), and the symmetry is found again.
      
         If the parent structure was previously generated using this function
         (as part of a sequence of substitutions) the full configuration
@@ -243,19 +447,25 @@ def unique_structure_substitutions( structure, to_substitute, site_distribution,
         http://pymatgen.org/pymatgen.util.coord_utils.html#pymatgen.util.coord_utils.coord_list_mapping_pbc
 
     """
-    site_substitution_index = list( structure.indices_from_symbol( to_substitute ) )
-    if len( site_substitution_index ) != sum( site_distribution.values() ):
-        raise ValueError( "Number of sites from index does not match number from site distribution" )
-    if isinstance( structure, Structure ):
-        config_space = configuration_space_from_structure( structure, subset=site_substitution_index, atol=atol )
-    elif isinstance( structure, Molecule ):
-        structure = Molecule( structure.species, structure.cart_coords - structure.center_of_mass )
-        config_space = configuration_space_from_molecule( structure, subset=site_substitution_index, atol=atol )
+    numeric_sublattices, numeric_site_mapping = _numeric_sublattices( to_substitute, site_distribution )
+    if len( numeric_sublattices ) > 1 and constraints is not None:
+        raise ValueError( "constraints can only be used when substituting a single sublattice" )
+    structure, symmetry_group, site_substitution_index, config_space = _substitution_configuration_space( 
+        structure, to_substitute, site_distribution, atol=atol, cache=cache )
+    numeric_site_distribution = numeric_sublattices[0][1]
+    if len( numeric_sublattices ) > 1:
+        unique_configurations = config_space.unique_sublattice_configurations( numeric_sublattices, verbose=verbose, 
+                                                                               show_progress=show_progress )
+    elif constraints is None:
+        unique_configurations = config_space.unique_configurations( numeric_site_distribution, verbose=verbose, show_progress=show_progress )
     else:
-        raise ValueError( "pymatgen Structure or Molecule object expected" )
-    numeric_site_distribution, numeric_site_mapping = parse_site_distribution( site_distribution )
-    unique_configurations = config_space.unique_configurations( numeric_site_distribution, verbose=verbose, show_progress=show_progress )
+        species = np.array( [ numeric_site_mapping[ i ] for i in sorted( numeric_site_mapping ) ] )
+        species_constraints = [ partial( _species_constraint, constraint, species ) for constraint in constraints ]
+        unique_configurations = config_space.constrained_configurations( numeric_site_distribution, species_constraints, verbose=verbose )
     new_structures = [ new_structure_from_substitution( structure, site_substitution_index, [ numeric_site_mapping[k] for k in c.tolist() ] ) for c in unique_configurations ]
+    for s in new_structures:
+        s.stabilizer_subgroup = symmetry_group.stabilizer( species_vector( s ) )
+        s.stabilizer_subgroup_key = structure_fingerprint( s )
     if hasattr( structure, 'number_of_equivalent_configurations' ):
         for s, c in zip( new_structures, unique_configurations ):
             s.number_of_equivalent_configurations = c.count
@@ -266,6 +476,248 @@ def unique_structure_substitutions( structure, to_substitute, site_distribution,
             s.full_configuration_degeneracy = c.count
     return new_structures
 
+def _species_constraint( constraint, species, vectors, site ):
+    """
+    Check a constraint on partial configurations labelled by species, for configurations labelled by integers.
+    """
+    return constraint( species[ vectors ], site )
+
+def neighbour_lists_from_structure( structure, cutoff, sites=None ):
+    """
+    The sites within a cutoff distance of each of a set of sites in a `pymatgen` structure, for building constraints
+    (see :mod:`bsym.constraints`).
+
+    Periodic images are included for a ``Structure``. Only neighbours in the set of sites are listed, and
+    sites are numbered by their position in the set, as in the :any:`ConfigurationSpace` of those sites.
+
+    Args:
+        structure (pymatgen ``Structure`` or ``Molecule``): the structure.
+        cutoff (float): the largest distance between neighbours.
+        sites (Optional [list|str]): a list of atom indices, counting from zero, or a species symbol, 
+                                     which selects every site of that species. Defaults to every site.
+
+    Returns:
+        (list[np.ndarray]): the sorted neighbours of each site.
+
+    e.g.::
+
+        neighbours = neighbour_lists_from_structure( structure, 3.0, 'Li' )
+        unique_structure_substitutions( structure, 'Li', { 'Na': 2, 'Li': 14 },
+                                        constraints=[ NeighbourExclusion( neighbours, [ 'Na' ] ) ] )
+    """
+    from pymatgen.core.structure import Structure # type: ignore
+    if sites is None:
+        sites = list( range( len( structure ) ) )
+    elif isinstance( sites, str ):
+        sites = list( structure.indices_from_symbol( sites ) )
+    if isinstance( structure, Structure ):
+        centres, points = structure.get_neighbor_list( cutoff )[:2]
+        neighbours = [ [] for _ in range( len( structure ) ) ]
+        for centre, point in zip( centres.tolist(), points.tolist() ):
+            if centre != point:
+                neighbours[ centre ].append( point )
+    else:
+        neighbours = neighbour_lists( structure.cart_coords, cutoff )
+    return restrict_neighbour_lists( neighbours, sites )
+
+def _substitution_sublattices( to_substitute, site_distribution ):
+    """
+    The atom label and site distribution of each sublattice to be substituted.
+
+    Returns:
+        (list[tuple]): A `( to_substitute, site_distribution )` pair for each sublattice.
+    """
+    if isinstance( to_substitute, dict ):
+        if site_distribution is not None:
+            raise ValueError( "site_distribution should not be given when to_substitute is a dict" )
+        return list( to_substitute.items() )
+    if site_distribution is None:
+        raise ValueError( "site_distribution is required when to_substitute is an atom label" )
+    return [ ( to_substitute, site_distribution ) ]
+
+def _numeric_sublattices( to_substitute, site_distribution ):
+    """
+    Label the substituting elements of each sublattice with integers, which are different for each sublattice.
+
+    Returns:
+        (list[tuple], dict): A `( sites, numeric_site_distribution )` pair for each sublattice, with sites numbered
+            by their position among every site to be substituted, and the element for each integer label.
+    """
+    numeric_sublattices = []
+    numeric_site_mapping = {}
+    start = 0
+    for _, distribution in _substitution_sublattices( to_substitute, site_distribution ):
+        numeric_site_distribution, mapping = parse_site_distribution( distribution )
+        offset = len( numeric_site_mapping )
+        n_sites = sum( distribution.values() )
+        numeric_sublattices.append( ( list( range( start, start + n_sites ) ),
+                                      { k + offset: n for k, n in numeric_site_distribution.items() } ) )
+        numeric_site_mapping.update( { k + offset: species for k, species in mapping.items() } )
+        start += n_sites
+    return numeric_sublattices, numeric_site_mapping
+
+def _substitution_configuration_space( structure, to_substitute, site_distribution, atol=1e-5, cache=None ):
+    """
+    Find the symmetry group of a parent structure, and the configuration space of the sites to be substituted.
+
+    Returns:
+        (``Structure``, :any:`SymmetryGroup`, list[int], :any:`ConfigurationSpace`): The parent structure
+            (moved to put its centre of mass at the origin, for a ``Molecule``), its symmetry group, 
+            the indices of the sites to be substituted, and their configuration space.
+    """
+    from pymatgen.core.structure import Molecule, Structure # type: ignore
+    site_substitution_index = []
+    for species, distribution in _substitution_sublattices( to_substitute, site_distribution ):
+        indices = list( structure.indices_from_symbol( species ) )
+        if len( indices ) != sum( distribution.values() ):
+            raise ValueError( "Number of sites from index does not match number from site distribution" )
+        site_substitution_index.extend( indices )
+    symmetry_group = _stored_stabilizer_subgroup( structure )
+    if isinstance( structure, Structure ):
+        if symmetry_group is None:
+            symmetry_group = space_group_from_structure( structure, atol=atol, cache=cache )
+    elif isinstance( structure, Molecule ):
+        structure = Molecule( structure.species, structure.cart_coords - structure.center_of_mass )
+        if symmetry_group is None:
+            symmetry_group = point_group_from_molecule( structure, atol=atol, cache=cache )
+    else:
+        raise ValueError( "pymatgen Structure or Molecule object expected" )
+    config_space = ConfigurationSpace( objects=site_substitution_index, 
+                                       symmetry_group=symmetry_group.restricted_to( site_substitution_index ) )
+    return structure, symmetry_group, site_substitution_index, config_space
+
+def write_unique_structure_substitutions( structure, to_substitute, site_distribution, directory, fmt='extxyz',
+                                          chunk_size=1000, prefix='structures', method=None, n_workers=None, 
+                                          executor=None, atol=1e-5, show_progress=False, cache=None ):
+    """
+    Write every symmetry-unique structure formed by substituting a set of sites in a `pymatgen` structure
+    to files, as the structures are found.
+
+    The structures are the same, and in the same order, as from :func:`unique_structure_substitutions`,
+    but they are written in chunks of `chunk_size` structures, and are never all held in memory.
+    Each structure is formatted directly from the species on each site (see :any:`bsym.interface.structure_writers`),
+    without building a ``Structure``. With `method='orderly'`, the memory used does not grow with the number 
+    of structures, but the enumeration is usually slower.
+
+    Args:
+        structure (pymatgen.Structure): The parent structure.
+        to_substitute (str|dict): atom label for the sites to be substituted, or a dictionary that gives the site 
+                                  distribution for the sites of each atom label (see :func:`unique_structure_substitutions`).
+        site_distribution (dict|None): A dictionary that defines the number of each substituting element,
+                                  or ``None`` when `to_substitute` is a dictionary.
+        directory (str): The directory to write to. It is created if it does not exist.
+        fmt (Optional [str]): `'poscar'` writes a directory of POSCAR files for each chunk, `'extxyz'` writes a 
+                              multi-frame extended XYZ file for each chunk, and `'jsonl'` writes a JSON lines file 
+                              for each chunk. Default=`'extxyz'`.
+        chunk_size (Optional [int]): The number of structures in each chunk. Default=1000.
+        prefix (Optional [str]): The start of the name of each chunk. Default=`'structures'`.
+        method (Optional [str]): The enumeration method (see :meth:`ConfigurationSpace.unique_configurations`).
+                                 Default=`'set'`.
+        n_workers (Optional [int]): If set, write the chunks using this many processes, while the enumeration continues.
+        executor (Optional): A :obj:`concurrent.futures.Executor` to write the chunks with, instead of 
+                             creating a :obj:`ProcessPoolExecutor`.
+        atol (Optional [float]): tolerance factor for the coordinate mapping under each symmetry operation. Default=1e-5.
+        show_progress (opt:default=False): Show a progress bar.
+        cache (Optional [str|:any:`MappingCache`]): a cache, or the directory of a cache, for the symmetry operation mappings
+                                                    of the parent structure.
+
+    Returns:
+        (list[str]): The path of each chunk, in order.
+
+    Notes:
+        The number of symmetry-equivalent configurations, and the full configuration degeneracy
+        (see :func:`unique_structure_substitutions`), are written with each structure.
+    """
+    from pymatgen.core.structure import Structure # type: ignore
+    parent_degeneracy = getattr( structure, 'full_configuration_degeneracy', 1 )
+    structure, _, site_substitution_index, config_space = _substitution_configuration_space( 
+        structure, to_substitute, site_distribution, atol=atol, cache=cache )
+    if isinstance( structure, Structure ):
+        writer = structure_writer( fmt, structure.frac_coords, structure.lattice.matrix )
+    else:
+        writer = structure_writer( fmt, structure.cart_coords )
+    os.makedirs( directory, exist_ok=True )
+    numeric_sublattices, numeric_site_mapping = _numeric_sublattices( to_substitute, site_distribution )
+    labels = np.array( [ numeric_site_mapping[k] for k in sorted( numeric_site_mapping ) ], dtype=object )
+    parent_species = species_vector( structure ).astype( object )
+    if len( numeric_sublattices ) > 1:
+        configurations = config_space.iter_unique_sublattice_configurations( numeric_sublattices, show_progress=show_progress, 
+                                                                             method=method )
+    else:
+        configurations = config_space.iter_unique_configurations( numeric_sublattices[0][1], show_progress=show_progress, method=method )
+    own_executor = executor is None and n_workers is not None
+    if own_executor:
+        from concurrent.futures import ProcessPoolExecutor
+        executor = ProcessPoolExecutor( max_workers=n_workers )
+    max_pending = 2 * ( n_workers or os.cpu_count() or 1 )
+    paths = []
+    pending = deque()
+    try:
+        for chunk in count():
+            batch = list( islice( configurations, chunk_size ) )
+            if not batch:
+                break
+            counts = np.array( [ c.count for c in batch ] )
+            species = np.tile( parent_species, ( len( batch ), 1 ) )
+            species[ :, site_substitution_index ] = labels[ np.array( [ c.vector for c in batch ] ) ]
+            properties = np.column_stack( [ counts, counts * parent_degeneracy ] )
+            path = writer.chunk_path( directory, chunk, prefix )
+            start = chunk * chunk_size
+            if executor is None:
+                paths.append( writer.write_chunk( path, start, species, properties ) )
+                continue
+            pending.append( executor.submit( writer.write_chunk, path, start, species, properties ) )
+            if len( pending ) >= max_pending:
+                paths.append( pending.popleft().result() )
+        while pending:
+            paths.append( pending.popleft().result() )
+    finally:
+        if own_executor:
+            executor.shutdown( cancel_futures=True )
+    return paths
+
+def species_vector( structure ):
+    """
+    Label every site of a pymatgen ``Structure`` or ``Molecule`` by its species.
+
+    Args:
+        structure (``Structure``): The pymatgen ``Structure``.
+
+    Returns:
+        (np.array): The species symbol for each site.
+    """
+    return np.array( [ str( species ) for species in structure.species ] )
+
+def _stored_stabilizer_subgroup( structure ):
+    """
+    The `stabilizer_subgroup` attribute of a structure generated by :func:`unique_structure_substitutions`,
+    if it is still a symmetry group of the structure.
+
+    The stored group is not used if it acts on a different number of sites, if any of its symmetry
+    operations maps a site onto a site with a different species, or if the lattice, species, or 
+    coordinates have changed since it was stored (from the `stabilizer_subgroup_key` attribute).
+
+    Args:
+        structure (``Structure``): The pymatgen ``Structure`` or ``Molecule``.
+
+    Returns:
+        (:any:`SymmetryGroup`): The stored symmetry group, or `None` if there is no stored group,
+            or it can not be used.
+    """
+    symmetry_group = getattr( structure, 'stabilizer_subgroup', None )
+    if symmetry_group is None:
+        return None
+    key = getattr( structure, 'stabilizer_subgroup_key', None )
+    if key is not None and key != structure_fingerprint( structure ):
+        return None
+    index_mappings = np.asarray( symmetry_group.index_mappings )
+    if index_mappings.shape[1] != len( structure ):
+        return None
+    species = species_vector( structure )
+    if not ( species[ index_mappings ] == species ).all():
+        return None
+    return symmetry_group
+
 def parse_site_distribution( site_distribution ):
     """
     Converts a site distribution using species labels into one using integer labels.
@@ -0,0 +1,252 @@
+"""
+Writing the structures generated by a site substitution to files, in chunks.
+
+Every structure generated by substituting the sites of a parent structure has the same lattice
+and site coordinates, and differs only in the species on each site. A :any:`StructureWriter`
+formats the lattice and coordinates once, and then writes each structure from its species alone,
+without building a ``pymatgen`` ``Structure``.
+
+Structures are written in numbered chunks. A chunk holds consecutive structures and is
+written with one call to :meth:`StructureWriter.write_chunk`, so chunks can be written by
+separate processes. Each chunk is first written to a temporary path, which is then renamed,
+so an interrupted write never leaves a partly written chunk.
+
+The number of symmetry-equivalent configurations for each structure is stored with it
+(see :any:`PoscarWriter`, :any:`ExtxyzWriter`, and :any:`JsonLinesWriter`).
+"""
+
+import json
+import os
+import shutil
+import numpy as np
+from collections import Counter
+
+PROPERTY_NAMES = ( "number_of_equivalent_configurations", "full_configuration_degeneracy" )
+"""The names of the values stored with each structure."""
+
+
+class StructureWriter:
+    """
+    Base class for writing structures that share a lattice and site coordinates.
+
+    Subclasses set :attr:`extension` and implement :meth:`format`.
+    """
+
+    extension = ""
+    periodic_only = False
+
+    def __init__( self, coords, lattice=None ):
+        """
+        Create a :any:`StructureWriter`.
+
+        Args:
+            coords (np.ndarray): (N, 3) array of the fractional coordinates of each site,
+                or of the Cartesian coordinates if there is no lattice.
+            lattice (np.ndarray, optional): (3, 3) array of lattice vectors, as rows.
+                ``None`` for a molecule.
+
+        Raises:
+            ValueError: If this format needs a lattice, and none is given.
+        """
+        if lattice is None and self.periodic_only:
+            raise ValueError( "{} can only write periodic structures".format( self.__class__.__name__ ) )
+        self.coords = np.asarray( coords, dtype=float ).reshape( -1, 3 )
+        self.lattice = None if lattice is None else np.asarray( lattice, dtype=float ).reshape( 3, 3 )
+
+    @property
+    def cart_coords( self ):
+        """The Cartesian coordinates of each site."""
+        return self.coords if self.lattice is None else self.coords @ self.lattice
+
+    def chunk_path( self, directory, chunk, prefix="structures" ):
+        """
+        The path that a chunk is written to.
+
+        Args:
+            directory (str): The output directory.
+            chunk (int): The chunk number, counting from zero.
+            prefix (str, optional): The start of the file name. Defaults to `'structures'`.
+
+        Returns:
+            (str)
+        """
+        return os.path.join( directory, "{}_{:05d}{}".format( prefix, chunk, self.extension ) )
+
+    def format( self, index, species, properties ):
+        """
+        Format one structure.
+
+        Args:
+            index (int): The number of this structure in the output, counting from zero.
+            species (list[str]): The species on each site.
+            properties (list[int]): The value of each of :any:`PROPERTY_NAMES`.
+
+        Returns:
+            (str)
+        """
+        raise NotImplementedError
+
+    def write_chunk( self, path, start, species, properties ):
+        """
+        Write a chunk of consecutive structures to a file.
+
+        Args:
+            path (str): The file to write.
+            start (int): The number of the first structure in the chunk.
+            species (np.ndarray): (M, N) array of the species on each site of each structure.
+            properties (np.ndarray): (M, P) array of the value of each of :any:`PROPERTY_NAMES`, for each structure.
+
+        Returns:
+            (str): `path`.
+        """
+        temporary = "{}.tmp".format( path )
+        with open( temporary, "w" ) as f:
+            for i, ( row, values ) in enumerate( zip( species.tolist(), properties.tolist() ) ):
+                f.write( self.format( start + i, row, values ) )
+        os.replace( temporary, path )
+        return path
+
+
+class PoscarWriter( StructureWriter ):
+    """
+    Writes each structure as a VASP POSCAR file, with one directory for each chunk.
+
+    The files are named ``POSCAR_<number>``. The first line of each file gives the
+    formula and the values of :any:`PROPERTY_NAMES`, e.g.::
+
+        Li15 Na1 number_of_equivalent_configurations=16 full_configuration_degeneracy=16
+    """
+
+    periodic_only = True
+
+    def __init__( self, coords, lattice=None ):
+        super().__init__( coords, lattice )
+        assert self.lattice is not None
+        self._lattice_lines = "".join( _format_row( v ) + "\n" for v in self.lattice )
+        self._coordinate_lines = [ _format_row( c ) for c in self.coords ]
+
+    def format( self, index, species, properties ):
+        runs = _runs( species )
+        formula = " ".join( "{}{}".format( symbol, n ) for symbol, n in sorted( Counter( species ).items() ) )
+        comment = " ".join( [ formula ] + [ "{}={}".format( name, value ) for name, value in zip( PROPERTY_NAMES, properties ) ] )
+        lines = [
+            comment,
+            "1.0",
+            self._lattice_lines.rstrip( "\n" ),
+            " ".join( symbol for symbol, _ in runs ),
+            " ".join( str( n ) for _, n in runs ),
+            "direct",
+        ]
+        lines.extend( "{} {}".format( c, s ) for c, s in zip( self._coordinate_lines, species ) )
+        return "\n".join( lines ) + "\n"
+
+    def chunk_path( self, directory, chunk, prefix="structures" ):
+        return os.path.join( directory, "{}_{:05d}".format( prefix, chunk ) )
+
+    def write_chunk( self, path, start, species, properties ):
+        temporary = "{}.tmp".format( path )
+        if os.path.exists( temporary ):
+            shutil.rmtree( temporary )
+        os.makedirs( temporary )
+        for i, ( row, values ) in enumerate( zip( species.tolist(), properties.tolist() ) ):
+            with open( os.path.join( temporary, "POSCAR_{:08d}".format( start + i ) ), "w" ) as f:
+                f.write( self.format( start + i, row, values ) )
+        if os.path.exists( path ):
+            shutil.rmtree( path )
+        os.replace( temporary, path )
+        return path
+
+
+class ExtxyzWriter( StructureWriter ):
+    """
+    Writes each chunk as one extended XYZ file, with one frame for each structure.
+
+    The comment line of each frame holds the lattice, the number of the structure (``index``),
+    and the values of :any:`PROPERTY_NAMES`. Positions are Cartesian.
+    """
+
+    extension = ".extxyz"
+
+    def __init__( self, coords, lattice=None ):
+        super().__init__( coords, lattice )
+        if self.lattice is None:
+            self._header = 'Properties=species:S:1:pos:R:3 pbc="F F F"'
+        else:
+            self._header = 'Lattice="{}" Properties=species:S:1:pos:R:3 pbc="T T T"'.format(
+                _format_row( self.lattice.ravel() )
+            )
+        self._coordinate_lines = [ _format_row( c ) for c in self.cart_coords ]
+
+    def format( self, index, species, properties ):
+        comment = " ".join(
+            [ self._header, "index={}".format( index ) ] + [ "{}={}".format( name, value ) for name, value in zip( PROPERTY_NAMES, properties ) ]
+        )
+        lines = [ str( len( species ) ), comment ]
+        lines.extend( "{} {}".format( s, c ) for s, c in zip( species, self._coordinate_lines ) )
+        return "\n".join( lines ) + "\n"
+
+
+class JsonLinesWriter( StructureWriter ):
+    """
+    Writes each chunk as one JSON lines file, with one JSON object for each structure.
+
+    Each object has the number of the structure (``index``), the values of :any:`PROPERTY_NAMES`,
+    the ``lattice`` (for a periodic structure), the ``species`` on each site, and either
+    ``frac_coords`` or, for a molecule, ``cart_coords``.
+    """
+
+    extension = ".jsonl"
+
+    def __init__( self, coords, lattice=None ):
+        super().__init__( coords, lattice )
+        parts = []
+        if self.lattice is not None:
+            parts.append( '"lattice": {}'.format( json.dumps( self.lattice.tolist() ) ) )
+            parts.append( '"frac_coords": {}'.format( json.dumps( self.coords.tolist() ) ) )
+        else:
+            parts.append( '"cart_coords": {}'.format( json.dumps( self.coords.tolist() ) ) )
+        self._geometry = ", ".join( parts )
+
+    def format( self, index, species, properties ):
+        values = "".join( ', "{}": {}'.format( name, int( value ) ) for name, value in zip( PROPERTY_NAMES, properties ) )
+        return '{{"index": {}{}, {}, "species": {}}}\n'.format( index, values, self._geometry, json.dumps( list( species ) ) )
+
+
+WRITERS = { "poscar": PoscarWriter, "extxyz": ExtxyzWriter, "jsonl": JsonLinesWriter }
+"""The :any:`StructureWriter` class for each output format."""
+
+
+def structure_writer( fmt, coords, lattice=None ):
+    """
+    Create a :any:`StructureWriter` for an output format.
+
+    Args:
+        fmt (str): `'poscar'`, `'extxyz'`, or `'jsonl'`.
+        coords (np.ndarray): (N, 3) array of the fractional coordinates of each site,
+            or of the Cartesian coordinates if there is no lattice.
+        lattice (np.ndarray, optional): (3, 3) array of lattice vectors, as rows. ``None`` for a molecule.
+
+    Returns:
+        (:any:`StructureWriter`)
+
+    Raises:
+        ValueError: If the format is not recognised, or needs a lattice and none is given.
+    """
+    if fmt not in WRITERS:
+        raise ValueError( "fmt should be one of {}".format( ", ".join( "'{}'".format( name ) for name in WRITERS ) ) )
+    return WRITERS[ fmt ]( coords, lattice )
+
+
+def _format_row( values ):
+    return " ".join( "{:.16f}".format( v ) for v in np.asarray( values, dtype=float ) )
+
+
+def _runs( species ):
+    """The runs of consecutive equal species, as (species, length) pairs."""
+    runs = []
+    for symbol in species:
+        if runs and runs[-1][0] == symbol:
+            runs[-1] = ( symbol, runs[-1][1] + 1 )
+        else:
+            runs.append( ( symbol, 1 ) )
+    return runs
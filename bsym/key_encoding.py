@@ -0,0 +1,409 @@
+"""
+Compact, collision-free keys for configuration vectors.
+
+A key encoder turns each configuration vector into a single hashable value,
+and works on whole arrays of vectors at once. Two vectors give equal keys if and only if
+the vectors are equal, and keys preserve lexicographic order, so the smallest key
+in a set of configurations is the key of the lexicographically smallest vector.
+
+Three encodings are provided:
+
+    - :any:`PackedKeyEncoder` packs each vector into a single mixed-radix `uint64`,
+      with one digit per site. This is only possible when ``n_labels ** dim <= 2 ** 64``.
+    - :any:`BytesKeyEncoder` stores each vector as a fixed-width byte string, and works
+      for any number of object labels and any number of sites.
+    - :any:`PermutationRankEncoder` gives the rank of each vector among the unique
+      permutations of a fixed multiset of labels.
+
+Use :func:`key_encoder_for` to get the most compact encoder for a configuration space.
+
+Visited configurations can be recorded as keys in a :any:`KeySet`, or, for rank keys,
+as single bits in a :any:`BitmapKeySet`.
+"""
+
+import numpy as np
+from bsym.permutations import number_of_unique_permutations
+
+
+class KeyEncoder:
+    """
+    Base class for objects that encode configuration vectors as hashable keys.
+
+    Subclasses implement :meth:`encode`, which maps a (..., N) array of configuration
+    vectors to a (...) array of keys.
+
+    Attributes:
+        labels (np.ndarray): The sorted set of object labels that can appear in a configuration,
+                             or ``None`` if labels are encoded directly from their integer values.
+        dim (int): The length of each configuration vector, or ``None`` if not fixed.
+    """
+
+    def __init__( self, labels=None, dim=None ):
+        self.labels = None if labels is None else np.unique( np.asarray( list( labels ) ) )
+        self.dim = dim
+        self._label_offset = None
+        if self.labels is not None and np.issubdtype( self.labels.dtype, np.integer ):
+            if self.labels[-1] - self.labels[0] == len( self.labels ) - 1:
+                # Consecutive integer labels can be converted to indices without a search.
+                self._label_offset = self.labels[0]
+
+    def __repr__( self ):
+        labels = None if self.labels is None else self.labels.tolist()
+        return "{}(labels={}, dim={})".format( self.__class__.__name__, labels, self.dim )
+
+    def _check_dim( self, configurations ):
+        if self.dim is not None and configurations.shape[-1] != self.dim:
+            raise ValueError( "Expected configuration vectors of length {}, not {}".format( self.dim, configurations.shape[-1] ) )
+
+    def label_indices( self, configurations ):
+        """
+        Replace every object label in an array of configurations with its position in `self.labels`.
+
+        Args:
+            configurations (np.ndarray): An array of configuration vectors, with shape (..., N).
+
+        Returns:
+            (np.ndarray): An integer array with the same shape as `configurations`.
+
+        Raises:
+            ValueError: If the configurations contain an object label that is not in `self.labels`.
+        """
+        if self.labels is None:
+            raise ValueError( "This encoder was created without a set of object labels" )
+        configurations = np.asarray( configurations )
+        self._check_dim( configurations )
+        if self._label_offset is not None:
+            indices = configurations - self._label_offset
+            valid = ( indices >= 0 ) & ( indices < len( self.labels ) )
+        else:
+            indices = np.searchsorted( self.labels, configurations )
+            clipped = np.minimum( indices, len( self.labels ) - 1 )
+            valid = self.labels[ clipped ] == configurations
+        if not valid.all():
+            raise ValueError( "Configuration contains object labels not known to this encoder" )
+        return indices
+
+    def encode( self, configurations ):
+        """
+        Encode an array of configuration vectors as keys.
+
+        Args:
+            configurations (np.ndarray): An array of configuration vectors, with shape (..., N).
+
+        Returns:
+            (np.ndarray): An array of keys, with shape (...).
+        """
+        raise NotImplementedError
+
+    def key( self, configuration ):
+        """
+        The key for a single configuration vector, as a Python object.
+
+        Args:
+            configuration (list|np.ndarray): The configuration vector.
+
+        Returns:
+            (int|bytes): The key.
+        """
+        return self.encode( np.asarray( configuration )[ np.newaxis ] )[0].item()
+
+
+class PackedKeyEncoder( KeyEncoder ):
+    """
+    Encodes each configuration vector as a mixed-radix `uint64`.
+
+    Each site contributes one digit, equal to the position of its object label in the
+    sorted list of labels, with the first site as the most significant digit.
+
+    Example:
+
+        >>> encoder = PackedKeyEncoder(labels=[0, 1, 10], dim=2)
+        >>> encoder.key([1, 10])
+        5
+        >>> encoder.key([10, 0])
+        6
+    """
+
+    def __init__( self, labels, dim ):
+        """
+        Create a :any:`PackedKeyEncoder`.
+
+        Args:
+            labels (list): The object labels that can appear in a configuration.
+            dim (int): The length of each configuration vector.
+
+        Raises:
+            ValueError: If every configuration cannot be packed into a `uint64`.
+        """
+        super().__init__( labels, dim )
+        assert self.labels is not None
+        self.radix = len( self.labels )
+        if not self.fits( self.radix, dim ):
+            raise ValueError( "{} labels on {} sites cannot be packed into a uint64 key".format( self.radix, dim ) )
+        self._weights = np.array( [ self.radix ** p for p in range( dim - 1, -1, -1 ) ], dtype=np.uint64 )
+
+    @staticmethod
+    def fits( n_labels, dim ):
+        """
+        Test whether every configuration of `dim` sites with `n_labels` object labels
+        can be packed into a single `uint64`.
+
+        Args:
+            n_labels (int): The number of different object labels.
+            dim (int): The length of each configuration vector.
+
+        Returns:
+            (bool): True | False.
+        """
+        return n_labels ** dim <= 2 ** 64
+
+    def encode( self, configurations ):
+        indices = self.label_indices( configurations ).astype( np.uint64 )
+        return ( indices * self._weights ).sum( axis=-1, dtype=np.uint64 )
+
+
+class BytesKeyEncoder( KeyEncoder ):
+    """
+    Encodes each configuration vector as a fixed-width byte string.
+
+    If a set of object labels is given, each site is stored as the position of its
+    label in the sorted list of labels, using one byte per site for up to 256 labels.
+    Without a set of labels, each site is stored as its integer value, using eight
+    bytes per site.
+
+    Example:
+
+        >>> encoder = BytesKeyEncoder(labels=[0, 1, 10], dim=2)
+        >>> encoder.key([1, 10])
+        b'\\x01\\x02'
+    """
+
+    def __init__( self, labels=None, dim=None ):
+        """
+        Create a :any:`BytesKeyEncoder`.
+
+        Args:
+            labels (:obj:`list`, optional): The object labels that can appear in a configuration.
+                If ``None``, configurations are encoded from their integer values.
+            dim (:obj:`int`, optional): The length of each configuration vector.
+        """
+        super().__init__( labels, dim )
+        if self.labels is None:
+            self._code_dtype = np.dtype( ">u8" )
+        elif len( self.labels ) <= 2 ** 8:
+            self._code_dtype = np.dtype( "u1" )
+        elif len( self.labels ) <= 2 ** 16:
+            self._code_dtype = np.dtype( ">u2" )
+        else:
+            self._code_dtype = np.dtype( ">u4" )
+
+    def encode( self, configurations ):
+        if self.labels is None:
+            configurations = np.asarray( configurations )
+            self._check_dim( configurations )
+            # Flipping the sign bit of each (big-endian) value keeps the byte order
+            # consistent with the numerical order of signed integers.
+            unsigned = configurations.astype( np.int64 ).view( np.uint64 ) ^ np.uint64( 1 << 63 )
+            codes = np.ascontiguousarray( unsigned, dtype=self._code_dtype )
+        else:
+            codes = np.ascontiguousarray( self.label_indices( configurations ), dtype=self._code_dtype )
+        key_dtype = np.dtype( ( np.void, codes.shape[-1] * codes.itemsize ) )
+        return codes.view( key_dtype )[ ..., 0 ]
+
+
+class PermutationRankEncoder( KeyEncoder ):
+    """
+    Encodes each configuration vector as its rank among the unique permutations of a fixed
+    multiset of object labels, using the order generated by :func:`bsym.permutations.unique_permutations`.
+
+    Keys are integers from zero up to the number of unique permutations, so they can be
+    used directly as indices into a :any:`BitmapKeySet`.
+
+    Example:
+
+        >>> encoder = PermutationRankEncoder([1, 1, 0, 0])
+        >>> encoder.key([0, 1, 1, 0])
+        2
+    """
+
+    def __init__( self, seq ):
+        """
+        Create a :any:`PermutationRankEncoder`.
+
+        Args:
+            seq (list): The multiset of object labels. Only permutations of `seq` can be encoded.
+
+        Raises:
+            ValueError: If the ranks of these permutations cannot be computed in 64-bit integers.
+        """
+        seq = list( seq )
+        super().__init__( seq, len( seq ) )
+        _, counts = np.unique( np.asarray( seq ), return_counts=True )
+        self.counts = counts.astype( np.int64 )
+        self.size = number_of_unique_permutations( seq )
+        if self.size * max( len( seq ), 1 ) >= 2 ** 63:
+            raise ValueError( "{} permutations are too many to rank with 64-bit integers".format( self.size ) )
+
+    def encode( self, configurations ):
+        indices = self.label_indices( configurations )
+        shape = indices.shape[ :-1 ]
+        indices = indices.reshape( -1, indices.shape[-1] )
+        rows = np.arange( len( indices ) )
+        counts = np.tile( self.counts, ( len( indices ), 1 ) )
+        multinomial = np.full( len( indices ), self.size, dtype=np.int64 )
+        ranks = np.zeros( len( indices ), dtype=np.int64 )
+        for i in range( indices.shape[1] ):
+            remaining = indices.shape[1] - i
+            label = indices[ :, i ]
+            # Skip every permutation that has a smaller label at this position.
+            smaller = np.cumsum( counts, axis=1 )[ rows, label ] - counts[ rows, label ]
+            ranks += multinomial * smaller // remaining
+            multinomial = multinomial * counts[ rows, label ] // remaining
+            counts[ rows, label ] -= 1
+        if counts.any():
+            raise ValueError( "Configuration is not a permutation of the labels of this encoder" )
+        return ranks.reshape( shape )
+
+
+_POPCOUNT = np.array( [ bin( i ).count( "1" ) for i in range( 256 ) ], dtype=np.uint8 )
+
+
+class KeySet:
+    """
+    A set of configuration keys, stored as a Python `set`.
+
+    Keys are added and tested for membership an array at a time.
+    """
+
+    def __init__( self ):
+        self._keys = set()
+
+    def __len__( self ):
+        return len( self._keys )
+
+    def contains( self, keys ):
+        """
+        Test which of an array of keys are in this set.
+
+        Args:
+            keys (np.ndarray): An array of keys.
+
+        Returns:
+            (np.ndarray): A boolean array with the same shape as `keys`.
+        """
+        flat = keys.ravel().tolist()
+        found = np.fromiter( ( k in self._keys for k in flat ), dtype=bool, count=len( flat ) )
+        return found.reshape( keys.shape )
+
+    def add( self, keys ):
+        """
+        Add an array of keys to this set.
+
+        Args:
+            keys (np.ndarray): An array of keys.
+
+        Returns:
+            None
+        """
+        self._keys.update( keys.ravel().tolist() )
+
+    def to_array( self, dtype ):
+        """
+        Every key in this set, in no particular order.
+
+        Args:
+            dtype: The data type of the keys, as returned by :meth:`KeyEncoder.encode`.
+
+        Returns:
+            (np.ndarray): A one-dimensional array of keys.
+        """
+        return np.array( list( self._keys ), dtype=dtype )
+
+
+class BitmapKeySet:
+    """
+    A set of integer keys from zero up to `size`, stored as one bit per possible key.
+
+    Combined with a :any:`PermutationRankEncoder`, this records every visited
+    permutation of a multiset in ``number_of_unique_permutations(seq) / 8`` bytes,
+    however many permutations have been visited.
+    """
+
+    def __init__( self, size ):
+        """
+        Create an empty :any:`BitmapKeySet`.
+
+        Args:
+            size (int): The number of possible keys.
+        """
+        self.size = size
+        self.bits = np.zeros( ( size + 7 ) // 8, dtype=np.uint8 )
+
+    def __len__( self ):
+        chunk = 2 ** 24
+        return sum(
+            int( _POPCOUNT[ self.bits[ i:i + chunk ] ].sum( dtype=np.int64 ) )
+            for i in range( 0, len( self.bits ), chunk )
+        )
+
+    def contains( self, keys ):
+        """
+        Test which of an array of keys are in this set.
+
+        Args:
+            keys (np.ndarray): An integer array of keys.
+
+        Returns:
+            (np.ndarray): A boolean array with the same shape as `keys`.
+        """
+        keys = np.asarray( keys, dtype=np.int64 )
+        masks = np.left_shift( 1, keys & 7 ).astype( np.uint8 )
+        return ( self.bits[ keys >> 3 ] & masks ) != 0
+
+    def add( self, keys ):
+        """
+        Add an array of keys to this set.
+
+        Args:
+            keys (np.ndarray): An integer array of keys.
+
+        Returns:
+            None
+        """
+        keys = np.asarray( keys, dtype=np.int64 ).ravel()
+        masks = np.left_shift( 1, keys & 7 ).astype( np.uint8 )
+        np.bitwise_or.at( self.bits, keys >> 3, masks )
+
+
+def key_encoder_for( labels, dim ):
+    """
+    The most compact key encoder for a given set of object labels and vector length.
+
+    Args:
+        labels (list): The object labels that can appear in a configuration.
+        dim (int): The length of each configuration vector.
+
+    Returns:
+        (:any:`KeyEncoder`): A :any:`PackedKeyEncoder` if every configuration fits in a `uint64`,
+            otherwise a :any:`BytesKeyEncoder`.
+    """
+    labels = np.unique( np.asarray( list( labels ) ) )
+    if PackedKeyEncoder.fits( len( labels ), dim ):
+        return PackedKeyEncoder( labels, dim )
+    return BytesKeyEncoder( labels, dim )
+
+
+def argmin_keys( keys ):
+    """
+    The position of the smallest key along the last axis of an array of keys.
+
+    Args:
+        keys (np.ndarray): An array of keys, with shape (..., M).
+
+    Returns:
+        (np.ndarray): An integer array with shape (...).
+    """
+    if keys.dtype.kind == "V":
+        # Byte string keys are ordered for sorting, but not for `argmin`.
+        return np.argsort( keys, axis=-1 )[ ..., 0 ]
+    return keys.argmin( axis=-1 )
@@ -0,0 +1,197 @@
+"""
+A persistent on-disk cache of symmetry operation mappings.
+
+Finding the site mappings for every symmetry operation of a large structure is slow,
+and is often repeated for the same structure. A :any:`MappingCache` stores the mapping
+vectors found for each structure in a local directory, under a key computed by :func:`fingerprint`
+from everything that determines the mappings.
+
+Each entry is a small uncompressed ``.npz`` file that holds the mappings in the smallest
+unsigned integer type that fits, with the key and a checksum. Entries are checked when they are
+read, and damaged or mismatched entries are discarded. When the total size of the cache exceeds
+its limit, the least recently used entries are removed.
+"""
+
+import hashlib
+import os
+import zipfile
+import numpy as np
+
+DEFAULT_MAX_BYTES = 2 ** 30
+"""The default size limit of a :any:`MappingCache`, in bytes."""
+
+
+class MappingCache:
+    """
+    A directory of cached symmetry operation mappings.
+
+    e.g.::
+
+        cache = MappingCache("symmetry_cache")
+        cache.put(key, mappings)
+        cache.get(key)
+    """
+
+    def __init__( self, directory, max_bytes=DEFAULT_MAX_BYTES ):
+        """
+        Create a :any:`MappingCache`. The directory is created if it does not exist.
+
+        Args:
+            directory (str): The directory the cache entries are stored in.
+            max_bytes (int, optional): The maximum total size of the cache entries.
+                Defaults to `DEFAULT_MAX_BYTES`.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs( directory, exist_ok=True )
+
+    def __repr__( self ):
+        return "MappingCache(directory={!r}, max_bytes={})".format( self.directory, self.max_bytes )
+
+    def _path( self, key ):
+        return os.path.join( self.directory, hashlib.sha256( key.encode() ).hexdigest() + ".npz" )
+
+    def get( self, key ):
+        """
+        Read the mappings stored for a key.
+
+        Args:
+            key (str): The key.
+
+        Returns:
+            (np.ndarray): A (G, N) array of mapping vectors, or ``None`` if there is no valid entry for `key`.
+        """
+        path = self._path( key )
+        try:
+            with np.load( path, allow_pickle=False ) as data:
+                stored_key, checksum, mappings = str( data[ "key" ] ), str( data[ "checksum" ] ), data[ "mappings" ]
+        except FileNotFoundError:
+            return None
+        except ( OSError, ValueError, KeyError, zipfile.BadZipFile ):
+            _remove( path )
+            return None
+        if stored_key != key or checksum != _checksum( mappings ) or not _are_mappings( mappings ):
+            _remove( path )
+            return None
+        os.utime( path )
+        return mappings
+
+    def put( self, key, mappings ):
+        """
+        Store the mappings for a key, then remove the least recently used entries
+        until the cache is no larger than `max_bytes`.
+
+        Args:
+            key (str): The key.
+            mappings (np.ndarray): A (G, N) array of mapping vectors, counting from zero or one.
+
+        Returns:
+            None
+        """
+        mappings = np.asarray( mappings )
+        mappings = mappings.astype( np.min_scalar_type( max( int( mappings.max( initial=0 ) ), 0 ) ) )
+        arrays = {
+            "key": np.array( key ),
+            "checksum": np.array( _checksum( mappings ) ),
+            "mappings": mappings,
+        }
+        path = self._path( key )
+        temporary = "{}.tmp".format( path )
+        with open( temporary, "wb" ) as f:
+            np.savez( f, **arrays )
+        os.replace( temporary, path )
+        self._evict( keep=path )
+
+    def _evict( self, keep ):
+        entries = []
+        for name in os.listdir( self.directory ):
+            path = os.path.join( self.directory, name )
+            if name.endswith( ".npz" ) and path != keep:
+                try:
+                    stat = os.stat( path )
+                except FileNotFoundError:
+                    continue
+                entries.append( ( stat.st_mtime, stat.st_size, path ) )
+        total = sum( size for _, size, _ in entries ) + os.path.getsize( keep )
+        for _, size, path in sorted( entries ):
+            if total <= self.max_bytes:
+                break
+            _remove( path )
+            total -= size
+
+    def clear( self ):
+        """
+        Remove every entry from this cache.
+
+        Returns:
+            None
+        """
+        for name in os.listdir( self.directory ):
+            if name.endswith( ".npz" ):
+                _remove( os.path.join( self.directory, name ) )
+
+
+def fingerprint( *parts ):
+    """
+    A key for a cache entry, computed from everything that determines the cached mappings.
+
+    Arrays are hashed from their shape and values as 64-bit numbers, and any other parts from their `repr`.
+
+    Args:
+        *parts: Arrays, strings, numbers, or lists.
+
+    Returns:
+        (str): A SHA-256 hex digest.
+
+    e.g.::
+
+        fingerprint("Structure", lattice, species, frac_coords, atol, subset)
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance( part, np.ndarray ):
+            values = np.ascontiguousarray( part, dtype=np.float64 if part.dtype.kind == "f" else np.int64 )
+            digest.update( repr( ( values.dtype.str, values.shape ) ).encode() )
+            digest.update( values.tobytes() )
+        else:
+            digest.update( repr( part ).encode() )
+        digest.update( b"\0" )
+    return digest.hexdigest()
+
+
+def mapping_cache( cache ):
+    """
+    Convert a cache argument to a :any:`MappingCache`.
+
+    Args:
+        cache (str or :any:`MappingCache` or None): A cache, or the directory of a cache.
+
+    Returns:
+        (:any:`MappingCache`): The cache, or ``None`` if `cache` is ``None``.
+    """
+    if cache is None or isinstance( cache, MappingCache ):
+        return cache
+    return MappingCache( cache )
+
+
+def _checksum( mappings ):
+    digest = hashlib.sha256( repr( ( mappings.dtype.str, mappings.shape ) ).encode() )
+    digest.update( np.ascontiguousarray( mappings ).tobytes() )
+    return digest.hexdigest()
+
+
+def _are_mappings( mappings ):
+    """Check that every row is a permutation of the same set of consecutive integers."""
+    if mappings.ndim != 2 or mappings.dtype.kind not in "ui":
+        return False
+    if mappings.size == 0:
+        return True
+    rows = np.sort( mappings, axis=1 )
+    return bool( ( rows == rows[ 0, 0 ] + np.arange( mappings.shape[1] ) ).all() )
+
+
+def _remove( path ):
+    try:
+        os.remove( path )
+    except FileNotFoundError:
+        pass
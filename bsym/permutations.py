@@ -18,9 +18,9 @@ def number_of_unique_permutations( seq ):
     """
     times_included = list( Counter( seq ).values() )
     factorials = list( map( factorial, times_included ) )
-    return int( factorial( len( seq ) ) / reduce( mul, factorials ) )
+    return factorial( len( seq ) ) // reduce( mul, factorials, 1 )
 
-def unique_permutations( seq ):
+def unique_permutations( seq, start=0, stop=None ):
     """
     Yield only unique permutations of seq in an efficient way.
 
@@ -29,15 +29,30 @@ def unique_permutations( seq ):
     of Narayana Pandita.
    
     see http://stackoverflow.com/questions/12836385/how-can-i-interleave-or-create-unique-permutations-of-two-stings-without-recurs/12837695
+
+    Args:
+        seq (list): list of items.
+        start (opt:default=0): The rank of the first permutation to yield.
+        stop (opt:default=None): If set, stop before the permutation with this rank.
+            Together with `start`, this selects a contiguous range of the full sequence
+            of permutations, e.g. to share the permutations between several processes.
     """
     # Precalculate the indices we'll be iterating over for speed
     i_indices = range(len(seq) - 1, -1, -1)
     k_indices = i_indices[1:]
+    remaining = None if stop is None else stop - start
+    if remaining is not None and remaining <= 0:
+        return
+    if start and start == number_of_unique_permutations( seq ):
+        return
     # The algorithm specifies to start with a sorted version
-    seq = sorted(seq)
+    seq = unrank_permutation( start, seq ) if start else sorted(seq)
     while True:
-        #yield list( seq )
         yield list( seq )
+        if remaining is not None:
+            remaining -= 1
+            if remaining == 0:
+                return
         # Working backwards from the last-but-one index,           k
         # we find the index of the first decrease in value.  0 0 1 0 1 1 1 0
         for k in k_indices:
@@ -61,3 +76,74 @@ def unique_permutations( seq ):
         # Reverse the part after but not                           k
         # including k, also efficiently.                     0 0 1 1 0 0 1 1
         seq[k + 1:] = seq[-1:k:-1]
+
+def rank_permutation( permutation ):
+    """
+    Find the position of a permutation in the sequence of unique permutations
+    of the same items, as generated by :func:`unique_permutations`.
+
+    Args:
+        permutation (list): list of items.
+
+    Returns:
+        int: The rank of this permutation, counting from zero.
+
+    Example:
+        >>> rank_permutation( [ 0, 1, 1, 0 ] )
+        2
+    """
+    labels = sorted( set( permutation ) )
+    counts = Counter( permutation )
+    remaining = len( permutation )
+    multinomial = number_of_unique_permutations( permutation )
+    rank = 0
+    for item in permutation:
+        # Skip every permutation that has a smaller item at this position.
+        for label in labels:
+            if label == item:
+                break
+            rank += multinomial * counts[ label ] // remaining
+        multinomial = multinomial * counts[ item ] // remaining
+        counts[ item ] -= 1
+        remaining -= 1
+    return rank
+
+def unrank_permutation( rank, seq ):
+    """
+    Find the unique permutation of seq at a given position in the sequence
+    generated by :func:`unique_permutations`.
+
+    This is the inverse of :func:`rank_permutation`.
+
+    Args:
+        rank (int): The position of the permutation, counting from zero.
+        seq (list): list of items.
+
+    Returns:
+        list: The permutation of seq with this rank.
+
+    Raises:
+        ValueError: If rank is not between zero and the number of unique permutations of seq.
+
+    Example:
+        >>> unrank_permutation( 2, [ 1, 1, 0, 0 ] )
+        [0, 1, 1, 0]
+    """
+    multinomial = number_of_unique_permutations( seq )
+    if not 0 <= rank < multinomial:
+        raise ValueError( 'rank must be between 0 and {}'.format( multinomial - 1 ) )
+    labels = sorted( set( seq ) )
+    counts = Counter( seq )
+    remaining = len( seq )
+    permutation = []
+    for _ in range( len( seq ) ):
+        for label in labels:
+            block = multinomial * counts[ label ] // remaining
+            if rank < block:
+                break
+            rank -= block
+        permutation.append( label )
+        multinomial = block
+        counts[ label ] -= 1
+        remaining -= 1
+    return permutation
@@ -0,0 +1,171 @@
+"""
+Counting symmetry inequivalent configurations without enumerating them.
+
+The number of orbits of a group acting on configurations is given by Burnside's lemma:
+the average, over every symmetry operation, of the number of configurations left
+unchanged by that operation. A configuration is unchanged by a permutation of sites
+if and only if every cycle of the permutation is occupied by a single object label,
+so only the cycle structure of each operation is needed (Pólya enumeration).
+
+Cycle structures are summarised as a cycle index: a mapping from each cycle type,
+written as a tuple of ``(cycle length, number of cycles)`` pairs, to the number of
+symmetry operations with that cycle type.
+"""
+
+import numpy as np
+from collections import Counter, defaultdict
+from math import factorial
+
+
+def cycle_index( index_mappings ):
+    """
+    Find the cycle type of each of a set of permutations.
+
+    Args:
+        index_mappings (np.ndarray): A (G, N) array, where each row is a permutation of ``range(N)``.
+
+    Returns:
+        (Counter): The number of permutations with each cycle type.
+
+    Example:
+
+        >>> cycle_index(np.array([[0, 1, 2], [1, 2, 0], [0, 2, 1]]))
+        Counter({((1, 3),): 1, ((3, 1),): 1, ((1, 1), (2, 1)): 1})
+    """
+    index_mappings = np.asarray( index_mappings )
+    n_ops, dim = index_mappings.shape
+    rows = np.arange( n_ops )[ :, np.newaxis ]
+    # Label each site by the smallest site in its cycle, by pointer doubling.
+    labels = np.tile( np.arange( dim ), ( n_ops, 1 ) )
+    jumps = index_mappings.copy()
+    for _ in range( max( 1, int( np.ceil( np.log2( max( dim, 1 ) ) ) ) + 1 ) ):
+        labels = np.minimum( labels, labels[ rows, jumps ] )
+        jumps = jumps[ rows, jumps ]
+    counts = Counter()
+    for row in labels:
+        cycle_lengths = np.bincount( row, minlength=dim )
+        lengths, multiplicities = np.unique( cycle_lengths[ cycle_lengths > 0 ], return_counts=True )
+        counts[ tuple( zip( lengths.tolist(), multiplicities.tolist() ) ) ] += 1
+    return counts
+
+
+def count_orbits( cycle_index, counts ):
+    """
+    Count the symmetry inequivalent configurations with a fixed number of each object.
+
+    Args:
+        cycle_index (Counter): The cycle index of the symmetry group.
+        counts (list[int]): The number of each object in each configuration.
+
+    Returns:
+        (int): The number of symmetry inequivalent configurations.
+
+    Raises:
+        ValueError: If the symmetry operations do not form a group.
+    """
+    counts = tuple( counts )
+    total = sum(
+        n_ops * _fixed_configurations( cycle_type, len( counts ), bound=counts ).get( counts, 0 )
+        for cycle_type, n_ops in cycle_index.items()
+    )
+    return _burnside_average( total, cycle_index )
+
+
+def composition_polynomial( cycle_index, n_labels ):
+    """
+    Count the symmetry inequivalent configurations for every composition of a set of objects.
+
+    Args:
+        cycle_index (Counter): The cycle index of the symmetry group.
+        n_labels (int): The number of different objects.
+
+    Returns:
+        (dict): A dictionary mapping the number of each object, as a tuple, to the
+            number of symmetry inequivalent configurations with that composition.
+
+    Raises:
+        ValueError: If the symmetry operations do not form a group.
+    """
+    totals = defaultdict( int )
+    for cycle_type, n_ops in cycle_index.items():
+        for composition, n_fixed in _fixed_configurations( cycle_type, n_labels ).items():
+            totals[ composition ] += n_ops * n_fixed
+    return {
+        composition: _burnside_average( total, cycle_index )
+        for composition, total in sorted( totals.items(), reverse=True )
+    }
+
+
+def count_colourings( cycle_index, n_labels ):
+    """
+    Count the symmetry inequivalent configurations when each site may hold any of a set of objects.
+
+    A permutation leaves a colouring unchanged if every cycle holds a single object, so it
+    fixes ``n_labels ** n_cycles`` colourings.
+
+    Args:
+        cycle_index (Counter): The cycle index of the symmetry group.
+        n_labels (int): The number of different objects.
+
+    Returns:
+        (int): The number of symmetry inequivalent colourings.
+
+    Raises:
+        ValueError: If the symmetry operations do not form a group.
+    """
+    total = sum(
+        n_ops * n_labels ** sum( multiplicity for _, multiplicity in cycle_type )
+        for cycle_type, n_ops in cycle_index.items()
+    )
+    return _burnside_average( total, cycle_index )
+
+
+def _burnside_average( total, cycle_index ):
+    group_order = sum( cycle_index.values() )
+    if total % group_order:
+        raise ValueError( "The symmetry operations do not form a group" )
+    return total // group_order
+
+
+def _fixed_configurations( cycle_type, n_labels, bound=None ):
+    """
+    The number of configurations left unchanged by a permutation with a given cycle type,
+    for each composition. This is the expansion of the product of power sums
+    ``(x_1^L + ... + x_k^L)^m`` over each ``(L, m)`` in the cycle type.
+
+    If `bound` is given, compositions with more of any object than `bound` are discarded.
+    """
+    polynomial = { ( 0, ) * n_labels: 1 }
+    for length, multiplicity in cycle_type:
+        terms = [
+            ( tuple( length * a for a in exponents ), coefficient )
+            for exponents, coefficient in _multinomial_terms( multiplicity, n_labels )
+        ]
+        product = defaultdict( int )
+        for exponents, coefficient in polynomial.items():
+            for shift, term_coefficient in terms:
+                new_exponents = tuple( e + s for e, s in zip( exponents, shift ) )
+                if bound is not None and any( e > b for e, b in zip( new_exponents, bound ) ):
+                    continue
+                product[ new_exponents ] += coefficient * term_coefficient
+        polynomial = product
+    return polynomial
+
+
+def _multinomial_terms( m, k ):
+    """Yield each term of ``(x_1 + ... + x_k)^m`` as (exponents, coefficient)."""
+    for exponents in _compositions( m, k ):
+        coefficient = factorial( m )
+        for e in exponents:
+            coefficient //= factorial( e )
+        yield exponents, coefficient
+
+
+def _compositions( m, k ):
+    """Yield every tuple of k non-negative integers that sum to m."""
+    if k == 1:
+        yield ( m, )
+        return
+    for first in range( m, -1, -1 ):
+        for rest in _compositions( m - first, k - 1 ):
+            yield ( first, ) + rest
@@ -0,0 +1,308 @@
+"""
+Base and strong generating set representation of a permutation group.
+
+A stabilizer chain for a group G acting on the points ``0 .. N-1`` is built from a sequence of
+base points ``b_0, b_1, ...``. Level ``i`` of the chain describes the subgroup ``G_i`` that
+fixes ``b_0 .. b_{i-1}``: the orbit of ``b_i`` under ``G_i``, and, for each point in that orbit,
+a transversal element of ``G_i`` that maps ``b_i`` to that point. Every element of G is then a unique
+product of one transversal element from each level, so the group order is the product of the
+orbit lengths, and membership can be tested by sifting a permutation down the chain,
+without listing the elements of G.
+
+Permutations are stored as integer arrays, where ``p[i]`` is the image of point ``i``.
+The chain is built with the deterministic Schreier–Sims algorithm.
+"""
+
+import numpy as np
+from itertools import product
+
+
+class StabilizerChain:
+    """
+    A stabilizer chain (base and strong generating set) for a permutation group.
+
+    e.g.::
+
+        chain = StabilizerChain( symmetry_group.index_mappings )
+        chain.order()
+        chain.contains( permutation )
+    """
+
+    def __init__( self, generators, base=None, degree=None ):
+        """
+        Create a :any:`StabilizerChain` for the group generated by a set of permutations.
+
+        Args:
+            generators (np.ndarray): A (K, N) array, where each row is a permutation of ``range(N)``.
+            base (list, optional): Points to use at the start of the base, in order.
+                Further base points are added as needed.
+            degree (int, optional): The number of points N. Only needed if there are no generators.
+
+        Raises:
+            ValueError: If a generator is not a permutation of ``range(N)``.
+        """
+        generators = np.asarray( generators, dtype=np.intp )
+        if degree is None:
+            if generators.ndim != 2:
+                raise ValueError( "the degree is needed for a group with no generators" )
+            degree = generators.shape[1]
+        generators = generators.reshape( -1, degree )
+        for g in generators:
+            if not _is_permutation( g ):
+                raise ValueError( "generator {} is not a permutation of range({})".format( g.tolist(), degree ) )
+        self.degree = degree
+        self.identity = np.arange( degree )
+        self.base = []
+        self._generators = []
+        self._transversals = []
+        self._inverse_transversals = []
+        for point in base or []:
+            self._add_level( int( point ) )
+        for g in generators:
+            if not self.contains( g ):
+                self._extend( g, 0 )
+
+    def _add_level( self, point ):
+        self.base.append( point )
+        self._generators.append( [] )
+        self._transversals.append( { point: self.identity } )
+        self._inverse_transversals.append( { point: self.identity } )
+
+    def _update_orbit( self, level ):
+        """Extend the basic orbit and transversal at `level` using its current generators."""
+        transversal = self._transversals[ level ]
+        inverse_transversal = self._inverse_transversals[ level ]
+        frontier = list( transversal )
+        while frontier:
+            new_points = []
+            for point in frontier:
+                u = transversal[ point ]
+                for s in self._generators[ level ]:
+                    image = int( s[ point ] )
+                    if image not in transversal:
+                        transversal[ image ] = s[ u ]
+                        inverse_transversal[ image ] = np.argsort( transversal[ image ] )
+                        new_points.append( image )
+            frontier = new_points
+
+    def _extend( self, g, level ):
+        """
+        Add a strong generator that fixes the first `level` base points, and complete the chain
+        with the Schreier–Sims algorithm.
+        """
+        pending = [ ( g, level ) ]
+        while pending:
+            h, level = pending.pop()
+            h, depth = self._sift( h, level )
+            if depth == len( self.base ) and np.array_equal( h, self.identity ):
+                continue
+            if depth == len( self.base ):
+                self._add_level( int( np.flatnonzero( h != self.identity )[0] ) )
+            # h fixes the base points before `depth`, so it belongs to every level down to `depth`.
+            for l in range( level, depth + 1 ):
+                self._generators[ l ].append( h )
+                old_points = set( self._transversals[ l ] )
+                self._update_orbit( l )
+                pending.extend( ( s, l + 1 ) for s in self._schreier_generators( l, old_points, h ) )
+
+    def _schreier_generators( self, level, old_points, new_generator ):
+        """
+        The Schreier generators at `level` that are new after adding `new_generator`:
+        those from `new_generator` with every orbit point, and those from every generator with new orbit points.
+        """
+        transversal = self._transversals[ level ]
+        inverse_transversal = self._inverse_transversals[ level ]
+        schreier_generators = []
+        for point, u in transversal.items():
+            generators = [ new_generator ] if point in old_points else self._generators[ level ]
+            for s in generators:
+                h = inverse_transversal[ int( s[ point ] ) ][ s[ u ] ]
+                if not np.array_equal( h, self.identity ):
+                    schreier_generators.append( h )
+        return schreier_generators
+
+    def _sift( self, g, level=0 ):
+        """
+        Divide `g` by transversal elements, from `level` down the chain.
+
+        Returns:
+            (np.ndarray, int): The residue, and the level where sifting stopped.
+                `g` is a member of the group if and only if the residue is the identity
+                and the level is the length of the base.
+        """
+        for l in range( level, len( self.base ) ):
+            image = int( g[ self.base[ l ] ] )
+            if image not in self._transversals[ l ]:
+                return g, l
+            g = self._inverse_transversals[ l ][ image ][ g ]
+        return g, len( self.base )
+
+    @property
+    def strong_generators( self ):
+        """
+        The strong generating set of this group.
+
+        Returns:
+            (np.ndarray): A (K, N) array of permutations.
+        """
+        generators = { id( g ): g for level in self._generators for g in level }
+        if not generators:
+            return np.empty( ( 0, self.degree ), dtype=np.intp )
+        return np.array( list( generators.values() ) )
+
+    @property
+    def basic_orbits( self ):
+        """
+        The orbit of each base point under the subgroup that fixes all the previous base points.
+
+        Returns:
+            (list[np.ndarray]): A sorted array of points for each base point.
+        """
+        return [ np.array( sorted( transversal ) ) for transversal in self._transversals ]
+
+    def order( self ):
+        """
+        The number of elements in this group.
+
+        Returns:
+            (int)
+        """
+        order = 1
+        for transversal in self._transversals:
+            order *= len( transversal )
+        return order
+
+    def contains( self, permutation ):
+        """
+        Test whether a permutation is an element of this group.
+
+        Args:
+            permutation (np.ndarray): A permutation of ``range(N)``.
+
+        Returns:
+            (bool)
+        """
+        permutation = np.asarray( permutation, dtype=np.intp )
+        if permutation.shape != ( self.degree, ):
+            return False
+        residue, level = self._sift( permutation )
+        return level == len( self.base ) and np.array_equal( residue, self.identity )
+
+    def random_element( self, rng=None ):
+        """
+        An element of this group, chosen uniformly at random.
+
+        Args:
+            rng (np.random.Generator or int, optional): A random number generator, or a seed for one.
+
+        Returns:
+            (np.ndarray): A permutation of ``range(N)``.
+        """
+        rng = np.random.default_rng( rng )
+        g = self.identity
+        for transversal in self._transversals:
+            u = list( transversal.values() )[ rng.integers( len( transversal ) ) ]
+            g = g[ u ]
+        return g
+
+    def elements( self ):
+        """
+        Every element of this group.
+
+        Returns:
+            (np.ndarray): A (order, N) array of permutations, starting with the identity.
+        """
+        elements = self.identity[ np.newaxis, : ]
+        for transversal in reversed( self._transversals ):
+            coset_representatives = np.array( list( transversal.values() ) )
+            elements = coset_representatives[ :, elements ].reshape( -1, self.degree )
+        return elements
+
+    def iter_elements( self, block_size=1024 ):
+        """
+        Iterate over every element of this group in blocks, without storing them all at once.
+
+        The elements are yielded in the same order as from :meth:`elements`.
+
+        Args:
+            block_size (int, optional): The approximate number of elements in each block.
+                Blocks are never smaller than the last basic orbit, and never larger than `block_size`
+                unless the last basic orbit is.
+
+        Yields:
+            (np.ndarray): A (M, N) array of permutations.
+        """
+        representatives = [ np.array( list( transversal.values() ) ) for transversal in self._transversals ]
+        # The elements generated by the last few levels form each block.
+        tail = self.identity[ np.newaxis, : ]
+        split = len( representatives )
+        while split > 0 and ( len( tail ) == 1 or len( tail ) * len( representatives[ split - 1 ] ) <= block_size ):
+            split -= 1
+            tail = representatives[ split ][ :, tail ].reshape( -1, self.degree )
+        for prefix in product( *representatives[:split] ):
+            g = self.identity
+            for u in prefix:
+                g = g[ u ]
+            yield g[ tail ]
+
+    def stabilizer( self, points ):
+        """
+        The subgroup that fixes every one of a set of points.
+
+        Args:
+            points (int or list[int]): The points to be fixed.
+
+        Returns:
+            (:any:`StabilizerChain`): A stabilizer chain for the pointwise stabilizer.
+        """
+        fixed = [ int( p ) for p in np.atleast_1d( points ) ]
+        base = fixed + [ b for b in self.base if b not in fixed ]
+        chain = StabilizerChain( self.strong_generators, base=base, degree=self.degree )
+        stabilizer = StabilizerChain( np.empty( ( 0, self.degree ), dtype=np.intp ), degree=self.degree )
+        depth = len( fixed )
+        stabilizer.base = chain.base[depth:]
+        stabilizer._generators = chain._generators[depth:]
+        stabilizer._transversals = chain._transversals[depth:]
+        stabilizer._inverse_transversals = chain._inverse_transversals[depth:]
+        return stabilizer
+
+    def orbit( self, point ):
+        """
+        The orbit of a point under this group.
+
+        Args:
+            point (int): The point.
+
+        Returns:
+            (np.ndarray): The sorted points in the orbit.
+        """
+        generators = self.strong_generators
+        orbit = { int( point ) }
+        frontier = [ int( point ) ]
+        while frontier:
+            images = set( generators[ :, frontier ].ravel().tolist() ) - orbit
+            orbit |= images
+            frontier = list( images )
+        return np.array( sorted( orbit ) )
+
+    def orbits( self ):
+        """
+        The orbits of every point under this group.
+
+        Returns:
+            (list[np.ndarray]): The sorted points in each orbit, ordered by their smallest point.
+        """
+        orbits = []
+        assigned = np.zeros( self.degree, dtype=bool )
+        for point in range( self.degree ):
+            if not assigned[ point ]:
+                orbit = self.orbit( point )
+                assigned[ orbit ] = True
+                orbits.append( orbit )
+        return orbits
+
+
+def _is_permutation( p ):
+    if p.size and ( p.min() < 0 or p.max() >= p.size ):
+        return False
+    return bool( np.bincount( p, minlength=p.size ).max( initial=1 ) == 1 ) if p.size else True
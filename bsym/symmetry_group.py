@@ -1,8 +1,11 @@
 import numpy as np
 from bsym import SymmetryOperation 
-from itertools import product
 from typing import TYPE_CHECKING
 from bsym.configuration import Configuration
+from bsym.key_encoding import BytesKeyEncoder, argmin_keys
+from bsym.polya import cycle_index
+from bsym.stabilizer_chain import StabilizerChain
+from collections import Counter
 
 class SymmetryGroup:
     """
@@ -26,6 +29,9 @@ class SymmetryGroup:
     """
 
     class_str = 'SymmetryGroup'
+    # True for groups whose operations also change the objects on each site (see :any:`ColourSymmetryGroup`),
+    # which can not be screened using the index mappings alone.
+    has_colour_mappings = False
 
     def __init__( self, symmetry_operations=[] ):
         """
@@ -164,11 +170,218 @@ class SymmetryGroup:
     def size( self ):
         return len( self.symmetry_operations )
 
+    @property
+    def index_mappings( self ):
+        """
+        The index mappings of every :any:`SymmetryOperation` in this group, stacked into a single array.
+
+        Args:
+            None
+
+        Returns:
+            (np.ndarray): A (G, N) array, where row g is the ``index_mapping`` of the g-th symmetry operation.
+        """
+        return np.array( [ so.index_mapping for so in self.symmetry_operations ] )
+
+    def iter_index_mappings( self, block_size=None ):
+        """
+        Iterate over the index mappings of every :any:`SymmetryOperation` in this group, in blocks.
+
+        Args:
+            block_size (int, optional): The maximum number of index mappings in each block.
+                Defaults to a single block.
+
+        Yields:
+            (np.ndarray): A (M, N) array of index mappings.
+        """
+        index_mappings = self.index_mappings
+        if block_size is None:
+            yield index_mappings
+            return
+        for start in range( 0, len( index_mappings ), block_size ):
+            yield index_mappings[ start:start + block_size ]
+
+    def stabilizer_chain( self, base=None ):
+        """
+        A base and strong generating set for the group generated by the symmetry operations in this group.
+
+        The stabilizer chain gives the group order, membership tests, random elements, point
+        stabilizers and orbits without looping over every symmetry operation.
+
+        Args:
+            base (list[int], optional): Sites to use at the start of the base.
+
+        Returns:
+            (:any:`StabilizerChain`)
+        """
+        return StabilizerChain( self.index_mappings, base=base )
+
+    def orbit_images( self, configurations ):
+        """
+        Apply every symmetry operation in this group to a block of configuration vectors in one step.
+
+        Args:
+            configurations (np.ndarray): A (B, N) array of configuration vectors.
+
+        Returns:
+            (np.ndarray): A (B, G, N) array, where element ``[b, g]`` is the vector obtained
+                by applying the g-th symmetry operation to configuration b.
+        """
+        return np.concatenate( list( self.iter_images( configurations ) ), axis=1 )
+
+    def iter_images( self, configurations ):
+        """
+        Apply the symmetry operations in this group to a block of configuration vectors, one block
+        of symmetry operations at a time.
+
+        Every method that screens configurations against this group finds their images here.
+
+        Args:
+            configurations (np.ndarray): A (B, N) array of configuration vectors.
+
+        Yields:
+            (np.ndarray): A (B, M, N) array of the images under each of the next M symmetry operations.
+        """
+        configurations = np.asarray( configurations )
+        for index_mappings in self.iter_index_mappings():
+            yield configurations[ :, index_mappings ]
+
+    def cycle_index( self ):
+        """
+        The cycle index of this group: the number of symmetry operations with each cycle type.
+
+        Each cycle type is a tuple of ``(cycle length, number of cycles)`` pairs.
+
+        Args:
+            None
+
+        Returns:
+            (Counter): The number of symmetry operations with each cycle type.
+        """
+        return sum( ( cycle_index( block ) for block in self.iter_index_mappings() ), Counter() )
+
+    def orbit_keys( self, configurations, key_encoder ):
+        """
+        The keys of the images of a block of configuration vectors under every symmetry operation in this group.
+
+        This is equivalent to ``key_encoder.encode(self.orbit_images(configurations))``, but
+        the images are generated for one block of symmetry operations at a time.
+
+        Args:
+            configurations (np.ndarray): A (B, N) array of configuration vectors.
+            key_encoder (:any:`KeyEncoder`): The encoder used to generate the keys.
+
+        Returns:
+            (np.ndarray): A (B, G) array of keys.
+        """
+        return np.concatenate( [ key_encoder.encode( images ) for images in self.iter_images( configurations ) ], axis=1 )
+
+    def canonical_forms( self, configurations, key_encoder=None ):
+        """
+        Find the canonical form of each of a block of configurations, and the size of its orbit.
+
+        The canonical form of a configuration is the lexicographically smallest member of its orbit
+        under this group, so two configurations are equivalent if and only if their canonical forms are equal.
+        Orbit sizes are calculated from the number of symmetry operations that leave each configuration
+        unchanged, which assumes that the symmetry operations of this group are closed and distinct.
+
+        Args:
+            configurations (np.ndarray): A (B, N) array of configuration vectors.
+            key_encoder (:any:`KeyEncoder`, optional): The encoder used to order configurations.
+                Defaults to ordering by the integer values of each vector.
+
+        Returns:
+            (np.ndarray, np.ndarray): A (B, N) array of canonical configurations, and a length B
+                array of orbit sizes.
+        """
+        if key_encoder is None:
+            key_encoder = BytesKeyEncoder()
+        configurations = np.asarray( configurations )
+        rows = np.arange( len( configurations ) )
+        canonical, canonical_keys = configurations.copy(), key_encoder.encode( configurations )
+        stabilizer_sizes = np.zeros( len( configurations ), dtype=int )
+        n_operations = 0
+        for images in self.iter_images( configurations ):
+            keys = key_encoder.encode( images )
+            smallest = argmin_keys( keys )
+            block_keys = keys[ rows, smallest ]
+            replace = argmin_keys( np.stack( [ canonical_keys, block_keys ], axis=1 ) ) == 1
+            canonical[ replace ] = images[ rows[ replace ], smallest[ replace ] ]
+            canonical_keys[ replace ] = block_keys[ replace ]
+            stabilizer_sizes += ( images == configurations[ :, np.newaxis, : ] ).all( axis=2 ).sum( axis=1 )
+            n_operations += images.shape[1]
+        return canonical, n_operations // stabilizer_sizes
+
+    def stabilizer( self, configuration ):
+        """
+        The subgroup of symmetry operations that leave a configuration unchanged.
+
+        Args:
+            configuration (:any:`Configuration` or np.ndarray): The configuration, or a configuration vector.
+                Any labels that can be compared for equality can be used.
+
+        Returns:
+            (:any:`SymmetryGroup`): A group containing the symmetry operations of this group
+                that map the configuration onto itself.
+        """
+        vector = np.asarray( configuration.vector if isinstance( configuration, Configuration ) else configuration )
+        fixed = ( self.orbit_images( vector[ np.newaxis ] )[0] == vector ).all( axis=1 )
+        return self._subgroup( [ so for so, f in zip( self.symmetry_operations, fixed ) if f ] )
+
+    def restricted_to( self, sites ):
+        """
+        The action of this group on a subset of its sites.
+
+        The sites in the subset are renumbered by their position in `sites`. Symmetry operations
+        that act identically on the subset are only included once, with the label of the first.
+
+        Args:
+            sites (list[int]): The sites in the subset, counting from zero.
+
+        Returns:
+            (:any:`SymmetryGroup`): A group acting on ``len(sites)`` sites.
+
+        Raises:
+            ValueError: If a symmetry operation maps a site in the subset to a site outside it.
+        """
+        index_mappings = self.index_mappings
+        restricted = _restrict_index_mappings( index_mappings, sites )
+        _, first = np.unique( restricted, axis=0, return_index=True )
+        first.sort()
+        labels = [ so.label for so in self.symmetry_operations ]
+        return self._subgroup( [ SymmetryOperation.from_index_mapping( restricted[ i ], label=labels[ i ] ) for i in first ] )
+
+    def _subgroup( self, symmetry_operations ):
+        """
+        A new group of the same kind as this one, containing a list of symmetry operations.
+        """
+        return self.__class__( symmetry_operations=symmetry_operations )
+
+    @classmethod
+    def from_generators( cls, generators ):
+        """
+        Create a :any:`SymmetryGroup` from a set of symmetry operations that generate the group.
+
+        Only the generators are stored. The group elements, orbits and order are computed
+        when needed (see :any:`GeneratedSymmetryGroup`).
+
+        Args:
+            generators (list): A list of :any:`SymmetryOperation` objects.
+
+        Returns:
+            (:any:`GeneratedSymmetryGroup`)
+        """
+        return GeneratedSymmetryGroup( generators )
+
     def __mul__( self, other ):
         """
         Direct product.
+
+        Every product ``s1 * s2`` is found at once by composing the index mappings of the two groups.
         """
-        return SymmetryGroup( [ s1 * s2 for s1, s2 in product( self.symmetry_operations, other.symmetry_operations ) ] )
+        mappings = other.index_mappings[ :, self.index_mappings ].transpose( 1, 0, 2 )
+        return SymmetryGroup( [ SymmetryOperation.from_index_mapping( m )
+                                for m in mappings.reshape( -1, mappings.shape[-1] ) ] )
 
     def operate_on(self,
                    configuration: Configuration,
@@ -189,3 +402,530 @@ class SymmetryGroup:
             all_configs = list(set(all_configs))
         return all_configs 
    
+
+
+ELEMENT_BLOCK_ENTRIES = 2 ** 16
+"""The approximate number of index mapping entries in each block of group elements
+generated by a :any:`GeneratedSymmetryGroup`."""
+
+class GeneratedSymmetryGroup( SymmetryGroup ):
+    """
+    A :any:`SymmetryGroup` defined by a set of generating symmetry operations.
+
+    e.g.::
+
+        SymmetryGroup.from_generators( [ s1, s2 ] )
+
+    The group elements are not stored. The group order and orbits are computed from a
+    :any:`StabilizerChain`, and the index mappings of the group elements are generated in
+    blocks, so enumerating configurations never needs every element at once.
+    The full list of :any:`SymmetryOperation` objects is only built if `symmetry_operations`
+    is accessed. Each of these is cached until the generators are changed.
+    """
+
+    def __init__( self, generators ):
+        """
+        Create a :any:`GeneratedSymmetryGroup` object.
+
+        Args:
+            generators (list): A list of :any:`SymmetryOperation` objects.
+
+        Raises:
+            ValueError: If there are no generators, or they act on different numbers of sites.
+        """
+        self.generators = list( generators )
+        if not self.generators:
+            raise ValueError( 'at least one generator is needed' )
+        if len( { len( g.index_mapping ) for g in self.generators } ) > 1:
+            raise ValueError( 'the generators act on different numbers of sites' )
+        self._clear_cache()
+
+    def _clear_cache( self ):
+        self._stabilizer_chain = None
+        self._symmetry_operations = None
+        self._orbits = None
+
+    @property
+    def degree( self ):
+        """
+        The number of sites the symmetry operations act on.
+        """
+        return len( self.generators[0].index_mapping )
+
+    @property
+    def symmetry_operations( self ):
+        """
+        Every :any:`SymmetryOperation` in this group, starting with the identity.
+
+        Args:
+            None
+
+        Returns:
+            (list): A list of :any:`SymmetryOperation` objects.
+        """
+        if self._symmetry_operations is None:
+            self._symmetry_operations = [ SymmetryOperation.from_index_mapping( m ) for m in self.index_mappings ]
+        return self._symmetry_operations
+
+    def stabilizer_chain( self, base=None ):
+        """
+        A base and strong generating set for this group.
+
+        Args:
+            base (list[int], optional): Sites to use at the start of the base.
+
+        Returns:
+            (:any:`StabilizerChain`)
+        """
+        if base is not None:
+            return StabilizerChain( [ g.index_mapping for g in self.generators ], base=base )
+        if self._stabilizer_chain is None:
+            self._stabilizer_chain = StabilizerChain( [ g.index_mapping for g in self.generators ] )
+        return self._stabilizer_chain
+
+    @property
+    def size( self ):
+        return self.stabilizer_chain().order()
+
+    @property
+    def index_mappings( self ):
+        """
+        The index mappings of every element of this group, stacked into a single array.
+
+        Args:
+            None
+
+        Returns:
+            (np.ndarray): A (G, N) array of index mappings, starting with the identity.
+        """
+        return self.stabilizer_chain().elements()
+
+    def iter_index_mappings( self, block_size=None ):
+        """
+        Iterate over the index mappings of every element of this group, in blocks.
+
+        Args:
+            block_size (int, optional): The approximate number of index mappings in each block.
+                Defaults to `ELEMENT_BLOCK_ENTRIES` divided by the number of sites.
+
+        Yields:
+            (np.ndarray): A (M, N) array of index mappings.
+        """
+        if block_size is None:
+            block_size = max( 1, ELEMENT_BLOCK_ENTRIES // self.degree )
+        yield from self.stabilizer_chain().iter_elements( block_size )
+
+    def restricted_to( self, sites ):
+        """
+        The action of this group on a subset of its sites.
+
+        The generators are restricted to the subset, so the new group is also a :any:`GeneratedSymmetryGroup`.
+
+        Args:
+            sites (list[int]): The sites in the subset, counting from zero.
+
+        Returns:
+            (:any:`GeneratedSymmetryGroup`): A group acting on ``len(sites)`` sites.
+
+        Raises:
+            ValueError: If a generator maps a site in the subset to a site outside it.
+        """
+        restricted = _restrict_index_mappings( np.array( [ g.index_mapping for g in self.generators ] ), sites )
+        return GeneratedSymmetryGroup( [ SymmetryOperation.from_index_mapping( m, label=g.label )
+                                         for m, g in zip( restricted, self.generators ) ] )
+
+    def _subgroup( self, symmetry_operations ):
+        return SymmetryGroup( symmetry_operations=symmetry_operations )
+
+    def orbits( self ):
+        """
+        The orbits of the sites under this group.
+
+        Args:
+            None
+
+        Returns:
+            (list[np.ndarray]): The sorted sites in each orbit, ordered by their smallest site.
+        """
+        if self._orbits is None:
+            self._orbits = self.stabilizer_chain().orbits()
+        return self._orbits
+
+    def extend( self, symmetry_operations_list ):
+        """
+        Add a list of generators to this :any:`GeneratedSymmetryGroup`.
+
+        Args:
+            symmetry_operations_list (list): A list of :any:`SymmetryOperation` objects.
+
+        Returns:
+            self (:any:`GeneratedSymmetryGroup`)
+        """
+        self.generators.extend( symmetry_operations_list )
+        self._clear_cache()
+        return self
+
+    def append( self, symmetry_operation ):
+        """
+        Add a generator to this :any:`GeneratedSymmetryGroup`.
+
+        Args:
+            symmetry_operation (:any:`SymmetryOperation`): The generator to add.
+
+        Returns:
+            self (:any:`GeneratedSymmetryGroup`)
+        """
+        return self.extend( [ symmetry_operation ] )
+
+    def __repr__( self ):
+        to_return = '{}\n'.format( self.__class__.class_str )
+        to_return += 'generated by:\n'
+        for so in self.generators:
+            to_return += "{}\t{}\n".format( so.label, so.as_vector() )
+        return to_return
+
+class SupercellSymmetryGroup( SymmetryGroup ):
+    """
+    A :any:`SymmetryGroup` for a supercell, stored as a set of point operations and a lattice of translations.
+
+    e.g.::
+
+        SupercellSymmetryGroup( point_operations=[ p1, p2 ], translations=[ t1, t2, t3 ] )
+
+    where `t1`, `t2`, and `t3` are the unit translations of the supercell along each lattice
+    direction, and `p1` and `p2` are :any:`SymmetryOperation` objects that represent the
+    remaining symmetry operations, one for each coset of the translation group. Every
+    element of the group is a point operation followed by a translation.
+
+    The translated copies of each point operation are not stored. Configurations are
+    canonicalized by finding the lexicographically smallest translation of the image under
+    each point operation (a translation normal form), so the work per configuration scales
+    with the number of point operations, rather than the full size of the group.
+    """
+
+    def __init__( self, point_operations, translations ):
+        """
+        Create a :any:`SupercellSymmetryGroup` object.
+
+        Args:
+            point_operations (list): A list of :any:`SymmetryOperation` objects, one from
+                each coset of the translation group.
+            translations (list): A list of :any:`SymmetryOperation` objects, giving the unit
+                translation along each lattice direction.
+
+        Raises:
+            ValueError: If there are no point operations or translations, if they act on different
+                numbers of sites, if the translations do not commute or do not act freely on the sites,
+                or if two point operations differ only by a translation.
+        """
+        self.point_operations = list( point_operations )
+        self.translations = list( translations )
+        if not self.point_operations:
+            raise ValueError( 'at least one point operation is needed' )
+        if not self.translations:
+            raise ValueError( 'at least one translation is needed' )
+        if len( { len( so.index_mapping ) for so in self.point_operations + self.translations } ) > 1:
+            raise ValueError( 'the symmetry operations act on different numbers of sites' )
+        self._set_lattice()
+        self._check_point_operations()
+        self._symmetry_operations = None
+
+    def _set_lattice( self ):
+        """
+        Label every site by its basis site and the lattice cell that contains it.
+        """
+        generators = [ t.index_mapping for t in self.translations ]
+        for i, a in enumerate( generators ):
+            for b in generators[:i]:
+                if not np.array_equal( a[ b ], b[ a ] ):
+                    raise ValueError( 'the translations do not commute' )
+        self.cell_shape = tuple( _cycle_length( g, 0 ) for g in generators )
+        n_cells = int( np.prod( self.cell_shape ) )
+        if self.degree % n_cells:
+            raise ValueError( 'the translations do not act freely on the sites' )
+        site_of = np.empty( ( self.degree // n_cells, n_cells ), dtype=np.intp )
+        basis = np.full( self.degree, -1, dtype=np.intp )
+        for b in range( len( site_of ) ):
+            cell = np.array( np.flatnonzero( basis < 0 )[0] )
+            for g, n in zip( generators, self.cell_shape ):
+                layers = [ cell ]
+                for _ in range( n - 1 ):
+                    layers.append( g[ layers[-1] ] )
+                cell = np.stack( layers, axis=-1 )
+            sites = cell.ravel()
+            if ( basis[ sites ] >= 0 ).any() or len( np.unique( sites ) ) != n_cells:
+                raise ValueError( 'the translations do not act freely on the sites' )
+            site_of[ b ] = sites
+            basis[ sites ] = b
+        cells = np.empty( self.degree, dtype=np.intp )
+        cells[ site_of ] = np.arange( n_cells )
+        self._site_of = site_of
+        self._site_basis = basis
+        self._site_cells = cells
+        self._cell_coordinates = np.array( np.unravel_index( np.arange( n_cells ), self.cell_shape ) )
+        # The contribution of each lattice direction to the index of the sum of two cells.
+        strides = np.cumprod( ( self.cell_shape + ( 1, ) )[ :0:-1 ] )[ ::-1 ]
+        self._cell_sums = [ ( np.add.outer( np.arange( n ), np.arange( n ) ) % n ) * stride
+                            for n, stride in zip( self.cell_shape, strides ) ]
+
+    def _check_point_operations( self ):
+        translated = [ self.translation_normal_forms( so.index_mapping[ np.newaxis, : ] )[0][0]
+                       for so in self.point_operations ]
+        if len( np.unique( translated, axis=0 ) ) != len( translated ):
+            raise ValueError( 'two point operations differ only by a translation' )
+
+    @property
+    def degree( self ):
+        """
+        The number of sites the symmetry operations act on.
+        """
+        return len( self.translations[0].index_mapping )
+
+    @property
+    def n_translations( self ):
+        """
+        The number of translations in this group: the number of lattice cells in the supercell.
+        """
+        return self._cell_coordinates.shape[1]
+
+    @property
+    def size( self ):
+        return len( self.point_operations ) * self.n_translations
+
+    def _translated_sites( self, sites, translations ):
+        """
+        The site that each of an array of sites takes its occupation from under each of an array of translations.
+        """
+        site_coordinates = self._cell_coordinates[ :, self._site_cells[ sites ] ]
+        translation_coordinates = self._cell_coordinates[ :, translations ]
+        cells = sum( table[ a, b ] for table, a, b in zip( self._cell_sums, site_coordinates, translation_coordinates ) )
+        return self._site_of[ self._site_basis[ sites ], cells ]
+
+    def translation_mappings( self, translations=None ):
+        """
+        The index mappings of a set of translations.
+
+        Args:
+            translations (np.ndarray, optional): The translations, numbered by their lattice
+                vector in C order over `cell_shape`. Defaults to every translation.
+
+        Returns:
+            (np.ndarray): A (M, N) array of index mappings, starting with the identity if
+                every translation is returned.
+        """
+        if translations is None:
+            translations = np.arange( self.n_translations )
+        translations = np.asarray( translations )
+        return self._translated_sites( np.arange( self.degree )[ np.newaxis, : ], translations[ :, np.newaxis ] )
+
+    def translation_normal_forms( self, configurations ):
+        """
+        Find the lexicographically smallest translation of each of a block of configurations,
+        and the number of translations that leave each configuration unchanged.
+
+        The translations that give the smallest image are found site by site: at each site,
+        only the translations that give the smallest value so far are kept, until one translation
+        is left for each configuration. Only translations that leave a configuration unchanged
+        have to be followed through every site.
+
+        Args:
+            configurations (np.ndarray): A (B, N) array of configuration vectors.
+
+        Returns:
+            (np.ndarray, np.ndarray): A (B, N) array of translated configurations, and a length B
+                array of the size of the translation stabilizer of each configuration.
+        """
+        configurations = np.asarray( configurations )
+        n_configurations = len( configurations )
+        best = np.zeros( n_configurations, dtype=np.intp )
+        stabilizer_sizes = np.ones( n_configurations, dtype=int )
+        if np.issubdtype( configurations.dtype, np.integer ):
+            ranks = configurations
+        else:
+            # Compare integer ranks, so any sortable object labels can be used.
+            _, ranks = np.unique( configurations, return_inverse=True )
+            ranks = ranks.reshape( configurations.shape )
+        rows = np.repeat( np.arange( n_configurations ), self.n_translations )
+        translations = np.tile( np.arange( self.n_translations ), n_configurations )
+        for site in range( self.degree ):
+            if not len( rows ):
+                break
+            values = ranks[ rows, self._translated_sites( site, translations ) ]
+            starts, counts = _group_bounds( rows )
+            keep = values == np.repeat( np.minimum.reduceat( values, starts ), counts )
+            rows, translations = rows[ keep ], translations[ keep ]
+            starts, counts = _group_bounds( rows )
+            resolved = counts == 1
+            best[ rows[ starts[ resolved ] ] ] = translations[ starts[ resolved ] ]
+            unresolved = np.repeat( ~resolved, counts )
+            rows, translations = rows[ unresolved ], translations[ unresolved ]
+        # Every remaining translation leaves the configuration in its smallest form.
+        starts, counts = _group_bounds( rows )
+        best[ rows[ starts ] ] = translations[ starts ]
+        stabilizer_sizes[ rows[ starts ] ] = counts
+        mappings = self.translation_mappings( best )
+        return configurations[ np.arange( n_configurations )[ :, np.newaxis ], mappings ], stabilizer_sizes
+
+    def canonical_forms( self, configurations, key_encoder=None ):
+        """
+        Find the canonical form of each of a block of configurations, and the size of its orbit.
+
+        The canonical form is the lexicographically smallest member of each orbit, as for
+        :meth:`SymmetryGroup.canonical_forms`. It is found as the smallest of the translation
+        normal forms of the images under each point operation.
+
+        Args:
+            configurations (np.ndarray): A (B, N) array of configuration vectors.
+            key_encoder (:any:`KeyEncoder`, optional): The encoder used to order configurations.
+                Defaults to ordering by the integer values of each vector.
+
+        Returns:
+            (np.ndarray, np.ndarray): A (B, N) array of canonical configurations, and a length B
+                array of orbit sizes.
+        """
+        if key_encoder is None:
+            key_encoder = BytesKeyEncoder()
+        configurations = np.asarray( configurations )
+        normal_forms, stabilizer_sizes = self.translation_normal_forms( configurations )
+        canonical, canonical_keys = normal_forms.copy(), key_encoder.encode( normal_forms )
+        # The number of point operations that map each configuration to a translation of itself.
+        n_cosets = np.zeros( len( configurations ), dtype=int )
+        for so in self.point_operations:
+            images, _ = self.translation_normal_forms( configurations[ :, so.index_mapping ] )
+            keys = key_encoder.encode( images )
+            n_cosets += ( images == normal_forms ).all( axis=1 )
+            replace = argmin_keys( np.stack( [ canonical_keys, keys ], axis=1 ) ) == 1
+            canonical[ replace ] = images[ replace ]
+            canonical_keys[ replace ] = keys[ replace ]
+        return canonical, self.size // ( stabilizer_sizes * n_cosets )
+
+    @property
+    def symmetry_operations( self ):
+        """
+        Every :any:`SymmetryOperation` in this group.
+
+        Args:
+            None
+
+        Returns:
+            (list): A list of :any:`SymmetryOperation` objects.
+        """
+        if self._symmetry_operations is None:
+            self._symmetry_operations = [ SymmetryOperation.from_index_mapping( m ) for m in self.index_mappings ]
+        return self._symmetry_operations
+
+    @property
+    def index_mappings( self ):
+        """
+        The index mappings of every element of this group, stacked into a single array.
+
+        Args:
+            None
+
+        Returns:
+            (np.ndarray): A (G, N) array of index mappings, with every translation of
+                the first point operation, then every translation of the second, and so on.
+        """
+        return np.concatenate( list( self.iter_index_mappings() ) )
+
+    def iter_index_mappings( self, block_size=None ):
+        """
+        Iterate over the index mappings of every element of this group, in blocks.
+
+        Args:
+            block_size (int, optional): The maximum number of index mappings in each block.
+                Defaults to `ELEMENT_BLOCK_ENTRIES` divided by the number of sites.
+
+        Yields:
+            (np.ndarray): A (M, N) array of index mappings.
+        """
+        if block_size is None:
+            block_size = max( 1, ELEMENT_BLOCK_ENTRIES // self.degree )
+        for so in self.point_operations:
+            for start in range( 0, self.n_translations, block_size ):
+                translations = self.translation_mappings( np.arange( start, min( start + block_size, self.n_translations ) ) )
+                yield so.index_mapping[ translations ]
+
+    def stabilizer_chain( self, base=None ):
+        """
+        A base and strong generating set for this group.
+
+        Args:
+            base (list[int], optional): Sites to use at the start of the base.
+
+        Returns:
+            (:any:`StabilizerChain`)
+        """
+        generators = [ so.index_mapping for so in self.point_operations + self.translations ]
+        return StabilizerChain( generators, base=base )
+
+    def _subgroup( self, symmetry_operations ):
+        return SymmetryGroup( symmetry_operations=symmetry_operations )
+
+    def extend( self, symmetry_operations_list ):
+        """
+        Add a list of point operations to this :any:`SupercellSymmetryGroup`.
+
+        Args:
+            symmetry_operations_list (list): A list of :any:`SymmetryOperation` objects.
+
+        Returns:
+            self (:any:`SupercellSymmetryGroup`)
+        """
+        self.point_operations.extend( symmetry_operations_list )
+        self._check_point_operations()
+        self._symmetry_operations = None
+        return self
+
+    def append( self, symmetry_operation ):
+        """
+        Add a point operation to this :any:`SupercellSymmetryGroup`.
+
+        Args:
+            symmetry_operation (:any:`SymmetryOperation`): The point operation to add.
+
+        Returns:
+            self (:any:`SupercellSymmetryGroup`)
+        """
+        return self.extend( [ symmetry_operation ] )
+
+    def __repr__( self ):
+        to_return = '{}\n'.format( self.__class__.class_str )
+        to_return += 'point operations:\n'
+        for so in self.point_operations:
+            to_return += "{}\t{}\n".format( so.label, so.as_vector() )
+        to_return += 'translations:\n'
+        for so in self.translations:
+            to_return += "{}\t{}\n".format( so.label, so.as_vector() )
+        return to_return
+
+def _restrict_index_mappings( index_mappings, sites ):
+    """
+    Renumber the images of a subset of sites by their position in the subset.
+
+    Raises:
+        ValueError: If a site in the subset is mapped to a site outside it.
+    """
+    sites = np.asarray( sites, dtype=np.intp )
+    positions = np.full( index_mappings.shape[1], -1, dtype=np.intp )
+    positions[ sites ] = np.arange( len( sites ) )
+    restricted = positions[ index_mappings[ :, sites ] ]
+    if ( restricted < 0 ).any():
+        raise ValueError( 'the subset of sites is not mapped onto itself by every symmetry operation' )
+    return restricted
+
+def _cycle_length( index_mapping, site ):
+    """
+    The length of the cycle of a permutation that contains a site.
+    """
+    length, image = 1, index_mapping[ site ]
+    while image != site:
+        length, image = length + 1, index_mapping[ image ]
+    return length
+
+def _group_bounds( rows ):
+    """
+    The start and length of each run of equal values in a sorted array.
+    """
+    starts = np.flatnonzero( np.diff( rows, prepend=-1 ) )
+    return starts, np.diff( starts, append=len( rows ) )
@@ -30,10 +30,32 @@ def is_permutation_matrix( m ):
             (m.sum(axis=0) == 1).all() and 
             (m.sum(axis=1) == 1).all() and
             ((m == 1) | (m == 0)).all())
+
+def is_permutation_vector( v ):
+    """
+    Test whether a numpy array is a permutation of the integers ``0 .. N-1``.
+
+    Args:
+        v (np.ndarray): The vector.
+
+    Returns:
+        (bool): True | False.
+    """
+    v = np.asanyarray(v)
+    if v.ndim != 1 or not np.issubdtype( v.dtype, np.integer ):
+        return False
+    if v.size == 0:
+        return True
+    return bool( v.min() >= 0 and v.max() < v.size and 
+                 ( np.bincount( v, minlength=v.size ) == 1 ).all() )
     
 class SymmetryOperation:
     """
     `SymmetryOperation` class.
+
+    A `SymmetryOperation` is stored as an `index_mapping` vector, where applying the operation 
+    to a configuration vector `v` gives ``v[index_mapping]``. The equivalent permutation 
+    `matrix` is only built when it is requested.
     """
 
     def __init__( self, matrix, label=None ):
@@ -54,30 +76,68 @@ class SymmetryOperation:
 
         Notes:
             To construct a `SymmetryOperation` object from a vector of site mappings
-            use the `SymmetryOperation.from_vector()` method.
+            use the `SymmetryOperation.from_vector()` method, or
+            `SymmetryOperation.from_index_mapping()`, which avoid building an N×N matrix.
 
         Returns:
             None
         """
-        if isinstance( matrix, np.matrix ):
-            self.matrix = np.array( matrix )
-        elif isinstance( matrix, np.ndarray ):
-            self.matrix = np.array( matrix )
-        elif isinstance( matrix, list):
-            self.matrix = np.array( matrix )
+        if isinstance( matrix, ( np.matrix, np.ndarray, list ) ):
+            matrix = np.array( matrix )
         else:
             raise TypeError
-        if not is_square( self.matrix ):
+        if not is_square( matrix ):
             raise ValueError('Not a square matrix')
-        if not is_permutation_matrix( self.matrix ):
+        if not is_permutation_matrix( matrix ):
             raise ValueError('Not a permutation matrix')
         self.label = label
-        self.index_mapping = np.array( [ np.array(row).tolist().index(1) for row in matrix ] )
+        self.index_mapping = np.argmax( matrix, axis=1 )
+
+    @classmethod
+    def from_index_mapping( cls, index_mapping, label=None ):
+        """
+        Initialise a SymmetryOperation object from its index mapping, where applying the
+        operation to a configuration vector `v` gives ``v[index_mapping]``.
+
+        Args:
+            index_mapping (list|np.ndarray): A permutation of the integers ``0 .. N-1``.
+            label (default=None) (str): optional string label for this `SymmetryOperation` object.
+
+        Raises:
+            ValueError: if `index_mapping` is not a permutation.
+
+        Returns:
+            a new SymmetryOperation object
+        """
+        index_mapping = np.asarray( index_mapping )
+        if not is_permutation_vector( index_mapping ):
+            raise ValueError('Not a permutation')
+        new_symmetry_operation = cls.__new__( cls )
+        new_symmetry_operation.index_mapping = index_mapping.astype( np.intp, copy=True )
+        new_symmetry_operation.label = label
+        return new_symmetry_operation
+
+    @property
+    def matrix( self ):
+        """
+        The permutation matrix for this symmetry operation.
+
+        The matrix is built from `index_mapping` each time it is requested, and is not stored.
+
+        Returns:
+            (np.ndarray): An N×N integer array.
+        """
+        dim = len( self.index_mapping )
+        matrix = np.zeros( ( dim, dim ), dtype=int )
+        matrix[ np.arange( dim ), self.index_mapping ] = 1
+        return matrix
 
     def __mul__( self, other ):
         """
         Multiply this `SymmetryOperation` matrix with another `SymmetryOperation`.
 
+        The product is found by composing the two index mappings, without building either matrix.
+
         Args:
             other (SymmetryOperation, Configuration): the other symmetry operation or configuration or matrix
             for the matrix multiplication self * other.
@@ -87,7 +147,7 @@ class SymmetryOperation:
             (Configuration): if `other` is a `Configuration`.
         """
         if isinstance( other, SymmetryOperation ):
-            return SymmetryOperation( self.matrix.dot( other.matrix ) )
+            return SymmetryOperation.from_index_mapping( other.index_mapping[ self.index_mapping ] )
         elif isinstance( other, Configuration ):
             return self.operate_on( other )
         else:
@@ -103,7 +163,7 @@ class SymmetryOperation:
         Returns:
             A new `SymmetryOperation` object corresponding to the inverse matrix operation.
         """
-        return SymmetryOperation( np.linalg.inv( self.matrix ).astype( int ), label=label )
+        return SymmetryOperation.from_index_mapping( _inverse( self.index_mapping ), label=label )
 
     @classmethod
     def from_vector( cls, vector, count_from_zero=False, label=None ):
@@ -118,14 +178,12 @@ class SymmetryOperation:
         Returns:
             a new SymmetryOperation object
         """
+        vector = _as_integer_vector( vector )
         if not count_from_zero:
-            vector = [ x - 1 for x in vector ]
-        dim = len( vector )
-        matrix = np.zeros( ( dim, dim ) )
-        for index, element in enumerate( vector ):
-            matrix[ element, index ] = 1
-        new_symmetry_operation = cls( matrix, label=label )
-        return new_symmetry_operation
+            vector = vector - 1
+        if not is_permutation_vector( vector ):
+            raise ValueError('Not a permutation')
+        return cls.from_index_mapping( _inverse( vector ), label=label )
 
     def similarity_transform( self, s, label=None ):
         """
@@ -138,7 +196,8 @@ class SymmetryOperation:
         Returns:
             the SymmetryOperation produced by the similarity transform
         """
-        s_new = s.invert() * ( self * s )
+        s_mapping = s.index_mapping
+        s_new = SymmetryOperation.from_index_mapping( s_mapping[ self.index_mapping ][ _inverse( s_mapping ) ] )
         if label:
             s_new.set_label( label )
         return s_new
@@ -165,9 +224,9 @@ class SymmetryOperation:
             none
 
         Returns:
-            np.trace( self.matrix )
+            (int): the number of sites left unchanged by this operation.
         """
-        return np.trace( self.matrix )
+        return np.count_nonzero( self.index_mapping == np.arange( len( self.index_mapping ) ) )
 
     def as_vector( self, count_from_zero=False ):
         """
@@ -180,7 +239,7 @@ class SymmetryOperation:
             a vector representation of this symmetry operation (as a list)
         """
         offset = 0 if count_from_zero else 1
-        return [ row.tolist().index( 1 ) + offset for row in self.matrix.T ]
+        return ( _inverse( self.index_mapping ) + offset ).tolist()
 
     def set_label( self, label ):
         """
@@ -209,3 +268,26 @@ class SymmetryOperation:
     def __repr__( self ):
         label = self.label if self.label else '---'
         return 'SymmetryOperation\nlabel(' + label + ")\n" + self.matrix.__repr__()
+
+def _inverse( permutation ):
+    """
+    The inverse of a permutation of the integers ``0 .. N-1``.
+    """
+    inverse = np.empty_like( permutation )
+    inverse[ permutation ] = np.arange( len( permutation ) )
+    return inverse
+
+def _as_integer_vector( vector ):
+    """
+    Convert a list of whole numbers (which may be stored as floats) to an integer array.
+
+    Raises:
+        ValueError: if any element is not a whole number.
+    """
+    vector = np.asarray( vector )
+    if np.issubdtype( vector.dtype, np.integer ):
+        return vector
+    integer_vector = vector.astype( np.intp )
+    if not ( integer_vector == vector ).all():
+        raise ValueError('Not a permutation')
+    return integer_vector
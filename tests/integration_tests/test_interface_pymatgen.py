@@ -1,8 +1,12 @@
 import unittest
 from unittest.mock import Mock, MagicMock, patch, call
 import numpy as np
+import os
+import json
+import tempfile
 from pymatgen.core.lattice import Lattice
 from pymatgen.core.structure import Molecule, Structure
+from pymatgen.symmetry.analyzer import SpacegroupAnalyzer
 from bsym.interface.pymatgen import ( unique_symmetry_operations_as_vectors_from_structure, 
                                       space_group_from_structure, 
                                       parse_site_distribution, 
@@ -10,14 +14,20 @@ from bsym.interface.pymatgen import ( unique_symmetry_operations_as_vectors_from
                                       new_structure_from_substitution, 
                                       configuration_space_from_structure, 
                                       space_group_symbol_from_structure, 
-                                      configuration_space_from_molecule )
+                                      configuration_space_from_molecule,
+                                      space_groups_from_structure,
+                                      write_unique_structure_substitutions,
+                                      neighbour_lists_from_structure )
+from bsym.constraints import NeighbourExclusion
 
 from itertools import permutations
 from bsym import ( SymmetryOperation, 
                    Configuration, 
                    SpaceGroup, 
                    PointGroup, 
-                   ConfigurationSpace )
+                   ConfigurationSpace,
+                   ColourOperation,
+                   ColourSymmetryGroup )
 
 class TestPymatgenInterface( unittest.TestCase ):
 
@@ -62,6 +72,18 @@ class TestPymatgenInterface( unittest.TestCase ):
         for l in [ [ 1, 2, 3, 4 ], [ 2, 1, 4, 3 ] ]:
             self.assertEqual( l in mappings, True )
 
+    def test_unique_symmetry_operations_as_vectors_from_structure_backends_agree( self ):
+        # integration test
+        coords = np.array( [ [ 0.0, 0.0, 0.0 ], [ 0.5, 0.5, 0.0 ], [ 0.0, 0.5, 0.5 ], [ 0.5, 0.0, 0.5 ],
+                             [ 0.5, 0.0, 0.0 ], [ 0.0, 0.5, 0.0 ], [ 0.0, 0.0, 0.5 ], [ 0.5, 0.5, 0.5 ] ] )
+        lattice = Lattice.from_parameters( a=4.2, b=4.2, c=4.2, alpha=90, beta=90, gamma=90 )
+        structure = Structure( lattice, [ 'Mg' ] * 4 + [ 'O' ] * 4, coords ) * ( 2, 1, 1 )
+        for subset in [ None, list( structure.indices_from_symbol( 'O' ) ) ]:
+            mappings = unique_symmetry_operations_as_vectors_from_structure( structure, subset=subset )
+            self.assertEqual( mappings, unique_symmetry_operations_as_vectors_from_structure( structure, subset=subset, backend='pymatgen' ) )
+        self.assertEqual( unique_symmetry_operations_as_vectors_from_structure( self.molecule ),
+                          unique_symmetry_operations_as_vectors_from_structure( self.molecule, backend='pymatgen' ) )
+
     @patch( 'bsym.interface.pymatgen.unique_symmetry_operations_as_vectors_from_structure' )
     @patch( 'bsym.symmetry_operation.SymmetryOperation.from_vector' )
     @patch( 'bsym.interface.pymatgen.SpaceGroup' )
@@ -82,7 +104,7 @@ class TestPymatgenInterface( unittest.TestCase ):
         mock_ConfigurationSpace.return_value = mock_configspace
         config_space = configuration_space_from_structure( self.structure )
         self.assertEqual( config_space, mock_configspace )
-        mock_space_group_from_structure.assert_called_with( self.structure, subset=None, atol=1e-5 )
+        mock_space_group_from_structure.assert_called_with( self.structure, subset=None, atol=1e-5, cache=None )
         mock_ConfigurationSpace.assert_called_with( objects=[ 1, 2, 3, 4 ], symmetry_group=mock_space_group )
 
     @patch( 'bsym.interface.pymatgen.point_group_from_molecule' )
@@ -94,7 +116,7 @@ class TestPymatgenInterface( unittest.TestCase ):
         mock_ConfigurationSpace.return_value = mock_configspace
         config_space = configuration_space_from_molecule( self.molecule )
         self.assertEqual( config_space, mock_configspace )
-        mock_point_group_from_molecule.assert_called_with( self.molecule, subset=None, atol=1e-5 )
+        mock_point_group_from_molecule.assert_called_with( self.molecule, subset=None, atol=1e-5, cache=None )
         mock_ConfigurationSpace.assert_called_with( objects=[ 1, 2, 3, 4 ], symmetry_group=mock_point_group )
  
     @patch( 'bsym.interface.pymatgen.unique_symmetry_operations_as_vectors_from_structure' )
@@ -107,8 +129,42 @@ class TestPymatgenInterface( unittest.TestCase ):
         subset = [ 0 ]
         atol = 1e-5
         space_group = space_group_from_structure( self.structure, subset=subset )
-        mock_symmetry_operations_from_structure.assert_called_once_with( self.structure, subset=subset, atol=atol )
+        mock_symmetry_operations_from_structure.assert_called_once_with( self.structure, subset=subset, atol=atol, cache=None )
  
+    def test_unique_symmetry_operations_as_vectors_from_structure_with_cache( self ):
+        # integration test
+        with tempfile.TemporaryDirectory() as directory:
+            mappings = unique_symmetry_operations_as_vectors_from_structure( self.structure, cache=directory )
+            self.assertEqual( len( os.listdir( directory ) ), 1 )
+            with patch( 'pymatgen.symmetry.analyzer.SpacegroupAnalyzer' ) as mock_SpacegroupAnalyzer:
+                cached_mappings = unique_symmetry_operations_as_vectors_from_structure( self.structure, cache=directory )
+                mock_SpacegroupAnalyzer.assert_not_called()
+            self.assertEqual( cached_mappings, mappings )
+            unique_symmetry_operations_as_vectors_from_structure( self.structure, subset=[ 0, 1, 2, 3 ], cache=directory )
+            self.assertEqual( len( os.listdir( directory ) ), 2 )
+
+    def test_space_groups_from_structure( self ):
+        # integration test
+        coords = np.array( [ [ 0.0, 0.0, 0.0 ], [ 0.5, 0.5, 0.0 ], [ 0.0, 0.5, 0.5 ], [ 0.5, 0.0, 0.5 ],
+                             [ 0.5, 0.0, 0.0 ], [ 0.0, 0.5, 0.0 ], [ 0.0, 0.0, 0.5 ], [ 0.5, 0.5, 0.5 ] ] )
+        lattice = Lattice.from_parameters( a=4.2, b=4.2, c=4.2, alpha=90, beta=90, gamma=90 )
+        structure = Structure( lattice, [ 'Mg' ] * 4 + [ 'O' ] * 4, coords ) * ( 2, 1, 1 )
+        subsets = [ 'Mg', list( structure.indices_from_symbol( 'O' ) ), list( range( len( structure ) ) ) ]
+        with patch( 'pymatgen.symmetry.analyzer.SpacegroupAnalyzer', wraps=SpacegroupAnalyzer ) as mock_SpacegroupAnalyzer:
+            space_groups = space_groups_from_structure( structure, subsets )
+            self.assertEqual( mock_SpacegroupAnalyzer.call_count, 1 )
+        for space_group, subset in zip( space_groups, [ 'Mg', 'O', None ] ):
+            self.assertIsInstance( space_group, SpaceGroup )
+            if subset is not None:
+                subset = list( structure.indices_from_symbol( subset ) )
+            expected = space_group_from_structure( structure, subset=subset )
+            np.testing.assert_array_equal( space_group.index_mappings, expected.index_mappings )
+
+    def test_space_groups_from_structure_raises_ValueError_for_a_subset_that_is_not_invariant( self ):
+        # integration test
+        with self.assertRaises( ValueError ):
+            space_groups_from_structure( self.structure, [ [ 0, 1 ] ] )
+
     def test_unique_structure_colourings( self ):
         # integration test
         c = configuration_space_from_molecule( self.molecule )
@@ -145,6 +201,27 @@ class TestPymatgenInterface( unittest.TestCase ):
         np.testing.assert_array_equal( np.array( sorted( [ s.number_of_equivalent_configurations for s in ns ] ) ), np.array( [ 1, 2, 4, 4, 4 ] ) )
         np.testing.assert_array_equal( np.array( sorted( [ s.full_configuration_degeneracy for s in ns ] ) ), np.array( [ 1, 2, 4, 4, 4 ] ) )
 
+    def test_unique_structure_substitutions_with_constraints( self ):
+        # integration test
+        lattice = Lattice.from_parameters( a=4.0, b=4.0, c=4.0, alpha=90, beta=90, gamma=90 )
+        parent_structure = Structure( lattice, [ 'Li' ], [ [ 0.0, 0.0, 0.0 ] ] ) * ( 2, 2, 4 )
+        parent_structure.replace( 0, 'O' )
+        neighbours = neighbour_lists_from_structure( parent_structure, 4.1, 'Li' )
+        self.assertEqual( len( neighbours ), 15 )
+        li_sites = parent_structure.indices_from_symbol( 'Li' )
+        distances = parent_structure.distance_matrix[ np.ix_( li_sites, li_sites ) ]
+        for i, n in enumerate( neighbours ):
+            self.assertEqual( n.tolist(), [ j for j in range( 15 ) if j != i and distances[ i, j ] < 4.1 ] )
+        constraints = [ NeighbourExclusion( neighbours, [ 'Na' ] ) ]
+        site_distribution = { 'Na': 2, 'Li': 13 }
+        ns = unique_structure_substitutions( parent_structure, 'Li', site_distribution, constraints=constraints )
+        all_ns = unique_structure_substitutions( parent_structure, 'Li', site_distribution )
+        expected = [ s for s in all_ns if s.get_distance( *s.indices_from_symbol( 'Na' ) ) > 4.1 ]
+        self.assertTrue( 0 < len( expected ) < len( all_ns ) )
+        self.assertEqual( [ s.species for s in ns ], [ s.species for s in expected ] )
+        self.assertEqual( [ s.number_of_equivalent_configurations for s in ns ],
+                          [ s.number_of_equivalent_configurations for s in expected ] )
+
     def test_unique_structure_substitutions_in_two_steps_gives_full_degeneracies( self ):
         # integration test
         # Create a pymatgen structure with 16 sites in a 4x4 square grid
@@ -175,6 +252,100 @@ class TestPymatgenInterface( unittest.TestCase ):
         np.testing.assert_array_equal( np.array( sorted( [ s.number_of_equivalent_configurations for s in ns ] ) ), np.array( [ 1, 2, 4, 4, 4 ] ) )
         np.testing.assert_array_equal( np.array( sorted( [ s.full_configuration_degeneracy for s in ns ] ) ), np.array( [ 16, 32, 64, 64, 64 ] ) )
 
+    def test_unique_structure_substitutions_carry_stabilizer_subgroups( self ):
+        # integration test
+        # Create a pymatgen structure with 16 sites in a 4x4 square grid
+        coords = np.array( [ [ x, y, 0.0 ] for y in [ 0.0, 0.25, 0.5, 0.75 ] for x in [ 0.0, 0.25, 0.5, 0.75 ] ] )
+        lattice = Lattice.from_parameters( a = 3.0, b=3.0, c=3.0, alpha=90, beta=90, gamma=90 )
+        parent_structure = Structure( lattice, [ 'Li' ] * len( coords ), coords )
+        us = unique_structure_substitutions( parent_structure, 'Li', { 'Na':1, 'Li':15 } )
+        self.assertEqual( us[0].stabilizer_subgroup.size, 8 )
+        self.assertEqual( us[0].stabilizer_subgroup.symmetry_operations[0].index_mapping.shape, ( 16, ) )
+        with patch( 'pymatgen.symmetry.analyzer.SpacegroupAnalyzer' ) as mock_SpacegroupAnalyzer:
+            ns = unique_structure_substitutions( us[0], 'Li', { 'Mg':1, 'Li':14 } )
+            mock_SpacegroupAnalyzer.assert_not_called()
+        np.testing.assert_array_equal( np.array( sorted( [ s.full_configuration_degeneracy for s in ns ] ) ), np.array( [ 16, 32, 64, 64, 64 ] ) )
+        np.testing.assert_array_equal( np.array( sorted( [ s.stabilizer_subgroup.size for s in ns ] ) ), np.array( [ 2, 2, 2, 4, 8 ] ) )
+
+    def test_unique_structure_substitutions_ignore_stabilizer_subgroups_of_changed_structures( self ):
+        # integration test
+        coords = np.array( [ [ x, y, 0.0 ] for y in [ 0.0, 0.25, 0.5, 0.75 ] for x in [ 0.0, 0.25, 0.5, 0.75 ] ] )
+        lattice = Lattice.from_parameters( a = 3.0, b=3.0, c=3.0, alpha=90, beta=90, gamma=90 )
+        parent_structure = Structure( lattice, [ 'Li' ] * len( coords ), coords )
+        changes = [ lambda s: s.make_supercell( [ 2, 1, 1 ] ),
+                    lambda s: s.remove_sites( [ 1 ] ),
+                    lambda s: s.replace( 1, 'Na' ),
+                    lambda s: s.perturb( 0.2 ) ]
+        for change in changes:
+            structure = unique_structure_substitutions( parent_structure, 'Li', { 'Na':1, 'Li':15 } )[0]
+            change( structure )
+            site_distribution = { 'Mg':1, 'Li':len( structure.indices_from_symbol( 'Li' ) ) - 1 }
+            ns = unique_structure_substitutions( structure, 'Li', site_distribution )
+            expected = unique_structure_substitutions( Structure.from_dict( structure.as_dict() ), 'Li', site_distribution )
+            self.assertEqual( sorted( s.number_of_equivalent_configurations for s in ns ),
+                              sorted( s.number_of_equivalent_configurations for s in expected ) )
+
+    def test_unique_structure_substitutions_raises_ValueError_for_a_colour_symmetry_group( self ):
+        # integration test
+        coords = np.array( [ [ x, 0.0, 0.0 ] for x in [ 0.0, 0.25, 0.5, 0.75 ] ] )
+        lattice = Lattice.from_parameters( a = 3.0, b=3.0, c=3.0, alpha=90, beta=90, gamma=90 )
+        parent_structure = Structure( lattice, [ 'Li' ] * len( coords ), coords )
+        identity = ColourOperation.from_index_mapping( np.arange( 4 ), [ { 0:0, 1:1 } ] * 4 )
+        parent_structure.stabilizer_subgroup = ColourSymmetryGroup( [ identity ] )
+        with self.assertRaises( ValueError ):
+            unique_structure_substitutions( parent_structure, 'Li', { 'Na':2, 'Li':2 } )
+
+    def test_write_unique_structure_substitutions( self ):
+        # integration test
+        coords = np.array( [ [ x, y, 0.0 ] for y in [ 0.0, 0.25, 0.5, 0.75 ] for x in [ 0.0, 0.25, 0.5, 0.75 ] ] )
+        lattice = Lattice.from_parameters( a = 3.0, b=3.0, c=3.0, alpha=90, beta=90, gamma=90 )
+        parent_structure = Structure( lattice, [ 'Li' ] * len( coords ), coords )
+        site_distribution = { 'Na':2, 'Li':14 }
+        us = unique_structure_substitutions( parent_structure, 'Li', site_distribution )
+        with tempfile.TemporaryDirectory() as directory:
+            serial = write_unique_structure_substitutions( parent_structure, 'Li', site_distribution, 
+                                                           os.path.join( directory, 'serial' ), fmt='jsonl', chunk_size=2 )
+            self.assertEqual( [ os.path.basename( p ) for p in serial ], [ 'structures_00000.jsonl', 'structures_00001.jsonl', 'structures_00002.jsonl' ] )
+            records = []
+            for path in serial:
+                with open( path ) as f:
+                    records.extend( json.loads( line ) for line in f )
+            self.assertEqual( [ r[ 'species' ] for r in records ], [ [ str( x ) for x in s.species ] for s in us ] )
+            self.assertEqual( [ r[ 'number_of_equivalent_configurations' ] for r in records ], 
+                              [ s.number_of_equivalent_configurations for s in us ] )
+            parallel = write_unique_structure_substitutions( parent_structure, 'Li', site_distribution, 
+                                                             os.path.join( directory, 'parallel' ), fmt='jsonl', chunk_size=2, n_workers=2 )
+            for p1, p2 in zip( serial, parallel ):
+                with open( p1 ) as f1, open( p2 ) as f2:
+                    self.assertEqual( f1.read(), f2.read() )
+
+    def test_unique_structure_substitutions_on_two_sublattices( self ):
+        # integration test
+        coords = np.array( [ [ x, y, 0.0 ] for y in [ 0.0, 0.5 ] for x in [ 0.0, 0.5 ] ] + 
+                           [ [ x, y, 0.0 ] for y in [ 0.25, 0.75 ] for x in [ 0.25, 0.75 ] ] )
+        lattice = Lattice.from_parameters( a=4.0, b=4.0, c=3.0, alpha=90, beta=90, gamma=90 )
+        parent_structure = Structure( lattice, [ 'Li' ] * 4 + [ 'O' ] * 4, coords )
+        to_substitute = { 'Li': { 'Mg': 1, 'Li': 3 }, 'O': { 'F': 2, 'O': 2 } }
+        ns = unique_structure_substitutions( parent_structure, to_substitute )
+        # arranging every substituting element over every site, under the parent symmetry, and keeping the unmixed arrangements
+        space_group = space_group_from_structure( parent_structure )
+        configuration_space = ConfigurationSpace( list( range( 8 ) ), space_group )
+        labels = [ 'Mg', 'Li', 'F', 'O' ]
+        merged = configuration_space.unique_configurations( { 0: 1, 1: 3, 2: 2, 3: 2 } )
+        expected = [ c for c in merged if max( c.tolist()[:4] ) <= 1 ]
+        self.assertEqual( [ [ str( x ) for x in s.species ] for s in ns ], [ [ labels[ k ] for k in c.tolist() ] for c in expected ] )
+        self.assertEqual( [ s.number_of_equivalent_configurations for s in ns ], [ c.count for c in expected ] )
+        self.assertEqual( sum( s.number_of_equivalent_configurations for s in ns ), 4 * 6 )
+        with tempfile.TemporaryDirectory() as directory:
+            paths = write_unique_structure_substitutions( parent_structure, to_substitute, None, directory, fmt='jsonl' )
+            with open( paths[0] ) as f:
+                records = [ json.loads( line ) for line in f ]
+        self.assertEqual( [ r[ 'species' ] for r in records ], [ [ str( x ) for x in s.species ] for s in ns ] )
+        with self.assertRaises( ValueError ):
+            unique_structure_substitutions( parent_structure, to_substitute, { 'Mg': 1, 'Li': 3 } )
+        with self.assertRaises( ValueError ):
+            unique_structure_substitutions( parent_structure, to_substitute, constraints=[] )
+
     def test_unique_structure_substitutions_with_mismatched_site_distribution_raises_ValueError( self ):
         # integration test
         mock_structure = Mock( spec=Structure )
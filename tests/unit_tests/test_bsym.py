@@ -1,6 +1,8 @@
 import unittest
 from unittest.mock import Mock
 import warnings 
+import subprocess
+import sys
 
 class TestBsymTopLevelClasses( unittest.TestCase ):
 
@@ -44,5 +46,30 @@ class TestOldBsymModule( unittest.TestCase ):
                 self.assertEqual( len(w), 1 )
                 self.assertEqual( "You are trying to import bsym.bsym" in str( w[-1].message, True ) )
 
+class TestImportTime( unittest.TestCase ):
+    """
+    ``import bsym`` should only load the packages needed to build the main classes,
+    so that short-lived processes start quickly. Each test imports in a new interpreter.
+    """
+
+    slow_imports = [ 'tqdm', 'pymatgen', 'scipy', 'spglib', 'concurrent.futures.process' ]
+
+    def modules_loaded_by( self, statement ):
+        code = '{}; import sys; print( "\\n".join( sys.modules ) )'.format( statement )
+        output = subprocess.run( [ sys.executable, '-c', code ], capture_output=True, text=True, check=True ).stdout
+        return set( output.split() )
+
+    def assertDoesNotLoadSlowImports( self, statement ):
+        modules = self.modules_loaded_by( statement )
+        for name in self.slow_imports:
+            loaded = [ m for m in modules if m == name or m.startswith( name + '.' ) ]
+            self.assertEqual( loaded, [], msg='{} imports {}'.format( statement, name ) )
+
+    def test_import_bsym_does_not_load_slow_imports( self ):
+        self.assertDoesNotLoadSlowImports( 'import bsym' )
+
+    def test_import_bsym_interface_pymatgen_does_not_load_slow_imports( self ):
+        self.assertDoesNotLoadSlowImports( 'import bsym.interface.pymatgen' )
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+from unittest.mock import patch, PropertyMock
+from bsym import SymmetryGroup, SymmetryOperation, GeneratedSymmetryGroup
+from bsym.checkpoint import EnumerationCheckpoint, CheckpointWriter, sequence_key, symmetry_group_key
+
+class EnumerationCheckpointTestCase( unittest.TestCase ):
+
+    def setUp( self ):
+        self.checkpoint = EnumerationCheckpoint( method='set', sequence=sequence_key( [ 0, 0, 1, 1 ] ),
+                                                 group_key='abc', position=3,
+                                                 vectors=np.array( [ [ 0, 0, 1, 1 ], [ 0, 1, 0, 1 ] ] ),
+                                                 counts=np.array( [ 4, 2 ] ),
+                                                 visited=np.array( [ 3, 5, 6, 9, 10, 12 ], dtype=np.uint64 ) )
+
+    def test_save_and_load( self ):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join( directory, 'checkpoint.npz' )
+            self.checkpoint.save( filename )
+            self.assertEqual( os.listdir( directory ), [ 'checkpoint.npz' ] )
+            loaded = EnumerationCheckpoint.load( filename )
+        self.assertEqual( loaded.method, 'set' )
+        self.assertEqual( loaded.sequence, '[0, 0, 1, 1]' )
+        self.assertEqual( loaded.group_key, 'abc' )
+        self.assertEqual( loaded.position, 3 )
+        np.testing.assert_array_equal( loaded.vectors, self.checkpoint.vectors )
+        np.testing.assert_array_equal( loaded.counts, self.checkpoint.counts )
+        np.testing.assert_array_equal( loaded.visited, self.checkpoint.visited )
+
+    def test_save_and_load_without_visited( self ):
+        self.checkpoint.visited = None
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join( directory, 'checkpoint.npz' )
+            self.checkpoint.save( filename )
+            self.assertEqual( EnumerationCheckpoint.load( filename ).visited, None )
+
+    def test_checkpoint_writer_only_writes_new_representatives( self ):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join( directory, 'checkpoint.npz' )
+            writer = CheckpointWriter( filename, self.checkpoint )
+            writer.add( np.array( [ [ 0, 1, 1, 0 ] ] ), np.array( [ 1 ] ) )
+            writer.save( 4 )
+            writer.add( np.array( [ [ 1, 0, 0, 1 ] ] ), np.array( [ 3 ] ) )
+            writer.save( 5 )
+            self.assertEqual( len( os.listdir( directory ) ), 3 )
+            with np.load( os.path.join( directory, writer.parts[1] ) ) as part:
+                np.testing.assert_array_equal( part[ 'vectors' ], [ [ 1, 0, 0, 1 ] ] )
+            loaded = EnumerationCheckpoint.load( filename )
+            # saving a complete checkpoint over the file removes its parts
+            loaded.save( filename )
+            self.assertEqual( os.listdir( directory ), [ 'checkpoint.npz' ] )
+        self.assertEqual( loaded.position, 5 )
+        np.testing.assert_array_equal( loaded.vectors, [ [ 0, 0, 1, 1 ], [ 0, 1, 0, 1 ], [ 0, 1, 1, 0 ], [ 1, 0, 0, 1 ] ] )
+        np.testing.assert_array_equal( loaded.counts, [ 4, 2, 1, 3 ] )
+        self.assertEqual( loaded.visited, None )
+
+    def test_check_matches( self ):
+        self.checkpoint.check_matches( 'set', sequence_key( [ 0, 0, 1, 1 ] ), 'abc' )
+        for method, sequence, group_key in [ ( 'orderly', '[0, 0, 1, 1]', 'abc' ),
+                                             ( 'set', '[0, 1, 1, 1]', 'abc' ),
+                                             ( 'set', '[0, 0, 1, 1]', 'abd' ) ]:
+            with self.assertRaises( ValueError ):
+                self.checkpoint.check_matches( method, sequence, group_key )
+
+    def test_symmetry_group_key( self ):
+        group = SymmetryGroup( [ SymmetryOperation.from_vector( m, count_from_zero=True )
+                                 for m in [ [ 0, 1, 2 ], [ 1, 2, 0 ], [ 2, 0, 1 ] ] ] )
+        operations = group.symmetry_operations
+        self.assertEqual( symmetry_group_key( group ), symmetry_group_key( SymmetryGroup( operations[:] ) ) )
+        self.assertNotEqual( symmetry_group_key( group ), symmetry_group_key( SymmetryGroup( operations[ :2 ] ) ) )
+        self.assertNotEqual( symmetry_group_key( group ), symmetry_group_key( SymmetryGroup( operations[ ::-1 ] ) ) )
+
+    def test_symmetry_group_key_does_not_build_a_generated_group( self ):
+        generators = [ SymmetryOperation.from_vector( np.roll( np.arange( 12 ), 1 ), count_from_zero=True ),
+                       SymmetryOperation.from_vector( np.arange( 12 )[ ::-1 ], count_from_zero=True ) ]
+        group = GeneratedSymmetryGroup( generators )
+        with patch.object( GeneratedSymmetryGroup, 'index_mappings', new_callable=PropertyMock ) as index_mappings:
+            key = symmetry_group_key( group )
+            index_mappings.assert_not_called()
+        self.assertEqual( key, symmetry_group_key( SymmetryGroup( group.symmetry_operations ) ) )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,10 @@
 import unittest
 import numpy as np
-from bsym import ColourOperation, Configuration
+from bsym import ColourOperation, ColourSymmetryGroup, Configuration, ConfigurationSpace
+from itertools import product
+from bsym.checkpoint import symmetry_group_key
+import os
+import tempfile
 from unittest.mock import patch
 
 class ColourOperationTestCase( unittest.TestCase ):
@@ -44,6 +48,13 @@ class ColourOperationTestCase( unittest.TestCase ):
         np.testing.assert_array_equal( co.matrix, np.array( [ [ 0, 0, 1 ], [ 1, 0, 0 ], [ 0, 1, 0 ] ] ) )
         self.assertEqual( co.colour_mapping, mapping )
 
+    def test_from_vector_with_a_short_mapping_keeps_the_colours_of_the_remaining_sites( self ):
+        mapping = [ { 1: 0, 0: 1 }, { 1: 1, 0: 0 } ]
+        co = ColourOperation.from_vector( [ 1, 2, 3 ], mapping )
+        np.testing.assert_array_equal( co.colour_lut, np.array( [ [ 1, 0 ], [ 0, 1 ], [ 0, 1 ] ] ) )
+        np.testing.assert_array_equal( co.operate_on( Configuration( [ 0, 0, 1 ] ) ).vector, np.array( [ 1, 0, 1 ] ) )
+        np.testing.assert_array_equal( ( co * co ).operate_on( Configuration( [ 0, 0, 1 ] ) ).vector, np.array( [ 0, 0, 1 ] ) )
+
     def test_operate_on( self ):
         matrix = np.array( [ [ 0, 1, 0 ], [ 0, 0, 1 ], [ 1, 0, 0 ] ] )
         colour_mapping = [ { 1:1, 2:2, 3:3 },
@@ -65,5 +76,142 @@ class ColourOperationTestCase( unittest.TestCase ):
         np.testing.assert_array_equal( co_c.matrix , np.array( [ [ 0, 1 ], [ 1, 0 ] ] ) )
         self.assertEqual( co_c.colour_mapping, [ { 0:0, 1:1 }, { 0:0, 1:1 } ] )
 
+    def test_mul_applies_the_right_hand_operation_first( self ):
+        colour_mapping_a = [ { 1:2, 2:3, 3:1 }, { 1:1, 2:2, 3:3 }, { 1:3, 2:1, 3:2 } ]
+        colour_mapping_b = [ { 1:1, 2:3, 3:2 }, { 1:2, 2:1, 3:3 }, { 1:1, 2:2, 3:3 } ]
+        co_a = ColourOperation.from_index_mapping( [ 1, 2, 0 ], colour_mapping_a )
+        co_b = ColourOperation.from_index_mapping( [ 2, 0, 1 ], colour_mapping_b )
+        co_c = co_a * co_b
+        for vector in product( [ 1, 2, 3 ], repeat=3 ):
+            configuration = Configuration( list( vector ) )
+            np.testing.assert_array_equal( co_c.operate_on( configuration ).vector,
+                                           co_a.operate_on( co_b.operate_on( configuration ) ).vector )
+
+    def test_mul_with_a_configuration( self ):
+        colour_mapping = [ { 1:2, 2:1 }, { 1:1, 2:2 } ]
+        co = ColourOperation.from_index_mapping( [ 1, 0 ], colour_mapping )
+        np.testing.assert_array_equal( ( co * Configuration( [ 1, 2 ] ) ).vector, np.array( [ 1, 1 ] ) )
+
+    def test_from_lookup_table( self ):
+        co = ColourOperation.from_lookup_table( [ 1, 0 ], [ 0, 1 ], [ [ 1, 0 ], [ 0, 1 ] ], label='A' )
+        np.testing.assert_array_equal( co.index_mapping, np.array( [ 1, 0 ] ) )
+        self.assertEqual( co.colour_mapping, [ { 0:1, 1:0 }, { 0:0, 1:1 } ] )
+        self.assertEqual( co.label, 'A' )
+
+    def test_from_lookup_table_raises_ValueError_for_a_bad_lookup_table( self ):
+        with self.assertRaises( ValueError ):
+            ColourOperation.from_lookup_table( [ 1, 0 ], [ 0, 1 ], [ [ 1, 0 ] ] )
+        with self.assertRaises( ValueError ):
+            ColourOperation.from_lookup_table( [ 1, 0 ], [ 0, 1 ], [ [ 1, 2 ], [ 0, 1 ] ] )
+
+    def test_colour_mapping_raises_ValueError_for_a_bad_colour_mapping( self ):
+        with self.assertRaises( ValueError ):
+            ColourOperation.from_index_mapping( [ 1, 0 ], [ { 0:1, 1:0 } ] * 3 )
+        with self.assertRaises( ValueError ):
+            ColourOperation.from_index_mapping( [ 1, 0 ], [ { 0:1, 1:0 }, { 0:0 } ] )
+        with self.assertRaises( ValueError ):
+            ColourOperation.from_index_mapping( [ 1, 0 ], [ { 0:1, 1:0 }, { 0:0, 1:2 } ] )
+
+    def test_operate_on_raises_ValueError_for_an_unknown_object( self ):
+        co = ColourOperation.from_index_mapping( [ 1, 0 ], [ { 0:1, 1:0 }, { 0:0, 1:1 } ] )
+        with self.assertRaises( ValueError ):
+            co.operate_on( Configuration( [ 0, 2 ] ) )
+
+    def test_invert( self ):
+        colour_mapping = [ { 1:2, 2:3, 3:1 }, { 1:1, 2:2, 3:3 }, { 1:3, 2:1, 3:2 } ]
+        co = ColourOperation.from_index_mapping( [ 1, 2, 0 ], colour_mapping )
+        inverse = co.invert( label='A' )
+        self.assertEqual( inverse.label, 'A' )
+        for vector in product( [ 1, 2, 3 ], repeat=3 ):
+            configuration = Configuration( list( vector ) )
+            np.testing.assert_array_equal( ( co * inverse ).operate_on( configuration ).vector, configuration.vector )
+            np.testing.assert_array_equal( ( inverse * co ).operate_on( configuration ).vector, configuration.vector )
+
+    def test_invert_raises_ValueError_if_a_colour_mapping_is_not_one_to_one( self ):
+        co = ColourOperation.from_index_mapping( [ 1, 0 ], [ { 0:1, 1:1 }, { 0:0, 1:1 } ] )
+        with self.assertRaises( ValueError ):
+            co.invert()
+
+class ColourSymmetryGroupTestCase( unittest.TestCase ):
+    """Tests for colour symmetry group methods"""
+
+    def setUp( self ):
+        # Rotations of a ring of six sites, with and without exchanging every 0 and 1.
+        n = 6
+        same, swap = { 0:0, 1:1 }, { 0:1, 1:0 }
+        self.operations = [ ColourOperation.from_index_mapping( np.roll( np.arange( n ), r ), [ mapping ] * n )
+                            for r in range( n ) for mapping in [ same, swap ] ]
+        self.group = ColourSymmetryGroup( self.operations )
+
+    def test_orbit_images( self ):
+        configurations = np.array( [ [ 0, 0, 1, 0, 1, 1 ], [ 0, 1, 0, 1, 0, 1 ] ] )
+        images = self.group.orbit_images( configurations )
+        for b, configuration in enumerate( configurations ):
+            for g, co in enumerate( self.operations ):
+                np.testing.assert_array_equal( images[ b, g ], co.operate_on( Configuration( configuration ) ).vector )
+
+    def test_unique_configurations_match_the_orbits( self ):
+        orbits = {}
+        for vector in product( [ 0, 1 ], repeat=6 ):
+            if sum( vector ) == 3:
+                images = { tuple( co.operate_on( Configuration( list( vector ) ) ).tolist() ) for co in self.operations }
+                orbits[ min( images ) ] = len( images )
+        configuration_space = ConfigurationSpace( objects=list( range( 6 ) ), symmetry_group=self.group )
+        for method in [ 'set', 'orderly', 'bitmap' ]:
+            unique_configurations = configuration_space.unique_configurations( { 0:3, 1:3 }, method=method )
+            self.assertEqual( { tuple( c.tolist() ): c.count for c in unique_configurations }, orbits )
+
+    def test_stabilizer( self ):
+        stabilizer = self.group.stabilizer( Configuration( [ 0, 1, 0, 1, 0, 1 ] ) )
+        self.assertIsInstance( stabilizer, ColourSymmetryGroup )
+        self.assertEqual( stabilizer.size, 6 )
+
+    def test_nested_enumeration_raises_ValueError( self ):
+        configuration_space = ConfigurationSpace( objects=list( range( 6 ) ), symmetry_group=self.group )
+        with self.assertRaises( ValueError ):
+            configuration_space.unique_configurations( { 0:3, 1:3 }, method='nested' )
+
+    def test_restricted_to_raises_ValueError( self ):
+        with self.assertRaises( ValueError ):
+            self.group.restricted_to( [ 0, 1, 2 ] )
+
+    def test_cycle_index_raises_ValueError( self ):
+        with self.assertRaises( ValueError ):
+            self.group.cycle_index()
+
+    def test_number_of_unique_configurations_raises_ValueError( self ):
+        configuration_space = ConfigurationSpace( objects=list( range( 6 ) ), symmetry_group=self.group )
+        with self.assertRaises( ValueError ):
+            configuration_space.number_of_unique_configurations( { 0:3, 1:3 } )
+
+    def test_composition_polynomial_raises_ValueError( self ):
+        configuration_space = ConfigurationSpace( objects=list( range( 6 ) ), symmetry_group=self.group )
+        with self.assertRaises( ValueError ):
+            configuration_space.composition_polynomial( [ 0, 1 ] )
+
+    def test_number_of_unique_colourings_raises_ValueError( self ):
+        configuration_space = ConfigurationSpace( objects=list( range( 6 ) ), symmetry_group=self.group )
+        with self.assertRaises( ValueError ):
+            configuration_space.number_of_unique_colourings( [ 0, 1 ] )
+
+    def test_symmetry_group_key_includes_the_colour_lookup_tables( self ):
+        same = { 0:0, 1:1 }
+        unswapped = ColourSymmetryGroup( [ ColourOperation.from_index_mapping( co.index_mapping, [ same ] * 6 )
+                                           for co in self.operations ] )
+        self.assertNotEqual( symmetry_group_key( self.group ), symmetry_group_key( unswapped ) )
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join( directory, 'checkpoint.npz' )
+            configuration_space = ConfigurationSpace( objects=list( range( 6 ) ), symmetry_group=self.group )
+            configuration_space.unique_configurations( { 0:3, 1:3 }, checkpoint=filename )
+            configuration_space = ConfigurationSpace( objects=list( range( 6 ) ), symmetry_group=unswapped )
+            with self.assertRaises( ValueError ):
+                configuration_space.unique_configurations( { 0:3, 1:3 }, resume_from=filename )
+
+    def test_colours_raises_ValueError_for_different_colours( self ):
+        group = ColourSymmetryGroup( [ ColourOperation.from_index_mapping( [ 0, 1 ], [ { 0:0, 1:1 } ] * 2 ),
+                                       ColourOperation.from_index_mapping( [ 0, 1 ], [ { 1:1, 2:2 } ] * 2 ) ] )
+        with self.assertRaises( ValueError ):
+            group.colours
+
 if __name__ == '__main__':
     unittest.main()
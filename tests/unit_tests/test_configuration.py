@@ -2,6 +2,7 @@ import unittest
 from unittest.mock import Mock, patch
 from bsym.configuration import Configuration
 from bsym import SymmetryOperation
+from bsym.key_encoding import BytesKeyEncoder
 import numpy as np
 
 class TestConfiguration(unittest.TestCase):
@@ -101,6 +102,23 @@ class TestConfiguration(unittest.TestCase):
         self.configuration.set_lowest_numeric_representation( symmetry_operations )
         self.assertEqual( self.configuration.lowest_numeric_representation, 2 )
 
+    def test_set_lowest_numeric_representation_keeps_labels( self ):
+        symmetry_operations = [ SymmetryOperation.from_vector( [ 1, 2, 3 ] ) ]
+        keys = []
+        for vector in [ [ 0, 0, 1 ], [ 1, 1, 2 ], [ 3, 3, 7 ] ]:
+            configuration = Configuration( vector )
+            configuration.set_lowest_numeric_representation( symmetry_operations )
+            keys.append( configuration.lowest_numeric_representation )
+        self.assertEqual( len( set( keys ) ), 3 )
+
+    def test_set_lowest_numeric_representation_with_key_encoder( self ):
+        symmetry_operations = [ Mock( spec=SymmetryOperation ), Mock( spec=SymmetryOperation ) ]
+        symmetry_operations[0].operate_on = Mock( return_value = Configuration( [ 0, 1, 0 ] ) )
+        symmetry_operations[1].operate_on = Mock( return_value = Configuration( [ 0, 0, 1 ] ) )
+        key_encoder = BytesKeyEncoder( labels=[ 0, 1 ], dim=3 )
+        self.configuration.set_lowest_numeric_representation( symmetry_operations, key_encoder=key_encoder )
+        self.assertEqual( self.configuration.lowest_numeric_representation, b'\x00\x00\x01' )
+
     def test_numeric_equivalents( self ):
         symmetry_operations = [ Mock( spec=SymmetryOperation ), Mock( spec=SymmetryOperation ) ]
         c1, c2 = Mock( spec=Configuration ), Mock( spec=Configuration )
@@ -110,6 +128,13 @@ class TestConfiguration(unittest.TestCase):
         symmetry_operations[1].operate_on = Mock( return_value = c2 )
         self.assertEqual( self.configuration.numeric_equivalents( symmetry_operations ), [ 4, 2 ] )
 
+    def test_numeric_equivalents_do_not_collide_for_multi_digit_labels( self ):
+        configuration = Configuration( [ 1, 10 ] )
+        symmetry_operations = [ SymmetryOperation.from_vector( [ 1, 2 ] ) ]
+        other = Configuration( [ 11, 0 ] )
+        self.assertNotEqual( configuration.numeric_equivalents( symmetry_operations, key_encoder=BytesKeyEncoder() ),
+                             other.numeric_equivalents( symmetry_operations, key_encoder=BytesKeyEncoder() ) )
+
     def test_as_number( self ):
         with patch( 'bsym.configuration.Configuration.tolist' ) as mock_tolist:
             mock_tolist.side_effect = [ [ 1, 0, 0 ], [ 0, 1, 0 ], [ 0, 0, 1 ] ]
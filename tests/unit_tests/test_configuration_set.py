@@ -0,0 +1,117 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+from bsym import ConfigurationSet, Configuration, ConfigurationSpace, SymmetryGroup, SymmetryOperation
+
+class ConfigurationSetTestCase( unittest.TestCase ):
+
+    def setUp( self ):
+        self.vectors = np.array( [ [ 1, 1, 0, 0 ], [ 1, 0, 1, 0 ], [ 0, 1, 1, 0 ] ] )
+        self.counts = np.array( [ 4, 2, 4 ] )
+        self.configuration_set = ConfigurationSet( self.vectors, self.counts )
+
+    def test_init_stores_labels_compactly( self ):
+        self.assertEqual( self.configuration_set.vectors.dtype, np.uint8 )
+        self.assertEqual( ConfigurationSet( [ [ -1, 300 ] ] ).vectors.dtype, np.int16 )
+        np.testing.assert_array_equal( self.configuration_set.vectors, self.vectors )
+        np.testing.assert_array_equal( self.configuration_set.counts, self.counts )
+        self.assertEqual( self.configuration_set.nbytes, 12 + 24 )
+
+    def test_init_with_default_counts( self ):
+        np.testing.assert_array_equal( ConfigurationSet( self.vectors ).counts, [ 1, 1, 1 ] )
+
+    def test_init_raises_ValueError_for_invalid_arrays( self ):
+        with self.assertRaises( ValueError ):
+            ConfigurationSet( [ 1, 0 ] )
+        with self.assertRaises( ValueError ):
+            ConfigurationSet( self.vectors, [ 1, 2 ] )
+
+    def test_len_and_dim( self ):
+        self.assertEqual( len( self.configuration_set ), 3 )
+        self.assertEqual( self.configuration_set.dim, 4 )
+
+    def test_getitem_with_an_integer_returns_a_Configuration( self ):
+        configuration = self.configuration_set[1]
+        self.assertIsInstance( configuration, Configuration )
+        self.assertEqual( configuration.tolist(), [ 1, 0, 1, 0 ] )
+        self.assertEqual( configuration.count, 2 )
+
+    def test_getitem_with_a_slice_returns_a_ConfigurationSet( self ):
+        subset = self.configuration_set[1:]
+        self.assertIsInstance( subset, ConfigurationSet )
+        np.testing.assert_array_equal( subset.counts, [ 2, 4 ] )
+
+    def test_from_configurations( self ):
+        configurations = self.configuration_set.to_configurations()
+        configuration_set = ConfigurationSet.from_configurations( configurations )
+        np.testing.assert_array_equal( configuration_set.vectors, self.vectors )
+        np.testing.assert_array_equal( configuration_set.counts, self.counts )
+        self.assertEqual( ConfigurationSet.from_configurations( [], dim=4 ).vectors.shape, ( 0, 4 ) )
+
+    def test_filter( self ):
+        np.testing.assert_array_equal( self.configuration_set.filter( self.counts == 4 ).vectors, self.vectors[ [ 0, 2 ] ] )
+        np.testing.assert_array_equal( self.configuration_set.filter( lambda v: v[:, 0] == 1 ).counts, [ 4, 2 ] )
+        with self.assertRaises( ValueError ):
+            self.configuration_set.filter( [ True ] )
+
+    def test_sort( self ):
+        np.testing.assert_array_equal( self.configuration_set.sort().vectors, self.vectors[ [ 2, 1, 0 ] ] )
+        np.testing.assert_array_equal( self.configuration_set.sort( reverse=True ).vectors, self.vectors )
+        np.testing.assert_array_equal( self.configuration_set.sort( 'count' ).vectors, self.vectors[ [ 1, 0, 2 ] ] )
+        np.testing.assert_array_equal( self.configuration_set.sort( 'count', reverse=True ).vectors, self.vectors[ [ 0, 2, 1 ] ] )
+        np.testing.assert_array_equal( self.configuration_set.sort( lambda v: v[:, 2] ).vectors, self.vectors[ [ 0, 1, 2 ] ] )
+        with self.assertRaises( ValueError ):
+            self.configuration_set.sort( 'label' )
+
+    def test_positions( self ):
+        np.testing.assert_array_equal( self.configuration_set.positions( 1 ), [ [ 0, 1 ], [ 0, 2 ], [ 1, 2 ] ] )
+        with self.assertRaises( ValueError ):
+            ConfigurationSet( [ [ 1, 0 ], [ 1, 1 ] ] ).positions( 1 )
+
+    def test_map_objects( self ):
+        objects = [ 'A', 'B', 'C', 'D' ]
+        mapped = self.configuration_set.map_objects( objects )
+        self.assertEqual( sorted( mapped ), [ 0, 1 ] )
+        for i, configuration in enumerate( self.configuration_set ):
+            expected = configuration.map_objects( objects )
+            for label in mapped:
+                self.assertEqual( mapped[ label ][ i ].tolist(), expected[ label ] )
+        with self.assertRaises( ValueError ):
+            self.configuration_set.map_objects( objects[:3] )
+
+    def test_save_and_load( self ):
+        with tempfile.TemporaryDirectory() as directory:
+            for filename in [ 'results.npz', 'results' ]:
+                path = os.path.join( directory, filename )
+                self.configuration_set.save( path )
+                for mmap_mode in [ None, 'r' ]:
+                    loaded = ConfigurationSet.load( path, mmap_mode=mmap_mode )
+                    self.assertEqual( isinstance( loaded.vectors, np.memmap ), mmap_mode is not None )
+                    np.testing.assert_array_equal( loaded.vectors, self.configuration_set.vectors )
+                    self.assertEqual( loaded.vectors.dtype, np.uint8 )
+                    np.testing.assert_array_equal( loaded.counts, self.counts )
+                    np.testing.assert_array_equal( loaded.sort().counts, [ 4, 2, 4 ] )
+                    del loaded
+
+    def test_load_raises_ValueError_if_a_compressed_npz_is_memory_mapped( self ):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join( directory, 'results.npz' )
+            np.savez_compressed( path, vectors=self.vectors, counts=self.counts )
+            np.testing.assert_array_equal( ConfigurationSet.load( path ).vectors, self.vectors )
+            with self.assertRaises( ValueError ):
+                ConfigurationSet.load( path, mmap_mode='r' )
+
+    def test_unique_configuration_set( self ):
+        # integration test
+        symmetry_group = SymmetryGroup( symmetry_operations=[ SymmetryOperation.from_vector( v )
+                                                              for v in [ [ 1, 2, 3, 4 ], [ 2, 3, 4, 1 ], [ 3, 4, 1, 2 ], [ 4, 1, 2, 3 ] ] ] )
+        configuration_space = ConfigurationSpace( [ 1, 2, 3, 4 ], symmetry_group )
+        configuration_set = configuration_space.unique_configuration_set( { 1: 2, 0: 2 } )
+        unique_configurations = configuration_space.unique_configurations( { 1: 2, 0: 2 } )
+        self.assertEqual( [ c.tolist() for c in configuration_set ], [ c.tolist() for c in unique_configurations ] )
+        self.assertEqual( configuration_set.counts.tolist(), [ c.count for c in unique_configurations ] )
+        self.assertEqual( configuration_set.total_count(), 6 )
+
+if __name__ == '__main__':
+    unittest.main()
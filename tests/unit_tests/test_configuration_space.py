@@ -1,16 +1,22 @@
 import unittest
-from unittest.mock import Mock, patch
-from bsym import ConfigurationSpace, SymmetryGroup, SymmetryOperation, Configuration
-from bsym.configuration_space import permutation_as_config_number, colourings_generator
+from unittest.mock import Mock, PropertyMock, patch
+from bsym import ConfigurationSpace, SymmetryGroup, SymmetryOperation, Configuration, SupercellSymmetryGroup
+from bsym.configuration_space import ( permutation_as_config_number, colourings_generator, sublattice_permutations,
+                                       batched_configurations, collect_configurations, iter_configurations )
 import numpy as np
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from bsym.checkpoint import EnumerationCheckpoint
+from bsym.constraints import NeighbourExclusion, GroupCount
 
 class ConfigurationSpaceTestCase( unittest.TestCase ):
 
     def test_configuration_space_is_initialised( self ):
         mock_symmetry_group = Mock( spec=SymmetryGroup )
         mock_symmetry_operations = [ Mock( spec=SymmetryOperation ), Mock( spec=SymmetryOperation ) ]
-        mock_symmetry_operations[0].matrix = np.array( np.zeros( (3,3) ) )
-        mock_symmetry_operations[1].matrix = np.array( np.zeros( (3,3) ) )
+        mock_symmetry_operations[0].index_mapping = np.arange( 3 )
+        mock_symmetry_operations[1].index_mapping = np.arange( 3 )
         mock_symmetry_group.symmetry_operations = mock_symmetry_operations
         object_list = [ 'A', 'B', 'C' ]
         configuration_space = ConfigurationSpace( symmetry_group=mock_symmetry_group, objects=object_list )
@@ -20,13 +26,52 @@ class ConfigurationSpaceTestCase( unittest.TestCase ):
     def test_configuration_space_initialisation_raises_valueerror_if_dimensions_are_inconsistent( self ):
         mock_symmetry_group = Mock( spec=SymmetryGroup )
         mock_symmetry_operations = [ Mock( spec=SymmetryOperation ), Mock( spec=SymmetryOperation ) ]
-        mock_symmetry_operations[0].matrix = np.array( np.zeros( (3,3) ) )
-        mock_symmetry_operations[1].matrix = np.array( np.zeros( (3,3) ) )
+        mock_symmetry_operations[0].index_mapping = np.arange( 3 )
+        mock_symmetry_operations[1].index_mapping = np.arange( 3 )
         mock_symmetry_group.symmetry_operations = mock_symmetry_operations
         object_list = [ 'A', 'B' ]
         with self.assertRaises( ValueError ):
             ConfigurationSpace( symmetry_group=mock_symmetry_group, objects=object_list ) 
 
+    def test_configuration_space_initialised_with_generated_symmetry_group( self ):
+        symmetry_group = SymmetryGroup.from_generators( [ SymmetryOperation.from_vector( [ 2, 3, 1 ] ) ] )
+        configuration_space = ConfigurationSpace( objects=[ 'A', 'B', 'C' ], symmetry_group=symmetry_group )
+        self.assertEqual( configuration_space.symmetry_group, symmetry_group )
+        with self.assertRaises( ValueError ):
+            ConfigurationSpace( objects=[ 'A', 'B' ], symmetry_group=symmetry_group )
+
+    def test_unique_configurations_with_generated_symmetry_group( self ):
+        vectors = [ [ 1, 2, 3, 4 ], [ 2, 3, 4, 1 ], [ 4, 1, 2, 3 ], [ 3, 4, 1, 2 ],
+                    [ 4, 3, 2, 1 ], [ 2, 1, 4, 3 ], [ 1, 4, 3, 2 ], [ 3, 2, 1, 4 ] ]
+        symmetry_group = SymmetryGroup( [ SymmetryOperation.from_vector( v ) for v in vectors ] )
+        generated_symmetry_group = SymmetryGroup.from_generators( [ SymmetryOperation.from_vector( [ 2, 3, 4, 1 ] ),
+                                                                    SymmetryOperation.from_vector( [ 4, 3, 2, 1 ] ) ] )
+        site_distribution = { 2: 1, 1: 1, 0: 2 }
+        for method in [ 'set', 'bitmap', 'orderly' ]:
+            expected = ConfigurationSpace( [ 'a', 'b', 'c', 'd' ], symmetry_group ).unique_configurations(
+                site_distribution, method=method )
+            configurations = ConfigurationSpace( [ 'a', 'b', 'c', 'd' ], generated_symmetry_group ).unique_configurations(
+                site_distribution, method=method )
+            self.assertEqual( configurations, expected )
+            self.assertEqual( [ c.count for c in configurations ], [ c.count for c in expected ] )
+        self.assertEqual( generated_symmetry_group._symmetry_operations, None )
+
+    def test_unique_configurations_with_supercell_symmetry_group( self ):
+        vectors = [ [ 1, 2, 3, 4 ], [ 2, 3, 4, 1 ], [ 4, 1, 2, 3 ], [ 3, 4, 1, 2 ],
+                    [ 4, 3, 2, 1 ], [ 2, 1, 4, 3 ], [ 1, 4, 3, 2 ], [ 3, 2, 1, 4 ] ]
+        symmetry_group = SymmetryGroup( [ SymmetryOperation.from_vector( v ) for v in vectors ] )
+        supercell_symmetry_group = SupercellSymmetryGroup( 
+            point_operations=[ SymmetryOperation.from_vector( [ 1, 2, 3, 4 ] ), SymmetryOperation.from_vector( [ 4, 3, 2, 1 ] ) ],
+            translations=[ SymmetryOperation.from_vector( [ 2, 3, 4, 1 ] ) ] )
+        site_distribution = { 2: 1, 1: 1, 0: 2 }
+        for method in [ 'set', 'orderly' ]:
+            expected = ConfigurationSpace( [ 'a', 'b', 'c', 'd' ], symmetry_group ).unique_configurations(
+                site_distribution, method=method )
+            configurations = ConfigurationSpace( [ 'a', 'b', 'c', 'd' ], supercell_symmetry_group ).unique_configurations(
+                site_distribution, method=method )
+            self.assertEqual( configurations, expected )
+            self.assertEqual( [ c.count for c in configurations ], [ c.count for c in expected ] )
+
     def test_configuration_space_initialised_with_no_symmetry_group( self ):
         object_list = [ 'A', 'B' ]
         configuration_space = ConfigurationSpace( objects=object_list )
@@ -52,8 +97,10 @@ class ConfigurationSpaceTestCase( unittest.TestCase ):
                 configurations = configuration_space.unique_configurations( site_distribution )
                 mock_unique_permutations.assert_called_with( [ 1, 1, 2 ] )
             mock_flatten_list.assert_called_with( [ [1, 1 ], [ 2 ] ] )
-        configuration_space.enumerate_configurations.assert_called_with(
-                          mock_unique_permutations(), verbose=False )
+        args, kwargs = configuration_space.enumerate_configurations.call_args
+        self.assertEqual( args, ( mock_unique_permutations(), ) )
+        self.assertEqual( kwargs[ 'verbose' ], False )
+        self.assertEqual( kwargs[ 'key_encoder' ].labels.tolist(), [ 1, 2 ] )
         self.assertEqual( configurations, [ mock_configuration ] )
 
     def test_unique_colourings( self ):
@@ -66,15 +113,425 @@ class ConfigurationSpaceTestCase( unittest.TestCase ):
             mock_colourings_generator.return_values = [ [ 1, 1, 2 ], [ 1, 2, 1 ], [ 2, 1, 1 ] ]
             colourings = configuration_space.unique_colourings( colours=[ 1, 2 ] )
             mock_colourings_generator.assert_called_with( [1, 2], mock_configuration.dim )    
-        configuration_space.enumerate_configurations.assert_called_with(
-                          mock_colourings_generator(), verbose=False )
+        args, kwargs = configuration_space.enumerate_configurations.call_args
+        self.assertEqual( args, ( mock_colourings_generator(), ) )
+        self.assertEqual( kwargs[ 'verbose' ], False )
         self.assertEqual( colourings, [ mock_configuration ] )
 
+    def test_enumerate_configurations( self ):
+        # square, with C4v symmetry
+        vectors = [ [ 1, 2, 3, 4 ], [ 2, 3, 4, 1 ], [ 4, 1, 2, 3 ], [ 3, 4, 1, 2 ],
+                    [ 4, 3, 2, 1 ], [ 2, 1, 4, 3 ], [ 1, 4, 3, 2 ], [ 3, 2, 1, 4 ] ]
+        symmetry_group = SymmetryGroup( [ SymmetryOperation.from_vector( v ) for v in vectors ] )
+        configuration_space = ConfigurationSpace( objects=[ 'a', 'b', 'c', 'd' ], symmetry_group=symmetry_group )
+        generator = [ [ 0, 0, 1, 1 ], [ 0, 1, 0, 1 ], [ 0, 1, 1, 0 ], [ 1, 0, 0, 1 ], [ 1, 0, 1, 0 ], [ 1, 1, 0, 0 ] ]
+        for batch_size in [ 1, 2, 1024 ]:
+            configurations = configuration_space.enumerate_configurations( iter( generator ), batch_size=batch_size )
+            self.assertEqual( [ c.tolist() for c in configurations ], [ [ 0, 0, 1, 1 ], [ 0, 1, 0, 1 ] ] )
+            self.assertEqual( [ c.count for c in configurations ], [ 4, 2 ] )
+
+    def test_batch_size_is_used_for_screening( self ):
+        symmetry_group = SymmetryGroup( [ SymmetryOperation.from_vector( list( np.roll( np.arange( 1, 5 ), r ) ) )
+                                          for r in range( 4 ) ] )
+        configuration_space = ConfigurationSpace( objects=[ 'a', 'b', 'c', 'd' ], symmetry_group=symmetry_group )
+        expected = [ c.tolist() for c in configuration_space.unique_configurations( { 0: 2, 1: 2 } ) ]
+        enumerations = [ lambda: configuration_space.unique_configurations( { 0: 2, 1: 2 }, batch_size=3 ),
+                         lambda: configuration_space.unique_configurations( { 0: 2, 1: 2 }, method='orderly',
+                                                                            batch_size=3 ),
+                         lambda: list( configuration_space.iter_unique_configurations( { 0: 2, 1: 2 }, batch_size=3 ) ),
+                         lambda: configuration_space.unique_configurations( { 0: 2, 1: 2 }, batch_size=3,
+                                                                            executor=ThreadPoolExecutor( 1 ) ),
+                         lambda: configuration_space.unique_sublattice_configurations( [ ( [ 0, 1, 2, 3 ],
+                                                                                           { 0: 2, 1: 2 } ) ],
+                                                                                       batch_size=3 ) ]
+        for enumerate_configurations in enumerations:
+            with patch( 'bsym.configuration_space.batched_configurations',
+                        wraps=batched_configurations ) as mock_batched_configurations:
+                configurations = enumerate_configurations()
+            self.assertEqual( [ c.tolist() for c in configurations ], expected )
+            self.assertEqual( mock_batched_configurations.call_args[0][1], 3 )
+        with patch( 'bsym.configuration_space.batched_configurations',
+                    wraps=batched_configurations ) as mock_batched_configurations:
+            list( configuration_space.iter_unique_colourings( [ 0, 1 ], batch_size=3 ) )
+        self.assertEqual( mock_batched_configurations.call_args[0][1], 3 )
+    def test_unique_configurations_with_multi_digit_labels( self ):
+        configuration_space = ConfigurationSpace( objects=[ 'a', 'b' ] )
+        configurations = configuration_space.unique_configurations( { 1: 1, 10: 1 } )
+        self.assertEqual( [ c.tolist() for c in configurations ], [ [ 1, 10 ], [ 10, 1 ] ] )
+
+    def test_unique_configurations_with_bitmap( self ):
+        vectors = [ [ 1, 2, 3, 4 ], [ 2, 3, 4, 1 ], [ 4, 1, 2, 3 ], [ 3, 4, 1, 2 ],
+                    [ 4, 3, 2, 1 ], [ 2, 1, 4, 3 ], [ 1, 4, 3, 2 ], [ 3, 2, 1, 4 ] ]
+        symmetry_group = SymmetryGroup( [ SymmetryOperation.from_vector( v ) for v in vectors ] )
+        configuration_space = ConfigurationSpace( objects=[ 'a', 'b', 'c', 'd' ], symmetry_group=symmetry_group )
+        site_distribution = { 2: 1, 1: 1, 0: 2 }
+        expected = configuration_space.unique_configurations( site_distribution, method='set' )
+        configurations = configuration_space.unique_configurations( site_distribution, method='bitmap' )
+        self.assertEqual( configurations, expected )
+        self.assertEqual( [ c.count for c in configurations ], [ c.count for c in expected ] )
+
+    def test_unique_configurations_orderly( self ):
+        vectors = [ [ 1, 2, 3, 4 ], [ 2, 3, 4, 1 ], [ 4, 1, 2, 3 ], [ 3, 4, 1, 2 ],
+                    [ 4, 3, 2, 1 ], [ 2, 1, 4, 3 ], [ 1, 4, 3, 2 ], [ 3, 2, 1, 4 ] ]
+        symmetry_group = SymmetryGroup( [ SymmetryOperation.from_vector( v ) for v in vectors ] )
+        configuration_space = ConfigurationSpace( objects=[ 'a', 'b', 'c', 'd' ], symmetry_group=symmetry_group )
+        site_distribution = { 2: 1, 1: 1, 0: 2 }
+        expected = configuration_space.unique_configurations( site_distribution, method='set' )
+        configurations = configuration_space.unique_configurations( site_distribution, method='orderly' )
+        self.assertEqual( configurations, expected )
+        self.assertEqual( [ c.count for c in configurations ], [ c.count for c in expected ] )
+
+    def test_orderly_configurations( self ):
+        vectors = [ [ 1, 2, 3, 4 ], [ 2, 3, 4, 1 ], [ 3, 4, 1, 2 ], [ 4, 1, 2, 3 ] ]
+        symmetry_group = SymmetryGroup( [ SymmetryOperation.from_vector( v ) for v in vectors ] )
+        configuration_space = ConfigurationSpace( objects=[ 'a', 'b', 'c', 'd' ], symmetry_group=symmetry_group )
+        # configurations do not need to be generated in order
+        generator = [ [ 1, 1, 0, 0 ], [ 0, 1, 0, 1 ], [ 0, 0, 1, 1 ], [ 1, 0, 1, 0 ] ]
+        configurations = configuration_space.orderly_configurations( iter( generator ), batch_size=3 )
+        self.assertEqual( [ c.tolist() for c in configurations ], [ [ 0, 1, 0, 1 ], [ 0, 0, 1, 1 ] ] )
+        self.assertEqual( [ c.count for c in configurations ], [ 2, 4 ] )
+
+    def test_number_of_unique_configurations( self ):
+        vectors = [ [ 1, 2, 3, 4 ], [ 2, 3, 4, 1 ], [ 4, 1, 2, 3 ], [ 3, 4, 1, 2 ],
+                    [ 4, 3, 2, 1 ], [ 2, 1, 4, 3 ], [ 1, 4, 3, 2 ], [ 3, 2, 1, 4 ] ]
+        symmetry_group = SymmetryGroup( [ SymmetryOperation.from_vector( v ) for v in vectors ] )
+        configuration_space = ConfigurationSpace( objects=[ 'a', 'b', 'c', 'd' ], symmetry_group=symmetry_group )
+        for site_distribution in [ { 1: 2, 0: 2 }, { 2: 1, 1: 1, 0: 2 }, { 1: 1, 0: 3 } ]:
+            self.assertEqual( configuration_space.number_of_unique_configurations( site_distribution ),
+                              len( configuration_space.unique_configurations( site_distribution ) ) )
+
+    def test_composition_polynomial( self ):
+        configuration_space = ConfigurationSpace( objects=[ 'a', 'b' ] )
+        self.assertEqual( configuration_space.composition_polynomial( [ 1, 0 ] ), { ( 2, 0 ): 1, ( 1, 1 ): 2, ( 0, 2 ): 1 } )
+
+    def test_number_of_unique_colourings( self ):
+        vectors = [ [ 1, 2, 3 ], [ 2, 3, 1 ], [ 3, 1, 2 ] ]
+        symmetry_group = SymmetryGroup( [ SymmetryOperation.from_vector( v ) for v in vectors ] )
+        configuration_space = ConfigurationSpace( objects=[ 'a', 'b', 'c' ], symmetry_group=symmetry_group )
+        self.assertEqual( configuration_space.number_of_unique_colourings( [ 0, 1 ] ), 4 )
+        self.assertEqual( len( configuration_space.unique_colourings( [ 0, 1 ] ) ), 4 )
+
+    def test_number_of_unique_colourings_raises_ValueError_if_not_a_group( self ):
+        # The identity and two of the three rotations of a square, which are not closed under composition.
+        vectors = [ [ 1, 2, 3, 4 ], [ 2, 3, 4, 1 ], [ 4, 1, 2, 3 ] ]
+        symmetry_group = SymmetryGroup( [ SymmetryOperation.from_vector( v ) for v in vectors ] )
+        configuration_space = ConfigurationSpace( objects=[ 'a', 'b', 'c', 'd' ], symmetry_group=symmetry_group )
+        with self.assertRaises( ValueError ):
+            configuration_space.number_of_unique_colourings( [ 0, 1 ] )
+
+    def test_unique_configurations_raises_ValueError_for_invalid_method( self ):
+        configuration_space = ConfigurationSpace( objects=[ 'a', 'b' ] )
+        with self.assertRaises( ValueError ):
+            configuration_space.unique_configurations( { 1: 1, 0: 1 }, method='foo' )
+
+    def test_unique_configurations_in_parallel( self ):
+        vectors = [ [ 1, 2, 3, 4, 5, 6 ], [ 2, 3, 4, 5, 6, 1 ], [ 3, 4, 5, 6, 1, 2 ],
+                    [ 4, 5, 6, 1, 2, 3 ], [ 5, 6, 1, 2, 3, 4 ], [ 6, 1, 2, 3, 4, 5 ] ]
+        symmetry_group = SymmetryGroup( [ SymmetryOperation.from_vector( v ) for v in vectors ] )
+        configuration_space = ConfigurationSpace( objects=[ 'a', 'b', 'c', 'd', 'e', 'f' ], symmetry_group=symmetry_group )
+        site_distribution = { 2: 1, 1: 2, 0: 3 }
+        expected = configuration_space.unique_configurations( site_distribution )
+        with ThreadPoolExecutor( max_workers=3 ) as executor:
+            configurations = configuration_space.unique_configurations( site_distribution, executor=executor )
+        self.assertEqual( configurations, expected )
+        self.assertEqual( [ c.count for c in configurations ], [ c.count for c in expected ] )
+
+    def test_unique_configurations_with_n_workers( self ):
+        vectors = [ [ 1, 2, 3, 4 ], [ 2, 3, 4, 1 ], [ 3, 4, 1, 2 ], [ 4, 1, 2, 3 ] ]
+        symmetry_group = SymmetryGroup( [ SymmetryOperation.from_vector( v ) for v in vectors ] )
+        configuration_space = ConfigurationSpace( objects=[ 'a', 'b', 'c', 'd' ], symmetry_group=symmetry_group )
+        configurations = configuration_space.unique_configurations( { 1: 2, 0: 2 }, n_workers=2 )
+        self.assertEqual( [ c.tolist() for c in configurations ], [ [ 0, 0, 1, 1 ], [ 0, 1, 0, 1 ] ] )
+        self.assertEqual( [ c.count for c in configurations ], [ 4, 2 ] )
+
+    def test_parallel_unique_configurations_raises_ValueError_for_set_method( self ):
+        configuration_space = ConfigurationSpace( objects=[ 'a', 'b' ] )
+        with self.assertRaises( ValueError ):
+            configuration_space.unique_configurations( { 1: 1, 0: 1 }, method='set', n_workers=2 )
+
+    def test_iter_unique_configurations( self ):
+        vectors = [ [ 1, 2, 3, 4 ], [ 2, 3, 4, 1 ], [ 4, 1, 2, 3 ], [ 3, 4, 1, 2 ],
+                    [ 4, 3, 2, 1 ], [ 2, 1, 4, 3 ], [ 1, 4, 3, 2 ], [ 3, 2, 1, 4 ] ]
+        symmetry_group = SymmetryGroup( [ SymmetryOperation.from_vector( v ) for v in vectors ] )
+        configuration_space = ConfigurationSpace( objects=[ 'a', 'b', 'c', 'd' ], symmetry_group=symmetry_group )
+        site_distribution = { 2: 1, 1: 1, 0: 2 }
+        expected = configuration_space.unique_configurations( site_distribution )
+        for method in [ 'set', 'bitmap', 'orderly' ]:
+            iterator = configuration_space.iter_unique_configurations( site_distribution, method=method )
+            self.assertEqual( next( iterator ), expected[0] )
+            configurations = [ expected[0] ] + list( iterator )
+            self.assertEqual( configurations, expected )
+        configurations = list( configuration_space.iter_unique_configurations( site_distribution, n_workers=2 ) )
+        self.assertEqual( configurations, expected )
+        self.assertEqual( [ c.count for c in configurations ], [ c.count for c in expected ] )
+
+    def test_iter_unique_colourings( self ):
+        vectors = [ [ 1, 2, 3 ], [ 2, 3, 1 ], [ 3, 1, 2 ] ]
+        symmetry_group = SymmetryGroup( [ SymmetryOperation.from_vector( v ) for v in vectors ] )
+        configuration_space = ConfigurationSpace( objects=[ 'a', 'b', 'c' ], symmetry_group=symmetry_group )
+        expected = configuration_space.unique_colourings( [ 0, 1 ] )
+        colourings = list( configuration_space.iter_unique_colourings( [ 0, 1 ] ) )
+        self.assertEqual( colourings, expected )
+        self.assertEqual( [ c.count for c in colourings ], [ c.count for c in expected ] )
+
+    def test_sample_configurations( self ):
+        vectors = [ [ 1, 2, 3, 4 ], [ 2, 3, 4, 1 ], [ 4, 1, 2, 3 ], [ 3, 4, 1, 2 ],
+                    [ 4, 3, 2, 1 ], [ 2, 1, 4, 3 ], [ 1, 4, 3, 2 ], [ 3, 2, 1, 4 ] ]
+        symmetry_group = SymmetryGroup( [ SymmetryOperation.from_vector( v ) for v in vectors ] )
+        configuration_space = ConfigurationSpace( objects=[ 'a', 'b', 'c', 'd' ], symmetry_group=symmetry_group )
+        site_distribution = { 2: 1, 1: 1, 0: 2 }
+        expected = { tuple( c.tolist() ): c.count for c in configuration_space.unique_configurations( site_distribution ) }
+        total = sum( expected.values() )
+        n_samples = 4000
+        for weighting in [ 'uniform', 'orbit_size' ]:
+            samples = configuration_space.sample_configurations( site_distribution, n_samples, weighting=weighting, rng=3 )
+            self.assertEqual( len( samples ), n_samples )
+            drawn = {}
+            for configuration in samples:
+                key = tuple( configuration.tolist() )
+                self.assertEqual( configuration.count, expected[ key ] )
+                drawn[ key ] = drawn.get( key, 0 ) + 1
+            self.assertEqual( set( drawn ), set( expected ) )
+            for key, count in expected.items():
+                probability = 1 / len( expected ) if weighting == 'uniform' else count / total
+                self.assertAlmostEqual( drawn[ key ] / n_samples, probability, delta=0.03 )
+
+    def test_sample_configurations_is_reproducible( self ):
+        vectors = [ [ 1, 2, 3, 4 ], [ 2, 3, 4, 1 ], [ 3, 4, 1, 2 ], [ 4, 1, 2, 3 ] ]
+        symmetry_group = SymmetryGroup( [ SymmetryOperation.from_vector( v ) for v in vectors ] )
+        configuration_space = ConfigurationSpace( objects=[ 'a', 'b', 'c', 'd' ], symmetry_group=symmetry_group )
+        first = configuration_space.sample_configurations( { 1: 2, 0: 2 }, 50, rng=np.random.default_rng( 7 ) )
+        second = configuration_space.sample_configurations( { 1: 2, 0: 2 }, 50, rng=np.random.default_rng( 7 ) )
+        np.testing.assert_array_equal( first.vectors, second.vectors )
+        with self.assertRaises( ValueError ):
+            configuration_space.sample_configurations( { 1: 2, 0: 2 }, 50, weighting='orbit' )
+
+    def test_constrained_configurations( self ):
+        # a ring of eight sites, with rotations and reflections
+        rotations = [ np.roll( np.arange( 8 ), -k ) for k in range( 8 ) ]
+        vectors = [ r + 1 for r in rotations ] + [ r[ ::-1 ] + 1 for r in rotations ]
+        symmetry_group = SymmetryGroup( [ SymmetryOperation.from_vector( v.tolist() ) for v in vectors ] )
+        configuration_space = ConfigurationSpace( objects=list( range( 8 ) ), symmetry_group=symmetry_group )
+        neighbours = [ [ ( i - 1 ) % 8, ( i + 1 ) % 8 ] for i in range( 8 ) ]
+        triples = [ [ i, ( i + 1 ) % 8, ( i + 2 ) % 8 ] for i in range( 8 ) ]
+        constraints = [ NeighbourExclusion( neighbours, [ 'X' ] ), GroupCount( triples, [ 'X', 'Y' ], maximum=2 ) ]
+        site_distribution = { 'X': 2, 'Y': 1, 'Z': 5 }
+        def satisfies( v ):
+            return ( all( not ( v[ i ] == v[ ( i + 1 ) % 8 ] == 'X' ) for i in range( 8 ) ) and
+                     all( sum( v[ j ] in [ 'X', 'Y' ] for j in triple ) <= 2 for triple in triples ) )
+        unique_configurations = configuration_space.unique_configurations( site_distribution )
+        expected = [ c for c in unique_configurations if satisfies( c.tolist() ) ]
+        self.assertTrue( 0 < len( expected ) < len( unique_configurations ) )
+        for batch_size in [ 1, 1024 ]:
+            configurations = configuration_space.constrained_configurations( site_distribution, constraints,
+                                                                             batch_size=batch_size )
+            self.assertEqual( [ c.tolist() for c in configurations ], [ c.tolist() for c in expected ] )
+            self.assertEqual( [ c.count for c in configurations ], [ c.count for c in expected ] )
+
+    def test_constrained_configurations_with_a_generated_group( self ):
+        # a ring of eight sites, with rotations and reflections
+        generators = [ SymmetryOperation.from_index_mapping( np.roll( np.arange( 8 ), -1 ) ),
+                       SymmetryOperation.from_index_mapping( np.arange( 8 )[ ::-1 ] ) ]
+        generated_group = SymmetryGroup.from_generators( generators )
+        symmetry_group = SymmetryGroup( generated_group.symmetry_operations )
+        neighbours = [ [ ( i - 1 ) % 8, ( i + 1 ) % 8 ] for i in range( 8 ) ]
+        constraints = [ NeighbourExclusion( neighbours, [ 2 ] ) ]
+        site_distribution = { 2: 2, 1: 2, 0: 4 }
+        expected = ConfigurationSpace( objects=list( range( 8 ) ),
+                                       symmetry_group=symmetry_group ).constrained_configurations( site_distribution,
+                                                                                                   constraints )
+        configuration_space = ConfigurationSpace( objects=list( range( 8 ) ), symmetry_group=generated_group )
+        # Generate the sixteen group elements a few at a time.
+        with patch( 'bsym.symmetry_group.ELEMENT_BLOCK_ENTRIES', 24 ), \
+             patch.object( type( generated_group ), 'index_mappings', new_callable=PropertyMock ) as index_mappings:
+            configurations = configuration_space.constrained_configurations( site_distribution, constraints )
+            index_mappings.assert_not_called()
+        self.assertEqual( [ c.tolist() for c in configurations ], [ c.tolist() for c in expected ] )
+        self.assertEqual( [ c.count for c in configurations ], [ c.count for c in expected ] )
+
+    def test_constrained_configurations_without_constraints( self ):
+        vectors = [ [ 1, 2, 3, 4, 5, 6 ], [ 2, 3, 4, 5, 6, 1 ], [ 3, 4, 5, 6, 1, 2 ],
+                    [ 4, 5, 6, 1, 2, 3 ], [ 5, 6, 1, 2, 3, 4 ], [ 6, 1, 2, 3, 4, 5 ] ]
+        symmetry_group = SymmetryGroup( [ SymmetryOperation.from_vector( v ) for v in vectors ] )
+        configuration_space = ConfigurationSpace( objects=list( range( 6 ) ), symmetry_group=symmetry_group )
+        site_distribution = { 2: 1, 1: 2, 0: 3 }
+        configurations = configuration_space.constrained_configurations( site_distribution, [] )
+        expected = configuration_space.unique_configurations( site_distribution )
+        self.assertEqual( [ c.tolist() for c in configurations ], [ c.tolist() for c in expected ] )
+        self.assertEqual( [ c.count for c in configurations ], [ c.count for c in expected ] )
+        with self.assertRaises( ValueError ):
+            configuration_space.constrained_configurations( { 1: 2, 0: 3 }, [] )
+
+    def test_unique_configurations_with_nested_method( self ):
+        # a ring of eight sites, with rotations and reflections
+        rotations = [ np.roll( np.arange( 8 ), -k ) for k in range( 8 ) ]
+        vectors = [ r + 1 for r in rotations ] + [ r[ ::-1 ] + 1 for r in rotations ]
+        symmetry_group = SymmetryGroup( [ SymmetryOperation.from_vector( v.tolist() ) for v in vectors ] )
+        configuration_space = ConfigurationSpace( objects=list( range( 8 ) ), symmetry_group=symmetry_group )
+        for site_distribution in [ { 'A': 2, 'B': 2, 'C': 4 }, { 2: 1, 1: 3, 0: 4 }, { 1: 2, 0: 6 }, { 0: 8 } ]:
+            expected = configuration_space.unique_configurations( site_distribution )
+            nested = configuration_space.unique_configurations( site_distribution, method='nested' )
+            self.assertEqual( [ c.tolist() for c in nested ], [ c.tolist() for c in expected ] )
+            self.assertEqual( [ c.count for c in nested ], [ c.count for c in expected ] )
+        configurations = list( configuration_space.iter_unique_configurations( { 2: 1, 1: 3, 0: 4 }, method='nested' ) )
+        configuration_set = configuration_space.unique_configuration_set( { 2: 1, 1: 3, 0: 4 }, method='nested' )
+        expected = configuration_space.unique_configurations( { 2: 1, 1: 3, 0: 4 } )
+        self.assertEqual( [ c.tolist() for c in configurations ], [ c.tolist() for c in expected ] )
+        self.assertEqual( configuration_set.counts.tolist(), [ c.count for c in expected ] )
+        with self.assertRaises( ValueError ):
+            configuration_space.unique_configurations( { 1: 2, 0: 6 }, method='nested', n_workers=2 )
+        with tempfile.TemporaryDirectory() as directory:
+            with self.assertRaises( ValueError ):
+                configuration_space.unique_configurations( { 1: 2, 0: 6 }, method='nested', 
+                                                           checkpoint=os.path.join( directory, 'checkpoint.npz' ) )
+
+
+    def test_unique_configurations_with_nested_method_and_a_generated_group( self ):
+        # a ring of eight sites, with rotations and reflections
+        generators = [ SymmetryOperation.from_index_mapping( np.roll( np.arange( 8 ), -1 ) ),
+                       SymmetryOperation.from_index_mapping( np.arange( 8 )[ ::-1 ] ) ]
+        generated_group = SymmetryGroup.from_generators( generators )
+        symmetry_group = SymmetryGroup( generated_group.symmetry_operations )
+        configuration_space = ConfigurationSpace( objects=list( range( 8 ) ), symmetry_group=generated_group )
+        for site_distribution in [ { 'A': 2, 'B': 2, 'C': 4 }, { 1: 2, 0: 6 } ]:
+            expected = ConfigurationSpace( objects=list( range( 8 ) ),
+                                           symmetry_group=symmetry_group ).unique_configurations( site_distribution )
+            # Generate the sixteen group elements a few at a time.
+            with patch( 'bsym.symmetry_group.ELEMENT_BLOCK_ENTRIES', 24 ), \
+                 patch.object( type( generated_group ), 'index_mappings', new_callable=PropertyMock ) as index_mappings:
+                nested = configuration_space.unique_configurations( site_distribution, method='nested' )
+                index_mappings.assert_not_called()
+            self.assertEqual( [ c.tolist() for c in nested ], [ c.tolist() for c in expected ] )
+            self.assertEqual( [ c.count for c in nested ], [ c.count for c in expected ] )
+    def test_unique_sublattice_configurations( self ):
+        # two squares of four sites, rotated together
+        vectors = [ [ 1, 2, 3, 4, 5, 6, 7, 8 ], [ 2, 3, 4, 1, 6, 7, 8, 5 ], [ 3, 4, 1, 2, 7, 8, 5, 6 ], [ 4, 1, 2, 3, 8, 5, 6, 7 ] ]
+        symmetry_group = SymmetryGroup( [ SymmetryOperation.from_vector( v ) for v in vectors ] )
+        configuration_space = ConfigurationSpace( objects=list( range( 8 ) ), symmetry_group=symmetry_group )
+        sublattices = [ ( [ 0, 1, 2, 3 ], { 1: 1, 0: 3 } ), ( [ 4, 5, 6, 7 ], { 3: 2, 2: 2 } ) ]
+        merged = configuration_space.unique_configurations( { 0: 3, 1: 1, 2: 2, 3: 2 } )
+        expected = [ c for c in merged if max( c.tolist()[:4] ) <= 1 ]
+        for method in [ 'set', 'orderly' ]:
+            configurations = configuration_space.unique_sublattice_configurations( sublattices, method=method )
+            self.assertEqual( [ c.tolist() for c in configurations ], [ c.tolist() for c in expected ] )
+            self.assertEqual( [ c.count for c in configurations ], [ c.count for c in expected ] )
+        self.assertEqual( sum( c.count for c in expected ), 4 * 6 )
+        configurations = list( configuration_space.iter_unique_sublattice_configurations( sublattices ) )
+        self.assertEqual( [ c.tolist() for c in configurations ], [ c.tolist() for c in expected ] )
+
+    def test_unique_sublattice_configurations_raises_ValueError_for_invalid_sublattices( self ):
+        vectors = [ [ 1, 2, 3, 4 ], [ 2, 3, 4, 1 ], [ 3, 4, 1, 2 ], [ 4, 1, 2, 3 ] ]
+        symmetry_group = SymmetryGroup( [ SymmetryOperation.from_vector( v ) for v in vectors ] )
+        configuration_space = ConfigurationSpace( objects=[ 'a', 'b', 'c', 'd' ], symmetry_group=symmetry_group )
+        for sublattices in [ [ ( [ 0, 2 ], { 1: 1, 0: 1 } ), ( [ 1, 2 ], { 1: 1, 0: 1 } ) ],
+                             [ ( [ 0, 2 ], { 1: 1, 0: 1 } ), ( [ 1, 3 ], { 1: 1, 0: 2 } ) ],
+                             [ ( [ 0, 1 ], { 1: 1, 0: 1 } ), ( [ 2, 3 ], { 1: 1, 0: 1 } ) ] ]:
+            with self.assertRaises( ValueError ):
+                configuration_space.unique_sublattice_configurations( sublattices )
+        with self.assertRaises( ValueError ):
+            configuration_space.unique_sublattice_configurations( [ ( [ 0, 1, 2, 3 ], { 1: 2, 0: 2 } ) ], method='bitmap' )
+
+    def test_unique_configurations_with_checkpoint( self ):
+        vectors = [ [ 1, 2, 3, 4 ], [ 2, 3, 4, 1 ], [ 3, 4, 1, 2 ], [ 4, 1, 2, 3 ] ]
+        symmetry_group = SymmetryGroup( [ SymmetryOperation.from_vector( v ) for v in vectors ] )
+        configuration_space = ConfigurationSpace( objects=[ 'a', 'b', 'c', 'd' ], symmetry_group=symmetry_group )
+        site_distribution = { 1: 2, 0: 2 }
+        expected = configuration_space.unique_configurations( site_distribution )
+        for method in [ 'set', 'bitmap', 'orderly' ]:
+            with tempfile.TemporaryDirectory() as directory:
+                filename = os.path.join( directory, 'checkpoint.npz' )
+                configurations = configuration_space.unique_configurations( site_distribution, method=method,
+                                                                            checkpoint=filename )
+                checkpoint = EnumerationCheckpoint.load( filename )
+                resumed = configuration_space.unique_configurations( site_distribution, method=method,
+                                                                     resume_from=filename )
+            self.assertEqual( configurations, expected )
+            self.assertEqual( checkpoint.position, 6 )
+            np.testing.assert_array_equal( checkpoint.vectors, [ [ 0, 0, 1, 1 ], [ 0, 1, 0, 1 ] ] )
+            np.testing.assert_array_equal( checkpoint.counts, [ 4, 2 ] )
+            self.assertEqual( resumed, expected )
+            self.assertEqual( [ c.count for c in resumed ], [ 4, 2 ] )
+
+    def test_unique_configurations_resumes_from_checkpoint( self ):
+        vectors = [ [ 1, 2, 3, 4 ], [ 2, 3, 4, 1 ], [ 3, 4, 1, 2 ], [ 4, 1, 2, 3 ] ]
+        symmetry_group = SymmetryGroup( [ SymmetryOperation.from_vector( v ) for v in vectors ] )
+        configuration_space = ConfigurationSpace( objects=[ 'a', 'b', 'c', 'd' ], symmetry_group=symmetry_group )
+        site_distribution = { 1: 2, 0: 2 }
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join( directory, 'checkpoint.npz' )
+            configuration_space.unique_configurations( site_distribution, method='orderly', checkpoint=filename )
+            checkpoint = EnumerationCheckpoint.load( filename )
+            # roll back to after the first permutation, [ 0, 0, 1, 1 ]
+            checkpoint.position = 1
+            checkpoint.vectors = checkpoint.vectors[ :1 ]
+            checkpoint.counts = checkpoint.counts[ :1 ]
+            checkpoint.save( filename )
+            configurations = list( configuration_space.iter_unique_configurations( site_distribution, method='orderly',
+                                                                                   resume_from=filename ) )
+            parallel = configuration_space.unique_configurations( site_distribution, n_workers=2, resume_from=filename )
+            with self.assertRaises( ValueError ):
+                configuration_space.unique_configurations( site_distribution, method='set', resume_from=filename )
+            with self.assertRaises( ValueError ):
+                configuration_space.unique_configurations( { 1: 1, 0: 3 }, method='orderly', resume_from=filename )
+        for c in [ configurations, parallel ]:
+            self.assertEqual( [ c.tolist() for c in c ], [ [ 0, 0, 1, 1 ], [ 0, 1, 0, 1 ] ] )
+            self.assertEqual( [ c.count for c in c ], [ 4, 2 ] )
+
+    def test_unique_configurations_resumes_from_checkpoint_without_visited_keys( self ):
+        vectors = [ [ 1, 2, 3, 4 ], [ 2, 3, 4, 1 ], [ 3, 4, 1, 2 ], [ 4, 1, 2, 3 ] ]
+        symmetry_group = SymmetryGroup( [ SymmetryOperation.from_vector( v ) for v in vectors ] )
+        configuration_space = ConfigurationSpace( objects=[ 'a', 'b', 'c', 'd' ], symmetry_group=symmetry_group )
+        site_distribution = { 1: 2, 0: 2 }
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join( directory, 'checkpoint.npz' )
+            configuration_space.unique_configurations( site_distribution, method='set', checkpoint=filename )
+            checkpoint = EnumerationCheckpoint.load( filename )
+            self.assertEqual( checkpoint.visited, None )
+            # roll back to after the first permutation, [ 0, 0, 1, 1 ]
+            checkpoint.position = 1
+            checkpoint.vectors = checkpoint.vectors[ :1 ]
+            checkpoint.counts = checkpoint.counts[ :1 ]
+            checkpoint.save( filename )
+            configurations = configuration_space.unique_configurations( site_distribution, method='set',
+                                                                        resume_from=filename, checkpoint=filename )
+            self.assertEqual( len( os.listdir( directory ) ), 2 )
+        self.assertEqual( [ c.tolist() for c in configurations ], [ [ 0, 0, 1, 1 ], [ 0, 1, 0, 1 ] ] )
+        self.assertEqual( [ c.count for c in configurations ], [ 4, 2 ] )
+
 class ConfigurationSpaceModuleFunctionsTestCase( unittest.TestCase ):
       
     def test_permutation_as_config_number( self ):
         self.assertEqual( permutation_as_config_number( [ 1, 1, 0, 0, 1 ] ), 11001 )
 
+    def test_batched_configurations( self ):
+        generator = iter( [ [ 1, 0 ], [ 0, 1 ], [ 1, 1 ] ] )
+        batches = list( batched_configurations( generator, batch_size=2 ) )
+        self.assertEqual( len( batches ), 2 )
+        np.testing.assert_array_equal( batches[0], np.array( [ [ 1, 0 ], [ 0, 1 ] ] ) )
+        np.testing.assert_array_equal( batches[1], np.array( [ [ 1, 1 ] ] ) )
+
+    def test_iter_configurations( self ):
+        blocks = iter( [ ( np.array( [ [ 0, 1 ] ] ), np.array( [ 2 ] ) ), ( np.array( [ [ 1, 1 ] ] ), np.array( [ 1 ] ) ) ] )
+        iterator = iter_configurations( blocks )
+        first = next( iterator )
+        self.assertEqual( first.tolist(), [ 0, 1 ] )
+        self.assertEqual( first.count, 2 )
+        self.assertEqual( [ c.tolist() for c in iterator ], [ [ 1, 1 ] ] )
+
+    def test_collect_configurations( self ):
+        blocks = [ ( np.array( [ [ 0, 1 ] ] ), np.array( [ 2 ] ) ),
+                   ( np.array( [ [ 0, 0 ], [ 1, 1 ] ] ), np.array( [ 1, 1 ] ) ) ]
+        configurations = collect_configurations( iter( blocks ) )
+        self.assertEqual( configurations, [ Configuration( [ 0, 1 ] ), Configuration( [ 0, 0 ] ), Configuration( [ 1, 1 ] ) ] )
+        self.assertEqual( [ c.count for c in configurations ], [ 2, 1, 1 ] )
+
+    def test_sublattice_permutations( self ):
+        configurations = list( sublattice_permutations( [ [ 1, 0 ], [ 3, 2, 2 ] ], [ [ 0, 1 ], [ 2, 3, 4 ] ] ) )
+        self.assertEqual( configurations, [ [ 0, 1, 2, 2, 3 ], [ 0, 1, 2, 3, 2 ], [ 0, 1, 3, 2, 2 ],
+                                           [ 1, 0, 2, 2, 3 ], [ 1, 0, 2, 3, 2 ], [ 1, 0, 3, 2, 2 ] ] )
+        configurations = list( sublattice_permutations( [ [ 1, 0 ], [ 3, 2 ] ], [ [ 3, 0 ], [ 1, 2 ] ] ) )
+        self.assertEqual( configurations, [ [ 1, 2, 3, 0 ], [ 1, 3, 2, 0 ], [ 0, 2, 3, 1 ], [ 0, 3, 2, 1 ] ] )
+
     def test_colourings_generator( self ):
         colourings = list( colourings_generator( [ 1, 0 ], dim=3 ) )
         expected_colourings = [ [1, 1, 1], 
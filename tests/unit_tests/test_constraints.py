@@ -0,0 +1,51 @@
+import unittest
+import numpy as np
+from bsym.constraints import NeighbourExclusion, GroupCount, neighbour_lists, restrict_neighbour_lists
+
+class NeighbourExclusionTestCase( unittest.TestCase ):
+
+    def test_call_rejects_neighbouring_labels( self ):
+        # a chain of four sites, with site 2 listed only as a neighbour of site 1
+        constraint = NeighbourExclusion( [ [ 1 ], [ 0, 2 ], [], [ 2 ] ], labels=[ 1 ] )
+        vectors = np.array( [ [ 1, 0, 1 ], [ 0, 1, 1 ], [ 1, 1, 0 ], [ 0, 0, 1 ] ] )
+        np.testing.assert_array_equal( constraint( vectors, 2 ), [ True, False, True, True ] )
+        np.testing.assert_array_equal( constraint( vectors[ :, :2 ], 1 ), [ True, True, False, True ] )
+
+    def test_call_at_a_site_with_no_earlier_neighbours( self ):
+        constraint = NeighbourExclusion( [ [ 1 ], [ 0 ] ], labels=[ 1 ] )
+        np.testing.assert_array_equal( constraint( np.array( [ [ 1 ], [ 0 ] ] ), 0 ), [ True, True ] )
+
+class GroupCountTestCase( unittest.TestCase ):
+
+    def test_call_checks_maximum( self ):
+        constraint = GroupCount( [ [ 0, 1, 2 ] ], labels=[ 'v' ], maximum=1 )
+        vectors = np.array( [ [ 'v', 'a' ], [ 'v', 'v' ], [ 'a', 'a' ] ] )
+        np.testing.assert_array_equal( constraint( vectors, 1 ), [ True, False, True ] )
+
+    def test_call_checks_minimum_can_still_be_reached( self ):
+        constraint = GroupCount( [ [ 0, 1, 2 ], [ 2, 3 ] ], labels=[ 'v' ], minimum=2 )
+        vectors = np.array( [ [ 'v', 'a' ], [ 'a', 'a' ], [ 'a', 'v' ] ] )
+        np.testing.assert_array_equal( constraint( vectors, 1 ), [ True, False, True ] )
+        vectors = np.array( [ [ 'v', 'a', 'v' ], [ 'v', 'v', 'a' ] ] )
+        np.testing.assert_array_equal( constraint( vectors, 2 ), [ True, False ] )
+
+    def test_call_at_a_site_in_no_group( self ):
+        constraint = GroupCount( [ [ 0, 1 ] ], labels=[ 1 ], maximum=0 )
+        np.testing.assert_array_equal( constraint( np.array( [ [ 0, 0, 1 ] ] ), 2 ), [ True ] )
+
+class ConstraintsModuleFunctionsTestCase( unittest.TestCase ):
+
+    def test_neighbour_lists( self ):
+        coordinates = np.array( [ [ 0.0, 0.0 ], [ 1.0, 0.0 ], [ 2.0, 0.0 ], [ 0.0, 1.0 ] ] )
+        neighbours = neighbour_lists( coordinates, 1.1 )
+        self.assertEqual( [ n.tolist() for n in neighbours ], [ [ 1, 3 ], [ 0, 2 ], [ 1 ], [ 0 ] ] )
+        neighbours = neighbour_lists( [ 0.0, 1.0, 3.0 ], 2.0 )
+        self.assertEqual( [ n.tolist() for n in neighbours ], [ [ 1 ], [ 0, 2 ], [ 1 ] ] )
+
+    def test_restrict_neighbour_lists( self ):
+        neighbours = [ [ 1, 3 ], [ 0, 2 ], [ 1 ], [ 0 ] ]
+        restricted = restrict_neighbour_lists( neighbours, [ 3, 0, 1 ] )
+        self.assertEqual( [ n.tolist() for n in restricted ], [ [ 1 ], [ 0, 2 ], [ 1 ] ] )
+
+if __name__ == '__main__':
+    unittest.main()
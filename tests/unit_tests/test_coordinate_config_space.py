@@ -40,5 +40,11 @@ class CoordinateConfigSpaceTestCase( unittest.TestCase ):
         unique_coordinates = coordinate_config_space.unique_coordinates( site_distribution )
         self.assertEqual( len( unique_coordinates ), 6 ) 
  
+    def test_neighbour_lists( self ):
+        coordinates = np.array( [ [ 0.0, 0.0 ], [ 1.0, 0.0 ], [ 0.0, 1.0 ], [ 1.0, 1.0 ] ] )
+        coordinate_config_space = CoordinateConfigSpace( coordinates )
+        neighbours = coordinate_config_space.neighbour_lists( 1.0 )
+        self.assertEqual( [ n.tolist() for n in neighbours ], [ [ 1, 2 ], [ 0, 3 ], [ 0, 3 ], [ 1, 2 ] ] )
+
 if __name__ == '__main__':
     unittest.main()        
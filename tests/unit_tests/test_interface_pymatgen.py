@@ -13,7 +13,10 @@ from bsym.interface.pymatgen import ( unique_symmetry_operations_as_vectors_from
                                       space_group_symbol_from_structure, 
                                       configuration_space_from_molecule, 
                                       structure_cartesian_coordinates_mapping,
-                                      molecule_cartesian_coordinates_mapping )
+                                      molecule_cartesian_coordinates_mapping,
+                                      site_mappings,
+                                      unique_rows,
+                                      space_groups_from_structure )
 
 from itertools import permutations
 from bsym import SymmetryOperation, Configuration, SpaceGroup, PointGroup, ConfigurationSpace
@@ -82,5 +85,48 @@ class TestPymatgenInterface( unittest.TestCase ):
         np.testing.assert_array_equal( mapped_coords, new_coords )
         np.testing.assert_array_equal( mock_symmop.operate_multi.call_args[0][0], self.molecule.cart_coords )
 
+    def test_site_mappings( self ):
+        identity = SymmOp.from_rotation_and_translation( np.eye( 3 ), [ 0.0, 0.0, 0.0 ] )
+        translation = SymmOp.from_rotation_and_translation( np.eye( 3 ), [ 0.5, 0.5, 0.0 ] )
+        mappings = site_mappings( self.structure.frac_coords, [ identity, translation ] )
+        np.testing.assert_array_equal( mappings, [ [ 0, 1, 2, 3 ], [ 1, 0, 3, 2 ] ] )
+
+    def test_site_mappings_wraps_periodic_coordinates( self ):
+        translation = SymmOp.from_rotation_and_translation( np.eye( 3 ), [ -0.5 - 1e-9, 0.5, 1.0 ] )
+        mappings = site_mappings( self.structure.frac_coords, [ translation ] )
+        np.testing.assert_array_equal( mappings, [ [ 1, 0, 3, 2 ] ] )
+
+    def test_site_mappings_for_cartesian_coordinates( self ):
+        rotation = SymmOp.from_axis_angle_and_translation( [ 0, 0, 1 ], 90 )
+        mappings = site_mappings( self.molecule.cart_coords, [ rotation ], periodic=False )
+        np.testing.assert_array_equal( mappings, [ [ 1, 3, 0, 2 ] ] )
+
+    def test_site_mappings_raises_ValueError_if_a_site_is_not_matched( self ):
+        translation = SymmOp.from_rotation_and_translation( np.eye( 3 ), [ 0.25, 0.0, 0.0 ] )
+        with self.assertRaises( ValueError ):
+            site_mappings( self.structure.frac_coords, [ translation ] )
+
+    def test_site_mappings_raises_ValueError_if_two_sites_are_matched_to_one( self ):
+        projection = SymmOp.from_rotation_and_translation( np.zeros( ( 3, 3 ) ), [ 0.0, 0.0, 0.0 ] )
+        with self.assertRaises( ValueError ):
+            site_mappings( self.structure.frac_coords, [ projection ] )
+
+    def test_unique_rows( self ):
+        rows = np.array( [ [ 1, 2 ], [ 2, 1 ], [ 1, 2 ], [ 2, 1 ], [ 1, 1 ] ] )
+        np.testing.assert_array_equal( unique_rows( rows ), [ [ 1, 2 ], [ 2, 1 ], [ 1, 1 ] ] )
+
+    @patch( 'bsym.interface.pymatgen.space_group_from_structure' )
+    def test_space_groups_from_structure( self, mock_space_group_from_structure ):
+        mock_space_group = Mock( spec=SpaceGroup )
+        mock_space_group.restricted_to.side_effect = [ 'A', 'B' ]
+        mock_space_group_from_structure.return_value = mock_space_group
+        mock_structure = Mock( spec=Structure )
+        mock_structure.indices_from_symbol = Mock( return_value=( 2, 3 ) )
+        space_groups = space_groups_from_structure( mock_structure, [ [ 0, 1 ], 'O' ] )
+        self.assertEqual( space_groups, [ 'A', 'B' ] )
+        mock_space_group_from_structure.assert_called_once_with( mock_structure, atol=1e-5, cache=None )
+        mock_structure.indices_from_symbol.assert_called_with( 'O' )
+        self.assertEqual( mock_space_group.restricted_to.call_args_list, [ call( [ 0, 1 ] ), call( [ 2, 3 ] ) ] )
+
 if __name__ == '__main__':
     unittest.main()
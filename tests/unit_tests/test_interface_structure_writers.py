@@ -0,0 +1,88 @@
+import unittest
+import os
+import json
+import tempfile
+import numpy as np
+from pymatgen.core.structure import Structure
+from pymatgen.io.vasp import Poscar
+from pymatgen.io.xyz import XYZ
+from bsym.interface.structure_writers import ( structure_writer, PoscarWriter, ExtxyzWriter, JsonLinesWriter,
+                                               PROPERTY_NAMES )
+
+class StructureWritersTestCase( unittest.TestCase ):
+
+    def setUp( self ):
+        self.directory = tempfile.TemporaryDirectory()
+        self.lattice = np.array( [ [ 3.0, 0.0, 0.0 ], [ 0.0, 3.0, 0.0 ], [ 0.0, 0.0, 4.0 ] ] )
+        self.coords = np.array( [ [ 0.0, 0.0, 0.0 ], [ 0.5, 0.5, 0.0 ], [ 0.0, 0.5, 0.5 ] ] )
+        self.species = np.array( [ [ 'Li', 'Na', 'Li' ], [ 'Na', 'Li', 'Li' ] ], dtype=object )
+        self.properties = np.array( [ [ 2, 4 ], [ 1, 2 ] ] )
+
+    def tearDown( self ):
+        self.directory.cleanup()
+
+    def test_structure_writer( self ):
+        self.assertIsInstance( structure_writer( 'poscar', self.coords, self.lattice ), PoscarWriter )
+        self.assertIsInstance( structure_writer( 'extxyz', self.coords, self.lattice ), ExtxyzWriter )
+        self.assertIsInstance( structure_writer( 'jsonl', self.coords ), JsonLinesWriter )
+
+    def test_structure_writer_raises_ValueError_for_an_unknown_format( self ):
+        with self.assertRaises( ValueError ):
+            structure_writer( 'cif', self.coords, self.lattice )
+
+    def test_PoscarWriter_raises_ValueError_without_a_lattice( self ):
+        with self.assertRaises( ValueError ):
+            PoscarWriter( self.coords )
+
+    def test_PoscarWriter_write_chunk( self ):
+        writer = PoscarWriter( self.coords, self.lattice )
+        path = writer.chunk_path( self.directory.name, 3 )
+        self.assertEqual( writer.write_chunk( path, 10, self.species, self.properties ), path )
+        self.assertEqual( sorted( os.listdir( path ) ), [ 'POSCAR_00000010', 'POSCAR_00000011' ] )
+        poscar = Poscar.from_file( os.path.join( path, 'POSCAR_00000010' ) )
+        self.assertEqual( poscar.comment, 'Li2 Na1 number_of_equivalent_configurations=2 full_configuration_degeneracy=4' )
+        self.assertEqual( [ str( s ) for s in poscar.structure.species ], [ 'Li', 'Na', 'Li' ] )
+        np.testing.assert_array_almost_equal( poscar.structure.frac_coords, self.coords )
+        np.testing.assert_array_almost_equal( poscar.structure.lattice.matrix, self.lattice )
+
+    def test_ExtxyzWriter_write_chunk( self ):
+        writer = ExtxyzWriter( self.coords, self.lattice )
+        path = writer.chunk_path( self.directory.name, 0 )
+        self.assertEqual( os.path.basename( path ), 'structures_00000.extxyz' )
+        writer.write_chunk( path, 10, self.species, self.properties )
+        with open( path ) as f:
+            text = f.read()
+        lines = text.splitlines()
+        self.assertEqual( len( lines ), 10 )
+        self.assertIn( 'index=11 number_of_equivalent_configurations=1 full_configuration_degeneracy=2', lines[6] )
+        self.assertIn( 'pbc="T T T"', lines[1] )
+        molecules = XYZ.from_str( text ).all_molecules
+        self.assertEqual( [ str( s ) for s in molecules[1].species ], [ 'Na', 'Li', 'Li' ] )
+        np.testing.assert_array_almost_equal( molecules[1].cart_coords, self.coords @ self.lattice )
+
+    def test_ExtxyzWriter_for_a_molecule( self ):
+        writer = ExtxyzWriter( self.coords )
+        frame = writer.format( 0, [ 'Li', 'Na', 'Li' ], [ 2, 4 ] )
+        self.assertNotIn( 'Lattice', frame )
+        self.assertIn( 'pbc="F F F"', frame )
+
+    def test_JsonLinesWriter_write_chunk( self ):
+        writer = JsonLinesWriter( self.coords, self.lattice )
+        path = writer.chunk_path( self.directory.name, 0, prefix='LiNa' )
+        self.assertEqual( os.path.basename( path ), 'LiNa_00000.jsonl' )
+        writer.write_chunk( path, 10, self.species, self.properties )
+        with open( path ) as f:
+            records = [ json.loads( line ) for line in f ]
+        self.assertEqual( [ r[ 'index' ] for r in records ], [ 10, 11 ] )
+        self.assertEqual( records[0][ 'species' ], [ 'Li', 'Na', 'Li' ] )
+        self.assertEqual( [ records[0][ name ] for name in PROPERTY_NAMES ], [ 2, 4 ] )
+        structure = Structure( records[0][ 'lattice' ], records[0][ 'species' ], records[0][ 'frac_coords' ] )
+        np.testing.assert_array_almost_equal( structure.frac_coords, self.coords )
+
+    def test_write_chunk_does_not_leave_temporary_files( self ):
+        for writer in [ PoscarWriter( self.coords, self.lattice ), JsonLinesWriter( self.coords ) ]:
+            writer.write_chunk( writer.chunk_path( self.directory.name, 0 ), 0, self.species, self.properties )
+        self.assertFalse( any( name.endswith( '.tmp' ) for name in os.listdir( self.directory.name ) ) )
+
+if __name__ == '__main__':
+    unittest.main()
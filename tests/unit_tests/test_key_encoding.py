@@ -0,0 +1,127 @@
+import unittest
+import numpy as np
+from bsym.key_encoding import ( KeyEncoder, PackedKeyEncoder, BytesKeyEncoder, PermutationRankEncoder,
+                                KeySet, BitmapKeySet, key_encoder_for, argmin_keys )
+from bsym.permutations import unique_permutations
+
+class KeyEncoderTestCase( unittest.TestCase ):
+
+    def test_label_indices( self ):
+        encoder = KeyEncoder( labels=[ 10, 1, 0 ], dim=2 )
+        np.testing.assert_array_equal( encoder.label_indices( [ [ 1, 10 ], [ 0, 0 ] ] ), [ [ 1, 2 ], [ 0, 0 ] ] )
+
+    def test_label_indices_with_consecutive_labels( self ):
+        encoder = KeyEncoder( labels=[ 3, 2, 4 ], dim=2 )
+        np.testing.assert_array_equal( encoder.label_indices( [ [ 4, 2 ] ] ), [ [ 2, 0 ] ] )
+
+    def test_label_indices_raises_ValueError_for_unknown_label( self ):
+        for labels in [ [ 0, 1 ], [ 0, 10 ] ]:
+            encoder = KeyEncoder( labels=labels, dim=2 )
+            with self.assertRaises( ValueError ):
+                encoder.label_indices( [ [ 0, 2 ] ] )
+
+    def test_label_indices_raises_ValueError_for_wrong_dim( self ):
+        encoder = KeyEncoder( labels=[ 0, 1 ], dim=3 )
+        with self.assertRaises( ValueError ):
+            encoder.label_indices( [ [ 0, 1 ] ] )
+
+class PackedKeyEncoderTestCase( unittest.TestCase ):
+
+    def test_encode( self ):
+        encoder = PackedKeyEncoder( labels=[ 0, 1, 10 ], dim=2 )
+        keys = encoder.encode( np.array( [ [ 1, 10 ], [ 10, 0 ], [ 0, 0 ] ] ) )
+        self.assertEqual( keys.dtype, np.uint64 )
+        self.assertEqual( keys.tolist(), [ 5, 6, 0 ] )
+
+    def test_encode_preserves_lexicographic_order( self ):
+        encoder = PackedKeyEncoder( labels=[ 0, 1, 2 ], dim=4 )
+        vectors = np.array( [ [ 0, 2, 1, 1 ], [ 1, 0, 0, 0 ], [ 0, 2, 2, 0 ], [ 2, 0, 0, 0 ] ] )
+        order = sorted( range( 4 ), key=lambda i: vectors[i].tolist() )
+        self.assertEqual( np.argsort( encoder.encode( vectors ) ).tolist(), order )
+
+    def test_fits( self ):
+        self.assertEqual( PackedKeyEncoder.fits( 2, 64 ), True )
+        self.assertEqual( PackedKeyEncoder.fits( 2, 65 ), False )
+
+    def test_raises_ValueError_if_keys_do_not_fit( self ):
+        with self.assertRaises( ValueError ):
+            PackedKeyEncoder( labels=[ 0, 1, 2 ], dim=41 )
+
+    def test_key( self ):
+        encoder = PackedKeyEncoder( labels=[ 0, 1 ], dim=3 )
+        self.assertEqual( encoder.key( [ 1, 0, 1 ] ), 5 )
+
+class BytesKeyEncoderTestCase( unittest.TestCase ):
+
+    def test_encode_with_labels( self ):
+        encoder = BytesKeyEncoder( labels=[ 0, 1, 10 ], dim=2 )
+        self.assertEqual( encoder.encode( np.array( [ [ 1, 10 ], [ 10, 0 ] ] ) ).tolist(), [ b'\x01\x02', b'\x02\x00' ] )
+
+    def test_encode_without_labels_does_not_collide( self ):
+        encoder = BytesKeyEncoder()
+        keys = encoder.encode( np.array( [ [ 1, 10 ], [ 11, 0 ] ] ) ).tolist()
+        self.assertNotEqual( keys[0], keys[1] )
+
+    def test_encode_preserves_lexicographic_order( self ):
+        vectors = np.array( [ [ 0, -2, 1 ], [ -1, 0, 0 ], [ 0, 300, 0 ], [ 0, -2, 0 ] ] )
+        order = sorted( range( 4 ), key=lambda i: vectors[i].tolist() )
+        for encoder in [ BytesKeyEncoder(), BytesKeyEncoder( labels=[ -2, -1, 0, 1, 300 ] ) ]:
+            self.assertEqual( np.argsort( encoder.encode( vectors ) ).tolist(), order )
+
+    def test_encode_with_many_labels( self ):
+        encoder = BytesKeyEncoder( labels=range( 1000 ), dim=2 )
+        keys = encoder.encode( np.array( [ [ 999, 0 ], [ 0, 999 ] ] ) ).tolist()
+        self.assertEqual( keys, [ b'\x03\xe7\x00\x00', b'\x00\x00\x03\xe7' ] )
+
+class PermutationRankEncoderTestCase( unittest.TestCase ):
+
+    def test_encode_matches_unique_permutations_order( self ):
+        seq = [ 3, 0, 1, 1, 3, 3 ]
+        encoder = PermutationRankEncoder( seq )
+        vectors = np.array( list( unique_permutations( seq ) ) )
+        np.testing.assert_array_equal( encoder.encode( vectors ), np.arange( len( vectors ) ) )
+        self.assertEqual( encoder.size, len( vectors ) )
+
+    def test_encode_preserves_shape( self ):
+        encoder = PermutationRankEncoder( [ 1, 1, 0, 0 ] )
+        keys = encoder.encode( np.array( [ [ [ 0, 0, 1, 1 ], [ 1, 1, 0, 0 ] ] ] ) )
+        np.testing.assert_array_equal( keys, [ [ 0, 5 ] ] )
+
+    def test_encode_raises_ValueError_for_other_multisets( self ):
+        encoder = PermutationRankEncoder( [ 1, 1, 0, 0 ] )
+        with self.assertRaises( ValueError ):
+            encoder.encode( np.array( [ [ 1, 1, 1, 0 ] ] ) )
+
+    def test_raises_ValueError_if_too_many_permutations( self ):
+        with self.assertRaises( ValueError ):
+            PermutationRankEncoder( [ 0 ] * 50 + [ 1 ] * 50 )
+
+class KeySetTestCase( unittest.TestCase ):
+
+    def test_add_and_contains( self ):
+        for key_set in [ KeySet(), BitmapKeySet( 100 ) ]:
+            key_set.add( np.array( [ [ 3, 9 ], [ 9, 99 ] ] ) )
+            self.assertEqual( len( key_set ), 3 )
+            np.testing.assert_array_equal( key_set.contains( np.array( [ [ 3, 4 ], [ 99, 0 ] ] ) ),
+                                           [ [ True, False ], [ True, False ] ] )
+
+    def test_bitmap_key_set_uses_one_bit_per_key( self ):
+        self.assertEqual( BitmapKeySet( 17 ).bits.nbytes, 3 )
+
+class KeyEncodingModuleFunctionsTestCase( unittest.TestCase ):
+
+    def test_key_encoder_for_returns_packed_encoder_if_possible( self ):
+        self.assertIsInstance( key_encoder_for( [ 0, 1 ], 64 ), PackedKeyEncoder )
+
+    def test_key_encoder_for_returns_bytes_encoder_for_long_vectors( self ):
+        encoder = key_encoder_for( [ 0, 1 ], 128 )
+        self.assertIsInstance( encoder, BytesKeyEncoder )
+        self.assertEqual( encoder.dim, 128 )
+
+    def test_argmin_keys( self ):
+        vectors = np.array( [ [ [ 1, 0 ], [ 0, 1 ], [ 1, 1 ] ], [ [ 1, 1 ], [ 1, 0 ], [ 1, 1 ] ] ] )
+        for encoder in [ PackedKeyEncoder( [ 0, 1 ], 2 ), BytesKeyEncoder() ]:
+            np.testing.assert_array_equal( argmin_keys( encoder.encode( vectors ) ), [ 1, 1 ] )
+
+if __name__ == '__main__':
+    unittest.main()
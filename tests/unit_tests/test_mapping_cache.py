@@ -0,0 +1,76 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+from bsym.mapping_cache import MappingCache, fingerprint, mapping_cache
+
+class MappingCacheTestCase( unittest.TestCase ):
+
+    def setUp( self ):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = MappingCache( self.directory.name )
+        self.mappings = [ [ 1, 2, 3 ], [ 2, 3, 1 ], [ 3, 1, 2 ] ]
+
+    def tearDown( self ):
+        self.directory.cleanup()
+
+    def test_put_and_get( self ):
+        self.cache.put( 'abc', self.mappings )
+        mappings = self.cache.get( 'abc' )
+        np.testing.assert_array_equal( mappings, self.mappings )
+        self.assertEqual( mappings.dtype, np.uint8 )
+
+    def test_get_returns_None_for_a_missing_key( self ):
+        self.assertEqual( self.cache.get( 'abc' ), None )
+
+    def test_get_discards_a_damaged_entry( self ):
+        self.cache.put( 'abc', self.mappings )
+        path = self.cache._path( 'abc' )
+        with open( path, 'wb' ) as f:
+            f.write( b'not a cache entry' )
+        self.assertEqual( self.cache.get( 'abc' ), None )
+        self.assertFalse( os.path.exists( path ) )
+
+    def test_get_discards_an_entry_with_a_different_key( self ):
+        self.cache.put( 'abc', self.mappings )
+        os.replace( self.cache._path( 'abc' ), self.cache._path( 'xyz' ) )
+        self.assertEqual( self.cache.get( 'xyz' ), None )
+        self.assertEqual( os.listdir( self.directory.name ), [] )
+
+    def test_get_discards_an_entry_that_is_not_a_set_of_mappings( self ):
+        self.cache.put( 'abc', [ [ 1, 1, 3 ] ] )
+        self.assertEqual( self.cache.get( 'abc' ), None )
+
+    def test_put_evicts_the_least_recently_used_entries( self ):
+        for i, key in enumerate( [ 'a', 'b', 'c' ] ):
+            self.cache.put( key, self.mappings )
+            os.utime( self.cache._path( key ), ( i, i ) )
+        self.cache.get( 'a' )
+        self.cache.max_bytes = 3 * os.path.getsize( self.cache._path( 'a' ) )
+        self.cache.put( 'd', self.mappings )
+        self.assertEqual( [ self.cache.get( key ) is not None for key in 'abcd' ], [ True, False, True, True ] )
+
+    def test_clear( self ):
+        self.cache.put( 'abc', self.mappings )
+        self.cache.clear()
+        self.assertEqual( self.cache.get( 'abc' ), None )
+
+class MappingCacheModuleFunctionsTestCase( unittest.TestCase ):
+
+    def test_fingerprint( self ):
+        coords = np.array( [ [ 0.0, 0.0, 0.0 ], [ 0.5, 0.5, 0.5 ] ] )
+        key = fingerprint( 'Structure', coords, [ 'Li', 'O' ], 1e-5, None )
+        self.assertEqual( key, fingerprint( 'Structure', coords.copy(), [ 'Li', 'O' ], 1e-5, None ) )
+        self.assertNotEqual( key, fingerprint( 'Structure', coords + 1e-9, [ 'Li', 'O' ], 1e-5, None ) )
+        self.assertNotEqual( key, fingerprint( 'Structure', coords, [ 'Li', 'O' ], 1e-4, None ) )
+        self.assertNotEqual( key, fingerprint( 'Structure', coords, [ 'Li', 'O' ], 1e-5, [ 0 ] ) )
+
+    def test_mapping_cache( self ):
+        self.assertEqual( mapping_cache( None ), None )
+        with tempfile.TemporaryDirectory() as directory:
+            cache = mapping_cache( directory )
+            self.assertIsInstance( cache, MappingCache )
+            self.assertIs( mapping_cache( cache ), cache )
+
+if __name__ == '__main__':
+    unittest.main()
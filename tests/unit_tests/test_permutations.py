@@ -15,6 +15,10 @@ class PermutationsTestCase( unittest.TestCase ):
         self.assertEqual( permutations.number_of_unique_permutations( b ), 12870 )
         c = [1,1,2,2,3,3]
         self.assertEqual( permutations.number_of_unique_permutations( c ), 90 )
+
+    def test_number_of_unique_permutations_is_exact_for_large_sequences( self ):
+        a = [1]*40 + [0]*40
+        self.assertEqual( permutations.number_of_unique_permutations( a ), 107507208733336176461620 )
   
     def test_unique_permuations( self ):
         all_permutations = [ [ 1, 1, 0, 0 ],
@@ -30,5 +34,27 @@ class PermutationsTestCase( unittest.TestCase ):
             for p2 in all_permutations:
                 self.assertEqual( p2 in unique_permutations, True )
  
+    def test_unique_permutations_in_rank_range( self ):
+        seq = [ 2, 0, 1, 1, 0 ]
+        all_permutations = list( permutations.unique_permutations( seq ) )
+        self.assertEqual( list( permutations.unique_permutations( seq, 4, 11 ) ), all_permutations[4:11] )
+        self.assertEqual( list( permutations.unique_permutations( seq, 25 ) ), all_permutations[25:] )
+        self.assertEqual( list( permutations.unique_permutations( seq, 3, 3 ) ), [] )
+
+    def test_rank_permutation( self ):
+        seq = [ 2, 0, 1, 1, 0 ]
+        for rank, p in enumerate( permutations.unique_permutations( seq ) ):
+            self.assertEqual( permutations.rank_permutation( p ), rank )
+
+    def test_unrank_permutation( self ):
+        seq = [ 2, 0, 1, 1, 0 ]
+        for rank, p in enumerate( permutations.unique_permutations( seq ) ):
+            self.assertEqual( permutations.unrank_permutation( rank, seq ), p )
+
+    def test_unrank_permutation_raises_ValueError_for_invalid_rank( self ):
+        for rank in [ -1, 6 ]:
+            with self.assertRaises( ValueError ):
+                permutations.unrank_permutation( rank, [ 1, 1, 0, 0 ] )
+
 if __name__ == '__main__':
     unittest.main()
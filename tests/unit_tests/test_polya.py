@@ -0,0 +1,42 @@
+import unittest
+import numpy as np
+from collections import Counter
+from bsym.polya import cycle_index, count_orbits, count_colourings, composition_polynomial
+
+class PolyaTestCase( unittest.TestCase ):
+
+    def setUp( self ):
+        # C4v symmetry operations for the corners of a square
+        self.c4v = np.array( [ [ 0, 1, 2, 3 ], [ 1, 2, 3, 0 ], [ 3, 0, 1, 2 ], [ 2, 3, 0, 1 ],
+                               [ 3, 2, 1, 0 ], [ 1, 0, 3, 2 ], [ 0, 3, 2, 1 ], [ 2, 1, 0, 3 ] ] )
+
+    def test_cycle_index( self ):
+        expected = Counter( { ( ( 1, 4 ), ): 1,
+                              ( ( 4, 1 ), ): 2,
+                              ( ( 2, 2 ), ): 3,
+                              ( ( 1, 2 ), ( 2, 1 ) ): 2 } )
+        self.assertEqual( cycle_index( self.c4v ), expected )
+
+    def test_count_orbits( self ):
+        self.assertEqual( count_orbits( cycle_index( self.c4v ), [ 2, 2 ] ), 2 )
+        self.assertEqual( count_orbits( cycle_index( self.c4v ), [ 1, 1, 2 ] ), 2 )
+        self.assertEqual( count_orbits( cycle_index( self.c4v ), [ 4, 0 ] ), 1 )
+
+    def test_count_orbits_raises_ValueError_if_not_a_group( self ):
+        with self.assertRaises( ValueError ):
+            count_orbits( cycle_index( self.c4v[:3] ), [ 1, 3 ] )
+
+    def test_count_colourings( self ):
+        self.assertEqual( count_colourings( cycle_index( self.c4v ), 2 ), 6 )
+        self.assertEqual( count_colourings( cycle_index( self.c4v ), 3 ), 21 )
+
+    def test_count_colourings_raises_ValueError_if_not_a_group( self ):
+        with self.assertRaises( ValueError ):
+            count_colourings( cycle_index( self.c4v[:3] ), 2 )
+
+    def test_composition_polynomial( self ):
+        polynomial = composition_polynomial( cycle_index( self.c4v ), 2 )
+        self.assertEqual( polynomial, { ( 4, 0 ): 1, ( 3, 1 ): 1, ( 2, 2 ): 2, ( 1, 3 ): 1, ( 0, 4 ): 1 } )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import unittest
+import numpy as np
+from itertools import permutations
+from bsym.stabilizer_chain import StabilizerChain
+
+def closure( generators, degree ):
+    elements = { tuple( range( degree ) ) }
+    frontier = list( elements )
+    while frontier:
+        new = []
+        for a in frontier:
+            for g in generators:
+                c = tuple( np.asarray( g )[ list( a ) ] )
+                if c not in elements:
+                    elements.add( c )
+                    new.append( c )
+        frontier = new
+    return elements
+
+class StabilizerChainTestCase( unittest.TestCase ):
+
+    def setUp( self ):
+        # C4v symmetry of the corners of a square, generated by a rotation and a reflection,
+        # acting on two squares independently, with an extra swap of the two squares.
+        rotation = [ 1, 2, 3, 0, 4, 5, 6, 7 ]
+        reflection = [ 3, 2, 1, 0, 4, 5, 6, 7 ]
+        swap = [ 4, 5, 6, 7, 0, 1, 2, 3 ]
+        self.generators = np.array( [ rotation, reflection, swap ] )
+        self.elements = closure( self.generators, 8 )
+        self.chain = StabilizerChain( self.generators )
+
+    def test_order( self ):
+        self.assertEqual( self.chain.order(), len( self.elements ) )
+        self.assertEqual( self.chain.order(), 128 )
+
+    def test_order_of_symmetric_group( self ):
+        generators = [ [ 1, 0, 2, 3, 4, 5, 6 ], [ 1, 2, 3, 4, 5, 6, 0 ] ]
+        self.assertEqual( StabilizerChain( generators ).order(), 5040 )
+
+    def test_trivial_group( self ):
+        chain = StabilizerChain( np.empty( ( 0, 3 ), dtype=int ), degree=3 )
+        self.assertEqual( chain.order(), 1 )
+        self.assertTrue( chain.contains( [ 0, 1, 2 ] ) )
+        self.assertFalse( chain.contains( [ 1, 0, 2 ] ) )
+        np.testing.assert_array_equal( chain.elements(), [ [ 0, 1, 2 ] ] )
+
+    def test_contains( self ):
+        for p in permutations( range( 8 ) ):
+            self.assertEqual( self.chain.contains( p ), p in self.elements )
+
+    def test_contains_returns_false_for_wrong_degree( self ):
+        self.assertFalse( self.chain.contains( [ 0, 1, 2 ] ) )
+
+    def test_initialisation_raises_ValueError_for_invalid_permutation( self ):
+        with self.assertRaises( ValueError ):
+            StabilizerChain( [ [ 0, 0, 1 ] ] )
+
+    def test_elements( self ):
+        elements = self.chain.elements()
+        self.assertEqual( elements.shape, ( 128, 8 ) )
+        np.testing.assert_array_equal( elements[0], np.arange( 8 ) )
+        self.assertEqual( { tuple( e ) for e in elements.tolist() }, self.elements )
+
+    def test_iter_elements( self ):
+        for block_size in [ 1, 4, 16, 1000 ]:
+            blocks = list( self.chain.iter_elements( block_size ) )
+            np.testing.assert_array_equal( np.concatenate( blocks ), self.chain.elements() )
+            if block_size >= max( len( o ) for o in self.chain.basic_orbits ):
+                self.assertTrue( all( len( b ) <= block_size for b in blocks ) )
+
+    def test_random_element( self ):
+        rng = np.random.default_rng( 0 )
+        for _ in range( 20 ):
+            self.assertTrue( tuple( self.chain.random_element( rng ).tolist() ) in self.elements )
+        np.testing.assert_array_equal( self.chain.random_element( 3 ), self.chain.random_element( 3 ) )
+
+    def test_base( self ):
+        chain = StabilizerChain( self.generators, base=[ 5, 1 ] )
+        self.assertEqual( chain.base[ :2 ], [ 5, 1 ] )
+        self.assertEqual( chain.order(), 128 )
+        self.assertEqual( len( chain.basic_orbits[0] ), 8 )
+
+    def test_strong_generators_generate_the_group( self ):
+        self.assertEqual( closure( self.chain.strong_generators, 8 ), self.elements )
+
+    def test_stabilizer( self ):
+        for points in [ 0, [ 0 ], [ 0, 1 ], [ 2, 4 ] ]:
+            fixed = [ points ] if np.isscalar( points ) else points
+            expected = { e for e in self.elements if all( e[ p ] == p for p in fixed ) }
+            stabilizer = self.chain.stabilizer( points )
+            self.assertEqual( stabilizer.order(), len( expected ) )
+            self.assertEqual( { tuple( e ) for e in stabilizer.elements().tolist() }, expected )
+
+    def test_orbit( self ):
+        np.testing.assert_array_equal( self.chain.orbit( 5 ), np.arange( 8 ) )
+        chain = StabilizerChain( [ [ 1, 0, 2, 3 ], [ 0, 1, 3, 2 ] ] )
+        np.testing.assert_array_equal( chain.orbit( 3 ), [ 2, 3 ] )
+
+    def test_orbits( self ):
+        chain = StabilizerChain( [ [ 1, 2, 0, 3, 4 ] ] )
+        self.assertEqual( [ o.tolist() for o in chain.orbits() ], [ [ 0, 1, 2 ], [ 3 ], [ 4 ] ] )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,6 @@
 import unittest
-from bsym import SymmetryGroup, SymmetryOperation
+from bsym import SymmetryGroup, SymmetryOperation, GeneratedSymmetryGroup, SupercellSymmetryGroup
+from bsym.key_encoding import PackedKeyEncoder
 from bsym.configuration import Configuration
 from unittest.mock import Mock, patch, call
 import numpy as np
@@ -99,5 +100,255 @@ class SymmetryGroupTestCase( unittest.TestCase ):
         all_configurations = sg.operate_on(configuration, minimal_set=True)
         self.assertEqual(all_configurations, [Configuration([0, 0, 1])])
 
+    def test_index_mappings(self):
+        s0 = SymmetryOperation.from_vector([1, 2, 3])
+        s1 = SymmetryOperation.from_vector([2, 3, 1])
+        sg = SymmetryGroup(symmetry_operations=[s0, s1])
+        np.testing.assert_array_equal(sg.index_mappings, np.array([[0, 1, 2], [2, 0, 1]]))
+
+    def test_mul(self):
+        a = SymmetryGroup([SymmetryOperation.from_vector([1, 2, 3]), SymmetryOperation.from_vector([2, 3, 1])])
+        b = SymmetryGroup([SymmetryOperation.from_vector([1, 2, 3]), SymmetryOperation.from_vector([1, 3, 2])])
+        product = a * b
+        expected = [(s1 * s2).index_mapping for s1 in a.symmetry_operations for s2 in b.symmetry_operations]
+        np.testing.assert_array_equal(product.index_mappings, np.array(expected))
+
+    def test_orbit_images(self):
+        s0 = SymmetryOperation.from_vector([1, 2, 3])
+        s1 = SymmetryOperation.from_vector([2, 3, 1])
+        sg = SymmetryGroup(symmetry_operations=[s0, s1])
+        configurations = np.array([[1, 0, 0], [1, 2, 3]])
+        images = sg.orbit_images(configurations)
+        self.assertEqual(images.shape, (2, 2, 3))
+        for b, c in enumerate(configurations):
+            for g, so in enumerate(sg.symmetry_operations):
+                np.testing.assert_array_equal(images[b, g], so.operate_on(Configuration(c)).vector)
+
+    def test_canonical_forms(self):
+        vectors = [[1, 2, 3, 4], [2, 3, 4, 1], [3, 4, 1, 2], [4, 1, 2, 3]]
+        sg = SymmetryGroup(symmetry_operations=[SymmetryOperation.from_vector(v) for v in vectors])
+        configurations = np.array([[1, 0, 0, 1], [0, 1, 0, 1], [0, 0, 1, 1]])
+        canonical, orbit_sizes = sg.canonical_forms(configurations)
+        np.testing.assert_array_equal(canonical, [[0, 0, 1, 1], [0, 1, 0, 1], [0, 0, 1, 1]])
+        np.testing.assert_array_equal(orbit_sizes, [4, 2, 4])
+
+    def test_iter_index_mappings(self):
+        vectors = [[1, 2, 3], [2, 3, 1], [3, 1, 2]]
+        sg = SymmetryGroup(symmetry_operations=[SymmetryOperation.from_vector(v) for v in vectors])
+        blocks = list(sg.iter_index_mappings())
+        self.assertEqual(len(blocks), 1)
+        np.testing.assert_array_equal(blocks[0], sg.index_mappings)
+        blocks = list(sg.iter_index_mappings(block_size=2))
+        self.assertEqual([len(b) for b in blocks], [2, 1])
+        np.testing.assert_array_equal(np.concatenate(blocks), sg.index_mappings)
+
+    def test_orbit_keys(self):
+        vectors = [[1, 2, 3], [2, 3, 1], [3, 1, 2]]
+        sg = SymmetryGroup(symmetry_operations=[SymmetryOperation.from_vector(v) for v in vectors])
+        configurations = np.array([[1, 0, 0], [1, 1, 0]])
+        key_encoder = PackedKeyEncoder([0, 1], 3)
+        np.testing.assert_array_equal(sg.orbit_keys(configurations, key_encoder),
+                                      key_encoder.encode(sg.orbit_images(configurations)))
+
+    def test_stabilizer(self):
+        labels = ['E', 'C3', 'C3i', 'S1', 'S2', 'S3']
+        vectors = [[1, 2, 3], [2, 3, 1], [3, 1, 2], [1, 3, 2], [3, 2, 1], [2, 1, 3]]
+        sg = SymmetryGroup([SymmetryOperation.from_vector(v, label=l) for v, l in zip(vectors, labels)])
+        self.assertEqual(sg.stabilizer(Configuration([1, 0, 0])).labels, ['E', 'S1'])
+        self.assertEqual(sg.stabilizer(np.array(['A', 'A', 'A'])).labels, labels)
+
+    def test_restricted_to(self):
+        # S and T act identically on sites 2 and 3.
+        sg = SymmetryGroup([SymmetryOperation.from_vector([1, 2, 3, 4], label='E'),
+                            SymmetryOperation.from_vector([2, 1, 4, 3], label='S'),
+                            SymmetryOperation.from_vector([1, 2, 4, 3], label='T')])
+        restricted = sg.restricted_to([2, 3])
+        self.assertEqual(restricted.labels, ['E', 'S'])
+        np.testing.assert_array_equal(restricted.index_mappings, [[0, 1], [1, 0]])
+
+    def test_restricted_to_raises_ValueError_if_sites_are_not_invariant(self):
+        sg = SymmetryGroup([SymmetryOperation.from_vector([2, 3, 1])])
+        with self.assertRaises(ValueError):
+            sg.restricted_to([0, 1])
+
+    def test_from_generators(self):
+        generators = [SymmetryOperation.from_vector([2, 3, 4, 1]), SymmetryOperation.from_vector([4, 3, 2, 1])]
+        sg = SymmetryGroup.from_generators(generators)
+        self.assertIsInstance(sg, GeneratedSymmetryGroup)
+        self.assertEqual(sg.generators, generators)
+
+    def test_cycle_index(self):
+        vectors = [[1, 2, 3], [2, 3, 1], [3, 1, 2]]
+        sg = SymmetryGroup(symmetry_operations=[SymmetryOperation.from_vector(v) for v in vectors])
+        self.assertEqual(sg.cycle_index(), {((1, 3),): 1, ((3, 1),): 2})
+
+    def test_stabilizer_chain(self):
+        vectors = [[1, 2, 3, 4], [2, 3, 4, 1], [3, 4, 1, 2], [4, 1, 2, 3],
+                   [4, 3, 2, 1], [2, 1, 4, 3], [1, 4, 3, 2], [3, 2, 1, 4]]
+        sg = SymmetryGroup(symmetry_operations=[SymmetryOperation.from_vector(v) for v in vectors])
+        chain = sg.stabilizer_chain()
+        self.assertEqual(chain.order(), 8)
+        for index_mapping in sg.index_mappings:
+            self.assertTrue(chain.contains(index_mapping))
+        self.assertEqual(sg.stabilizer_chain(base=[2]).base[0], 2)
+
+class GeneratedSymmetryGroupTestCase(unittest.TestCase):
+    """Tests for GeneratedSymmetryGroup class"""
+
+    def setUp(self):
+        # C4v symmetry of the corners of a square, generated by a rotation and a reflection
+        self.generators = [SymmetryOperation.from_vector([2, 3, 4, 1]), SymmetryOperation.from_vector([4, 3, 2, 1])]
+        vectors = [[1, 2, 3, 4], [2, 3, 4, 1], [4, 1, 2, 3], [3, 4, 1, 2],
+                   [4, 3, 2, 1], [2, 1, 4, 3], [1, 4, 3, 2], [3, 2, 1, 4]]
+        self.explicit = SymmetryGroup([SymmetryOperation.from_vector(v) for v in vectors])
+        self.sg = GeneratedSymmetryGroup(self.generators)
+
+    def test_initialisation_raises_ValueError_without_generators(self):
+        with self.assertRaises(ValueError):
+            GeneratedSymmetryGroup([])
+
+    def test_initialisation_raises_ValueError_for_inconsistent_generators(self):
+        with self.assertRaises(ValueError):
+            GeneratedSymmetryGroup([SymmetryOperation.from_vector([2, 1]), SymmetryOperation.from_vector([2, 3, 1])])
+
+    def test_size(self):
+        self.assertEqual(self.sg.size, 8)
+        self.assertEqual(self.sg.degree, 4)
+
+    def test_size_does_not_create_symmetry_operations(self):
+        self.sg.size
+        self.assertEqual(self.sg._symmetry_operations, None)
+
+    def test_index_mappings(self):
+        index_mappings = self.sg.index_mappings
+        self.assertEqual(index_mappings.shape, (8, 4))
+        np.testing.assert_array_equal(index_mappings[0], [0, 1, 2, 3])
+        self.assertEqual(sorted(map(tuple, index_mappings.tolist())),
+                         sorted(map(tuple, self.explicit.index_mappings.tolist())))
+
+    def test_iter_index_mappings(self):
+        blocks = list(self.sg.iter_index_mappings(block_size=2))
+        self.assertTrue(len(blocks) > 1)
+        np.testing.assert_array_equal(np.concatenate(blocks), self.sg.index_mappings)
+
+    def test_symmetry_operations(self):
+        symmetry_operations = self.sg.symmetry_operations
+        self.assertEqual(len(symmetry_operations), 8)
+        for so, index_mapping in zip(symmetry_operations, self.sg.index_mappings):
+            np.testing.assert_array_equal(so.index_mapping, index_mapping)
+        self.assertIs(self.sg.symmetry_operations, symmetry_operations)
+
+    def test_canonical_forms(self):
+        configurations = np.array([[1, 0, 0, 1], [0, 1, 0, 1], [2, 1, 0, 0]])
+        for block_size in [1, 3, 8]:
+            with patch('bsym.symmetry_group.ELEMENT_BLOCK_ENTRIES', block_size * 4):
+                canonical, orbit_sizes = self.sg.canonical_forms(configurations)
+            expected_canonical, expected_orbit_sizes = self.explicit.canonical_forms(configurations)
+            np.testing.assert_array_equal(canonical, expected_canonical)
+            np.testing.assert_array_equal(orbit_sizes, expected_orbit_sizes)
+
+    def test_cycle_index(self):
+        self.assertEqual(self.sg.cycle_index(), self.explicit.cycle_index())
+
+    def test_orbits(self):
+        sg = GeneratedSymmetryGroup([SymmetryOperation.from_vector([2, 1, 3, 4]), SymmetryOperation.from_vector([1, 2, 4, 3])])
+        self.assertEqual([o.tolist() for o in sg.orbits()], [[0, 1], [2, 3]])
+
+    def test_restricted_to(self):
+        sg = GeneratedSymmetryGroup([SymmetryOperation.from_vector([2, 1, 3, 4]), SymmetryOperation.from_vector([1, 2, 4, 3])])
+        restricted = sg.restricted_to([2, 3])
+        self.assertIsInstance(restricted, GeneratedSymmetryGroup)
+        self.assertEqual(restricted.size, 2)
+
+    def test_append_adds_a_generator(self):
+        sg = GeneratedSymmetryGroup(self.generators[:1])
+        self.assertEqual(sg.size, 4)
+        sg.append(self.generators[1])
+        self.assertEqual(sg.size, 8)
+
+class SupercellSymmetryGroupTestCase(unittest.TestCase):
+    """Tests for SupercellSymmetryGroup class"""
+
+    def setUp(self):
+        # A chain of three cells, each with two sites. Site (b, x) is numbered 3 * b + x.
+        def operation(f):
+            return SymmetryOperation.from_index_mapping([3 * f(b, x)[0] + f(b, x)[1] % 3 for b in range(2) for x in range(3)])
+        self.translation = operation(lambda b, x: (b, x + 1))
+        self.inversion = operation(lambda b, x: (1 - b, -x))
+        self.identity = operation(lambda b, x: (b, x))
+        self.sg = SupercellSymmetryGroup([self.identity, self.inversion], [self.translation])
+        explicit = [t * p for p in [self.identity, self.inversion] 
+                    for t in [self.identity, self.translation, self.translation * self.translation]]
+        self.explicit = SymmetryGroup(explicit)
+
+    def test_initialisation_raises_ValueError_for_inconsistent_operations(self):
+        with self.assertRaises(ValueError):
+            SupercellSymmetryGroup([SymmetryOperation.from_vector([1, 2])], [self.translation])
+
+    def test_initialisation_raises_ValueError_if_translations_do_not_commute(self):
+        with self.assertRaises(ValueError):
+            SupercellSymmetryGroup([self.identity], [self.translation, self.inversion])
+
+    def test_initialisation_raises_ValueError_if_point_operations_differ_by_a_translation(self):
+        with self.assertRaises(ValueError):
+            SupercellSymmetryGroup([self.identity, self.translation], [self.translation])
+
+    def test_size(self):
+        self.assertEqual(self.sg.size, 6)
+        self.assertEqual(self.sg.degree, 6)
+        self.assertEqual(self.sg.cell_shape, (3,))
+        self.assertEqual(self.sg.n_translations, 3)
+
+    def test_cell_shape_for_two_lattice_directions(self):
+        # A 2 x 3 grid of cells, with one site in each. Site (x, y) is numbered 3 * x + y.
+        tx = SymmetryOperation.from_index_mapping([3 * ((x + 1) % 2) + y for x in range(2) for y in range(3)])
+        ty = SymmetryOperation.from_index_mapping([3 * x + (y + 1) % 3 for x in range(2) for y in range(3)])
+        sg = SupercellSymmetryGroup([SymmetryOperation.from_index_mapping(np.arange(6))], [tx, ty])
+        self.assertEqual(sg.cell_shape, (2, 3))
+        np.testing.assert_array_equal(sg.translation_mappings([1, 3]), [ty.index_mapping, tx.index_mapping])
+
+    def test_translation_mappings(self):
+        np.testing.assert_array_equal(self.sg.translation_mappings(),
+                                      [self.identity.index_mapping, self.translation.index_mapping,
+                                       (self.translation * self.translation).index_mapping])
+
+    def test_index_mappings(self):
+        self.assertEqual(self.sg.index_mappings.shape, (6, 6))
+        self.assertEqual(sorted(map(tuple, self.sg.index_mappings.tolist())),
+                         sorted(map(tuple, self.explicit.index_mappings.tolist())))
+
+    def test_iter_index_mappings(self):
+        blocks = list(self.sg.iter_index_mappings(block_size=2))
+        self.assertTrue(len(blocks) > 1)
+        np.testing.assert_array_equal(np.concatenate(blocks), self.sg.index_mappings)
+
+    def test_translation_normal_forms(self):
+        configurations = np.array([[0, 1, 0, 1, 1, 0], [1, 0, 0, 1, 0, 0], [1, 1, 1, 0, 0, 0]])
+        normal_forms, stabilizer_sizes = self.sg.translation_normal_forms(configurations)
+        np.testing.assert_array_equal(normal_forms, [[0, 0, 1, 0, 1, 1], [0, 0, 1, 0, 0, 1], [1, 1, 1, 0, 0, 0]])
+        np.testing.assert_array_equal(stabilizer_sizes, [1, 1, 3])
+
+    def test_translation_normal_forms_with_string_labels(self):
+        normal_forms, _ = self.sg.translation_normal_forms(np.array([['A', 'B', 'A', 'B', 'B', 'A']]))
+        np.testing.assert_array_equal(normal_forms, [['A', 'A', 'B', 'A', 'B', 'B']])
+
+    def test_canonical_forms(self):
+        configurations = np.array([[0, 1, 0, 1, 1, 0], [1, 0, 0, 1, 0, 0], [1, 1, 1, 0, 0, 0], [2, 1, 0, 0, 1, 2]])
+        canonical, orbit_sizes = self.sg.canonical_forms(configurations)
+        expected_canonical, expected_orbit_sizes = self.explicit.canonical_forms(configurations)
+        np.testing.assert_array_equal(canonical, expected_canonical)
+        np.testing.assert_array_equal(orbit_sizes, expected_orbit_sizes)
+
+    def test_cycle_index(self):
+        self.assertEqual(self.sg.cycle_index(), self.explicit.cycle_index())
+
+    def test_stabilizer_chain(self):
+        self.assertEqual(self.sg.stabilizer_chain().order(), 6)
+
+    def test_symmetry_operations(self):
+        symmetry_operations = self.sg.symmetry_operations
+        self.assertEqual(len(symmetry_operations), 6)
+        self.assertIs(self.sg.symmetry_operations, symmetry_operations)
+
 if __name__ == '__main__':
     unittest.main()
@@ -3,7 +3,7 @@ import numpy as np
 from bsym import SymmetryOperation, Configuration
 from unittest.mock import patch
 import io
-from bsym.symmetry_operation import is_square, is_permutation_matrix
+from bsym.symmetry_operation import is_square, is_permutation_matrix, is_permutation_vector
 
 class SymmetryOperationTestCase( unittest.TestCase ):
     """Tests for symmetry operation functions"""
@@ -93,6 +93,47 @@ class SymmetryOperationTestCase( unittest.TestCase ):
         so = SymmetryOperation.from_vector( vector, count_from_zero=True )
         np.testing.assert_array_equal( so.matrix, np.array( [ [ 0, 0, 1 ], [ 1, 0, 0 ], [ 0, 1, 0 ] ] ) )    
 
+    def test_mul_matches_matrix_product( self ):
+        so_a = SymmetryOperation.from_vector( [ 2, 4, 1, 3 ] )
+        so_b = SymmetryOperation.from_vector( [ 3, 1, 4, 2 ] )
+        np.testing.assert_array_equal( ( so_a * so_b ).matrix, so_a.matrix.dot( so_b.matrix ) )
+
+    def test_invert_matches_matrix_inverse( self ):
+        so = SymmetryOperation.from_vector( [ 2, 4, 1, 3 ] )
+        np.testing.assert_array_equal( so.invert().matrix, np.linalg.inv( so.matrix ).astype( int ) )
+
+    def test_similarity_transform_matches_matrix_product( self ):
+        so_m = SymmetryOperation.from_vector( [ 2, 4, 1, 3 ] )
+        so_s = SymmetryOperation.from_vector( [ 3, 1, 4, 2 ] )
+        expected = np.linalg.inv( so_s.matrix ).dot( so_m.matrix ).dot( so_s.matrix )
+        np.testing.assert_array_equal( so_m.similarity_transform( so_s ).matrix, expected )
+
+    def test_from_vector_with_float_elements( self ):
+        vector = [ 2.0, 3.0, 1.0 ]
+        so = SymmetryOperation.from_vector( vector )
+        np.testing.assert_array_equal( so.matrix, np.array( [ [ 0, 0, 1 ], [ 1, 0, 0 ], [ 0, 1, 0 ] ] ) )
+
+    def test_from_vector_raises_valueerror_for_invalid_vector( self ):
+        for vector in [ [ 1, 1, 2 ], [ 1, 2, 4 ], [ 1.5, 2, 3 ] ]:
+            with self.assertRaises( ValueError ):
+                SymmetryOperation.from_vector( vector )
+
+    def test_from_index_mapping( self ):
+        so = SymmetryOperation.from_index_mapping( [ 2, 0, 1 ], label='A' )
+        np.testing.assert_array_equal( so.index_mapping, np.array( [ 2, 0, 1 ] ) )
+        np.testing.assert_array_equal( so.matrix, np.array( [ [ 0, 0, 1 ], [ 1, 0, 0 ], [ 0, 1, 0 ] ] ) )
+        self.assertEqual( so.label, 'A' )
+
+    def test_from_index_mapping_raises_valueerror_for_invalid_mapping( self ):
+        for index_mapping in [ [ 0, 0, 1 ], [ 0, 1, 3 ], [ -1, 0, 1 ] ]:
+            with self.assertRaises( ValueError ):
+                SymmetryOperation.from_index_mapping( index_mapping )
+
+    def test_matrix_is_not_stored( self ):
+        so = SymmetryOperation.from_index_mapping( np.arange( 4 ) )
+        self.assertNotIn( 'matrix', vars( so ) )
+        self.assertEqual( issubclass( so.matrix.dtype.type, np.integer ), True )
+
     def test_similarity_transform( self ):
         matrix_a = np.array( [ [ 0, 1, 0 ], [ 0, 0, 1 ], [ 1, 0, 0 ] ] )
         matrix_b = np.array( [ [ 1, 0, 0 ], [ 0, 0, 1 ], [ 0, 1, 0 ] ] )
@@ -183,6 +224,13 @@ class SymmetryOperationModuleFunctionsTestCase( unittest.TestCase ):
         matrix = np.array( [ [ 1, 1 ], [ 0, 0 ] ] )
         self.assertEqual( is_permutation_matrix( matrix ), False ) 
 
+    def test_is_permutation_vector_returns_true_if_true( self ):
+        self.assertEqual( is_permutation_vector( np.array( [ 2, 0, 1 ] ) ), True )
+
+    def test_is_permutation_vector_returns_false_if_false( self ):
+        for vector in [ [ 0, 0, 1 ], [ 0, 1, 3 ], [ 0.0, 1.0 ], [ [ 0, 1 ], [ 1, 0 ] ] ]:
+            self.assertEqual( is_permutation_vector( np.array( vector ) ), False )
+
 
 
     